@@ -1,10 +1,13 @@
 from praisonai.agent import Agent
-from tools import get_tools
+from tools import get_tools, warmup_tools
 
 def main():
+    # Tools are handed over as stand-ins and built when first run; only those
+    # registered with warm=True are built ahead of time, off the main thread
+    warmup_tools()
     juici = Agent.from_yaml("agents.yaml", agent_name="juici_general_assistant")
     juici.load_tools(get_tools())
     juici.run()
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,85 @@
+from typing import Dict, List, Any, Optional, Tuple
+import asyncio
+
+class MicroBatcher:
+    """Coalesces individual calls to a batch-capable tool into batched calls.
+
+    The tool implements ``async execute_batch(tasks) -> results`` returning
+    one result per task, in order; a result that is an exception fails only
+    its own task. Calls are collected until ``max_batch`` are waiting or
+    ``window`` seconds have passed since the first, then dispatched as one
+    batch. At most ``max_concurrent`` batches run at once; a larger
+    ``window`` or ``max_batch`` trades per-task latency for fewer calls.
+    """
+
+    def __init__(self, tool: Any, max_batch: int = 32, window: float = 0.005, max_concurrent: int = 4):
+        if not hasattr(tool, "execute_batch"):
+            raise TypeError(f"{type(tool).__name__} does not support batching (no execute_batch)")
+        self.tool = tool
+        self.max_batch = max_batch
+        self.window = window
+        self.max_concurrent = max_concurrent
+        # Tasks admitted to this batcher, waiting or in a running batch
+        self.capacity = asyncio.Semaphore(max_batch * max_concurrent)
+        self._dispatch_slots = asyncio.Semaphore(max_concurrent)
+        self._pending: List[Tuple[Dict[str, Any], asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._dispatching: set = set()
+        self.batches = 0
+        self.items = 0
+        self.max_seen = 0
+
+    async def submit(self, task: Dict[str, Any]) -> Any:
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((task, future))
+        if len(self._pending) >= self.max_batch:
+            self._flush()
+        elif self._timer is None:
+            self._timer = asyncio.get_running_loop().call_later(self.window, self._flush)
+        return await future
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        while self._pending:
+            batch, self._pending = self._pending[:self.max_batch], self._pending[self.max_batch:]
+            # Callers cancelled while waiting (timeouts, cancel_process) are left out
+            batch = [(task, future) for task, future in batch if not future.done()]
+            if batch:
+                dispatch = asyncio.ensure_future(self._dispatch(batch))
+                self._dispatching.add(dispatch)
+                dispatch.add_done_callback(self._dispatching.discard)
+
+    async def _dispatch(self, batch: List[Tuple[Dict[str, Any], asyncio.Future]]):
+        async with self._dispatch_slots:
+            self.batches += 1
+            self.items += len(batch)
+            self.max_seen = max(self.max_seen, len(batch))
+            try:
+                results = await self.tool.execute_batch([task for task, _ in batch])
+                if len(results) != len(batch):
+                    raise RuntimeError(f"Batch returned {len(results)} results for {len(batch)} tasks")
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                return
+            for (_, future), result in zip(batch, results):
+                if future.done():
+                    continue
+                if isinstance(result, BaseException):
+                    future.set_exception(result)
+                else:
+                    future.set_result(result)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "batches": self.batches,
+            "items": self.items,
+            "avg_batch": self.items / self.batches if self.batches else 0.0,
+            "max_batch_seen": self.max_seen,
+            "waiting": len(self._pending),
+            "max_batch": self.max_batch,
+            "window": self.window,
+        }
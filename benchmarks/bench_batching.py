@@ -0,0 +1,108 @@
+"""Measure ProcessManager micro-batching against one call per task.
+
+The backend charges a fixed per-call overhead (connection setup, request
+round trip) plus a small per-item cost, standing in for search or API
+lookups that accept many queries per request. Each configuration submits
+the same tasks and reports throughput, backend calls and per-task latency
+(creation to completion).
+
+Usage: python benchmarks/bench_batching.py --tasks 2000 --call-ms 20 --item-ms 0.1 --windows 0,1,5,20 --sizes 8,32,128
+"""
+from typing import Dict, List, Any
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.stubs import install_stubs
+
+install_stubs()
+
+from process import ProcessManager
+
+class LookupBackend:
+    """Backend with a per-call overhead and a per-item cost."""
+
+    def __init__(self, call: float, item: float):
+        self.call = call
+        self.item = item
+        self.calls = 0
+
+    async def execute_task(self, task: Dict[str, Any]) -> Any:
+        self.calls += 1
+        await asyncio.sleep(self.call + self.item)
+        return task["n"] * 2
+
+    async def execute_batch(self, tasks: List[Dict[str, Any]]) -> List[Any]:
+        self.calls += 1
+        await asyncio.sleep(self.call + self.item * len(tasks))
+        return [task["n"] * 2 for task in tasks]
+
+def percentile(values: List[float], q: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+async def run(tasks: int, backend: LookupBackend, concurrency: int, window: float = None,
+              size: int = None) -> Dict[str, Any]:
+    manager = ProcessManager(num_workers=concurrency)
+    manager.process_tool = backend
+    batched = window is not None
+    if batched:
+        manager.register_batch_tool("lookup", backend, max_batch=size, window=window,
+                                    max_concurrent=concurrency)
+    await manager.start()
+    start = time.perf_counter()
+    ids = []
+    for n in range(tasks):
+        task = {"n": n, "batch": "lookup"} if batched else {"n": n}
+        ids.append(await manager.create_process(task, dedupe=False))
+    processes = await asyncio.gather(*(manager.wait_for(process_id) for process_id in ids))
+    elapsed = time.perf_counter() - start
+    await manager.stop()
+    latencies = [(p["updated_at"] - p["created_at"]).total_seconds() * 1000 for p in processes]
+    result = {
+        "mode": "batched" if batched else "per_task",
+        "window_ms": window * 1000 if batched else None,
+        "max_batch": size,
+        "completed": sum(p["result"] == p["task"]["n"] * 2 for p in processes),
+        "backend_calls": backend.calls,
+        "seconds": elapsed,
+        "tasks_per_second": tasks / elapsed,
+        "latency_p50_ms": percentile(latencies, 0.5),
+        "latency_p99_ms": percentile(latencies, 0.99),
+    }
+    if batched:
+        result["avg_batch"] = manager.batch_stats()["lookup"]["avg_batch"]
+    return result
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tasks", type=int, default=2000)
+    parser.add_argument("--call-ms", type=float, default=20)
+    parser.add_argument("--item-ms", type=float, default=0.1)
+    parser.add_argument("--concurrency", type=int, default=8, help="Concurrent backend calls in either mode")
+    parser.add_argument("--windows", default="0,1,5,20", help="Batch windows in milliseconds")
+    parser.add_argument("--sizes", default="8,32,128", help="Maximum batch sizes")
+    parser.add_argument("--output", help="Write results as JSON to this file")
+    args = parser.parse_args()
+
+    call, item = args.call_ms / 1000, args.item_ms / 1000
+    results = [asyncio.run(run(args.tasks, LookupBackend(call, item), args.concurrency))]
+    print(json.dumps(results[0]))
+    for size in (int(s) for s in args.sizes.split(",")):
+        for window in (float(w) / 1000 for w in args.windows.split(",")):
+            result = asyncio.run(run(args.tasks, LookupBackend(call, item), args.concurrency, window, size))
+            result["speedup"] = result["tasks_per_second"] / results[0]["tasks_per_second"]
+            results.append(result)
+            print(json.dumps(result))
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({"benchmark": "micro_batching", "tasks": args.tasks, "call_ms": args.call_ms,
+                       "item_ms": args.item_ms, "concurrency": args.concurrency, "results": results}, f, indent=2)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""Measure WebInteractionTool page latency: a browser per call vs BrowserPool.
+
+Serves generated static HTML pages from a local HTTP server and extracts
+each one, first launching a fresh browser per call (the previous
+WebInteractionTool behaviour) and then leasing pages from a shared
+BrowserPool, sequentially and with concurrent callers. Requires
+Playwright with its Chromium build installed (``playwright install chromium``).
+
+Usage: python benchmarks/bench_browser.py --calls 50 --concurrency 1,4,8 --max-contexts 4
+"""
+from typing import Dict, List, Any
+from http.server import ThreadingHTTPServer, SimpleHTTPRequestHandler
+import argparse
+import asyncio
+import functools
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from playwright.async_api import async_playwright
+from browser_pool import BrowserPool
+
+class QuietHandler(SimpleHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+def serve_pages(directory: str, pages: int) -> ThreadingHTTPServer:
+    for n in range(pages):
+        rows = "".join(f"<li>item {n}-{i}</li>" for i in range(200))
+        with open(os.path.join(directory, f"page{n}.html"), 'w') as f:
+            f.write(f"<html><head><title>Page {n}</title></head><body><form><input id='q'></form>"
+                    f"<ul>{rows}</ul></body></html>")
+    server = ThreadingHTTPServer(("127.0.0.1", 0), functools.partial(QuietHandler, directory=directory))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+def percentile(values: List[float], q: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+async def extract_fresh(url: str) -> str:
+    async with async_playwright() as p:
+        browser = await p.chromium.launch()
+        page = await browser.new_page()
+        await page.goto(url)
+        content = await page.content()
+        await browser.close()
+        return content
+
+async def extract_pooled(pool: BrowserPool, url: str) -> str:
+    async with pool.page() as page:
+        await page.goto(url)
+        return await page.content()
+
+async def run(mode: str, urls: List[str], concurrency: int, max_contexts: int, max_uses: int) -> Dict[str, Any]:
+    pool = BrowserPool(max_contexts=max_contexts, max_uses=max_uses) if mode == "pooled" else None
+    if pool is not None:
+        await pool.start()
+    gate = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def call(url: str):
+        async with gate:
+            start = time.perf_counter()
+            content = await (extract_pooled(pool, url) if pool else extract_fresh(url))
+            latencies.append((time.perf_counter() - start) * 1000)
+            assert "<li>" in content
+
+    start = time.perf_counter()
+    try:
+        # Let every call finish: cancelling Playwright mid-launch can hang shutdown
+        errors = [e for e in await asyncio.gather(*(call(url) for url in urls), return_exceptions=True) if e]
+        if errors:
+            raise errors[0]
+    finally:
+        stats = pool.stats() if pool else None
+        if pool is not None:
+            await pool.close()
+    elapsed = time.perf_counter() - start
+    return {
+        "mode": mode,
+        "concurrency": concurrency,
+        "calls": len(urls),
+        "seconds": elapsed,
+        "calls_per_second": len(urls) / elapsed,
+        "latency_p50_ms": percentile(latencies, 0.5),
+        "latency_p99_ms": percentile(latencies, 0.99),
+        "pool": stats,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=50)
+    parser.add_argument("--pages", type=int, default=10)
+    parser.add_argument("--concurrency", default="1,4,8")
+    parser.add_argument("--max-contexts", type=int, default=4)
+    parser.add_argument("--max-uses", type=int, default=50)
+    parser.add_argument("--output", help="Write results as JSON to this file")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        server = serve_pages(directory, args.pages)
+        base = f"http://127.0.0.1:{server.server_address[1]}"
+        urls = [f"{base}/page{n % args.pages}.html" for n in range(args.calls)]
+        results = []
+        try:
+            for concurrency in (int(c) for c in args.concurrency.split(",")):
+                for mode in ("fresh", "pooled"):
+                    result = asyncio.run(run(mode, urls, concurrency, args.max_contexts, args.max_uses))
+                    results.append(result)
+                    print(json.dumps(result))
+        finally:
+            server.shutdown()
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({"benchmark": "browser_pool", "calls": args.calls, "results": results}, f, indent=2)
+
+if __name__ == "__main__":
+    main()
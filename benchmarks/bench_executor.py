@@ -0,0 +1,106 @@
+"""Measure event loop responsiveness and throughput for CPU-bound tasks
+run on the loop, in the thread pool and in the process pool.
+
+A probe coroutine ticks every millisecond while the tasks run; the worst
+delay between ticks is the longest the loop was blocked.
+
+Usage: python benchmarks/bench_executor.py --tasks 16 --work 2000000 --result-mb 16
+"""
+from typing import Dict, Any
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.stubs import install_stubs
+
+install_stubs()
+
+from process import ProcessManager
+
+def crunch(n: int) -> int:
+    total = 0
+    for i in range(n):
+        total += i * i % 7
+    return total
+
+def blob(size: int) -> bytes:
+    return bytes(size)
+
+class InlineTool:
+    """Runs the CPU-bound function directly on the event loop."""
+
+    async def execute_task(self, task: Dict[str, Any]) -> Any:
+        return crunch(*task["args"])
+
+async def probe(stop: asyncio.Event) -> float:
+    worst = 0.0
+    last = time.perf_counter()
+    while not stop.is_set():
+        await asyncio.sleep(0.001)
+        now = time.perf_counter()
+        worst = max(worst, now - last - 0.001)
+        last = now
+    return worst
+
+async def run_mode(execution: str, tasks: int, work: int, workers: int) -> Dict[str, Any]:
+    manager = ProcessManager(num_workers=workers)
+    manager.process_tool = InlineTool()
+    if execution == "process":
+        await manager.executor.warmup()
+    await manager.start()
+    stop = asyncio.Event()
+    prober = asyncio.create_task(probe(stop))
+    start = time.perf_counter()
+    for _ in range(tasks):
+        await manager.create_process({"execution": execution, "function": "benchmarks.bench_executor:crunch",
+                                      "args": [work]}, dedupe=False)
+    await manager.task_queue.join()
+    elapsed = time.perf_counter() - start
+    stop.set()
+    worst = await prober
+    await manager.stop()
+    return {"execution": execution, "seconds": elapsed, "tasks_per_second": tasks / elapsed,
+            "max_loop_block_ms": worst * 1000}
+
+async def run_transfer(result_mb: int, threshold: int) -> Dict[str, Any]:
+    manager = ProcessManager()
+    manager.executor.shm_threshold = threshold
+    await manager.executor.warmup()
+    size = result_mb << 20
+    start = time.perf_counter()
+    for _ in range(5):
+        await manager.executor.run("process", "benchmarks.bench_executor:blob", (size,))
+    elapsed = (time.perf_counter() - start) / 5
+    manager.executor.shutdown()
+    return {"result_mb": result_mb, "shared_memory": threshold <= size, "seconds_per_result": elapsed}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tasks", type=int, default=16)
+    parser.add_argument("--work", type=int, default=2_000_000, help="Loop iterations per task")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--result-mb", type=int, default=16, help="Size of results for the transfer test")
+    parser.add_argument("--output", help="Write results as JSON to this file")
+    args = parser.parse_args()
+
+    results = {"benchmark": "executor", "tasks": args.tasks, "work": args.work, "workers": args.workers,
+               "modes": [], "transfer": []}
+    for execution in ("async", "thread", "process"):
+        result = asyncio.run(run_mode(execution, args.tasks, args.work, args.workers))
+        results["modes"].append(result)
+        print(json.dumps(result))
+    for threshold in (1 << 62, 1 << 20):
+        result = asyncio.run(run_transfer(args.result_mb, threshold))
+        results["transfer"].append(result)
+        print(json.dumps(result))
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""Measure peak RSS and time of FileSystemTool operations on a large generated file.
+
+Generates a log file of --size-mb, then runs each operation in a fresh
+interpreter and reports its wall time and peak RSS (ru_maxrss) above the
+interpreter's start-up footprint. The "whole_*" operations are what the
+tool did before: read the file into a string, or build the content in
+memory before writing it.
+
+Usage: python benchmarks/bench_files.py --size-mb 1024 --output results.json
+"""
+from typing import Dict, Any, Iterator
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import fileops
+
+NEEDLE = "ERROR disk quota exceeded"
+
+def log_lines(size: int) -> Iterator[str]:
+    """About ``size`` bytes of log lines, with a rare needle every 100k lines."""
+    written = n = 0
+    while written < size:
+        line = f"2024-01-01T00:00:{n % 60:02d} worker-{n % 32} {'INFO request served in 12ms' if n % 100_000 else NEEDLE} id={n}\n"
+        written += len(line)
+        n += 1
+        yield line
+
+def batched(lines: Iterator[str], size: int = 1 << 20) -> Iterator[str]:
+    batch, batch_size = [], 0
+    for line in lines:
+        batch.append(line)
+        batch_size += len(line)
+        if batch_size >= size:
+            yield "".join(batch)
+            batch, batch_size = [], 0
+    if batch:
+        yield "".join(batch)
+
+OPERATIONS = {
+    "whole_write": lambda path, size: open(path, 'w').write("".join(log_lines(size))),
+    "chunked_write": lambda path, size: fileops.write_chunks(path, batched(log_lines(size))),
+    "whole_read": lambda path, size: len(open(path).read()),
+    "range_read_1mb": lambda path, size: len(fileops.read_range(path, size // 2, 1 << 20)),
+    "head_100": lambda path, size: len(fileops.head(path, 100)),
+    "tail_100": lambda path, size: len(fileops.tail(path, 100)),
+    "read_lines_100_mid": lambda path, size: len(fileops.read_lines(path, 5_000_000, 5_000_099)),
+    "whole_search": lambda path, size: open(path).read().count(NEEDLE),
+    "mmap_search": lambda path, size: len(fileops.search(path, NEEDLE, max_matches=1_000_000)),
+    "mmap_regex_search": lambda path, size: len(fileops.search(path, r"ERROR \w+ quota", regex=True,
+                                                               max_matches=1_000_000)),
+}
+
+def child(operation: str, path: str, size: int) -> Dict[str, Any]:
+    baseline = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    start = time.perf_counter()
+    result = OPERATIONS[operation](path, size)
+    elapsed = time.perf_counter() - start
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return {"operation": operation, "seconds": elapsed, "result": result,
+            "peak_rss_mb": peak / 1024, "peak_rss_above_start_mb": (peak - baseline) / 1024}
+
+def run(operation: str, path: str, size: int) -> Dict[str, Any]:
+    output = subprocess.run([sys.executable, os.path.abspath(__file__), "--child", operation, "--path", path,
+                             "--size-bytes", str(size)], capture_output=True, text=True, check=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size-mb", type=int, default=1024)
+    parser.add_argument("--operations", default=",".join(OPERATIONS))
+    parser.add_argument("--dir", help="Directory for the generated file (default: a temporary one)")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    parser.add_argument("--path", help=argparse.SUPPRESS)
+    parser.add_argument("--size-bytes", type=int, help=argparse.SUPPRESS)
+    parser.add_argument("--output", help="Write results as JSON to this file")
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(child(args.child, args.path, args.size_bytes)))
+        return
+    size = args.size_mb << 20
+    results = []
+    with tempfile.TemporaryDirectory(dir=args.dir) as directory:
+        path = os.path.join(directory, "large.log")
+        fileops.write_chunks(path, batched(log_lines(size)))
+        for operation in args.operations.split(","):
+            result = run(operation, path, size)
+            results.append(result)
+            print(json.dumps(result))
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({"benchmark": "file_system", "size_mb": args.size_mb, "results": results}, f, indent=2)
+
+if __name__ == "__main__":
+    main()
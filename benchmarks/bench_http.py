@@ -0,0 +1,160 @@
+"""Measure APITool request paths against a local aiohttp stub server.
+
+Compares, for small JSON responses:
+  unpooled_sync   requests.request per call (the previous APITool._run)
+  pooled_sync     HTTPClient.request_sync on a keep-alive requests.Session
+  blocking_async  concurrent _arun calls that each block the loop (previous _arun)
+  pooled_async    concurrent HTTPClient.request on the shared aiohttp session
+and, for one large body, reading it whole vs streaming it to disk (peak
+Python heap from tracemalloc). The stub server adds --delay-ms per request.
+
+Usage: python benchmarks/bench_http.py --calls 500 --concurrency 32 --delay-ms 5 --large-mb 64
+"""
+from typing import Dict, List, Any
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from aiohttp import web
+import requests
+from http_client import HTTPClient
+
+def start_server(delay: float, large_bytes: int) -> int:
+    """Run the stub server on its own loop in a daemon thread; returns the port."""
+    payload = os.urandom(1 << 20)
+
+    async def small(request: web.Request) -> web.Response:
+        await asyncio.sleep(delay)
+        return web.json_response({"ok": True, "path": request.path})
+
+    async def large(request: web.Request) -> web.StreamResponse:
+        response = web.StreamResponse()
+        response.content_length = large_bytes
+        await response.prepare(request)
+        for start in range(0, large_bytes, len(payload)):
+            await response.write(payload[:min(len(payload), large_bytes - start)])
+        return response
+
+    ready = threading.Event()
+    port = []
+
+    def serve():
+        loop = asyncio.new_event_loop()
+        app = web.Application()
+        app.router.add_get("/small", small)
+        app.router.add_get("/large", large)
+        runner = web.AppRunner(app, access_log=None)
+        loop.run_until_complete(runner.setup())
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        loop.run_until_complete(site.start())
+        port.append(site._server.sockets[0].getsockname()[1])
+        ready.set()
+        loop.run_forever()
+
+    threading.Thread(target=serve, daemon=True).start()
+    ready.wait()
+    return port[0]
+
+def percentile(values: List[float], q: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+def summarize(mode: str, latencies: List[float], elapsed: float, **extra) -> Dict[str, Any]:
+    return {"mode": mode, "calls": len(latencies), "seconds": elapsed,
+            "calls_per_second": len(latencies) / elapsed,
+            "latency_p50_ms": percentile(latencies, 0.5), "latency_p99_ms": percentile(latencies, 0.99), **extra}
+
+def run_sync(mode: str, url: str, calls: int, client: HTTPClient) -> Dict[str, Any]:
+    latencies = []
+    start = time.perf_counter()
+    for _ in range(calls):
+        began = time.perf_counter()
+        if mode == "unpooled_sync":
+            requests.request("GET", url, headers={"Content-Type": "application/json"}).text
+        else:
+            client.request_sync("GET", url).text
+        latencies.append((time.perf_counter() - began) * 1000)
+    return summarize(mode, latencies, time.perf_counter() - start)
+
+async def run_async(mode: str, url: str, calls: int, concurrency: int, client: HTTPClient) -> Dict[str, Any]:
+    gate = asyncio.Semaphore(concurrency)
+    latencies = []
+    stall = 0.0
+    last = time.perf_counter()
+
+    async def ticker():
+        # Longest gap between ticks: how long the loop was blocked
+        nonlocal stall, last
+        while True:
+            await asyncio.sleep(0.001)
+            now = time.perf_counter()
+            stall = max(stall, now - last)
+            last = now
+
+    async def call():
+        async with gate:
+            began = time.perf_counter()
+            if mode == "blocking_async":
+                requests.request("GET", url, headers={"Content-Type": "application/json"}).text
+            else:
+                (await client.request("GET", url)).text
+            latencies.append((time.perf_counter() - began) * 1000)
+
+    tick = asyncio.create_task(ticker())
+    start = time.perf_counter()
+    await asyncio.gather(*(call() for _ in range(calls)))
+    elapsed = time.perf_counter() - start
+    stall = max(stall, time.perf_counter() - last)
+    tick.cancel()
+    await client.aclose()
+    return summarize(mode, latencies, elapsed, concurrency=concurrency, max_loop_stall_ms=stall * 1000)
+
+async def run_large(mode: str, url: str, client: HTTPClient) -> Dict[str, Any]:
+    with tempfile.TemporaryDirectory() as directory:
+        tracemalloc.start()
+        start = time.perf_counter()
+        if mode == "read_whole":
+            size = len((await client.request("GET", url)).body)
+        else:
+            size = await client.download("GET", url, os.path.join(directory, "body"))
+        elapsed = time.perf_counter() - start
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    await client.aclose()
+    return {"mode": mode, "bytes": size, "seconds": elapsed, "peak_heap_mb": peak / (1 << 20)}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--delay-ms", type=float, default=5)
+    parser.add_argument("--large-mb", type=int, default=64)
+    parser.add_argument("--output", help="Write results as JSON to this file")
+    args = parser.parse_args()
+
+    port = start_server(args.delay_ms / 1000, args.large_mb << 20)
+    small, large = f"http://127.0.0.1:{port}/small", f"http://127.0.0.1:{port}/large"
+    client = HTTPClient(limit_per_host=args.concurrency)
+    results = [run_sync(mode, small, args.calls, client) for mode in ("unpooled_sync", "pooled_sync")]
+    for mode in ("blocking_async", "pooled_async"):
+        results.append(asyncio.run(run_async(mode, small, args.calls, args.concurrency, client)))
+    for mode in ("read_whole", "streamed"):
+        results.append(asyncio.run(run_large(mode, large, client)))
+    client.close()
+    for result in results:
+        print(json.dumps(result))
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({"benchmark": "http_client", "calls": args.calls, "delay_ms": args.delay_ms,
+                       "results": results}, f, indent=2)
+
+if __name__ == "__main__":
+    main()
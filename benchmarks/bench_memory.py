@@ -0,0 +1,177 @@
+"""Benchmark suite for the memory subsystem (memory.py and core/memory.py).
+
+Every case seeds a history of N messages on disk, then measures, in a fresh
+child process so peak RSS is isolated:
+
+- add_message throughput on top of the seeded history
+- load_memory cold start
+- get_conversation_history / get_messages latency (newest page and a middle page)
+- size of the persisted files
+- peak RSS of the process
+
+Results are written as JSON so they can be kept as CI artifacts and compared
+between runs. LangChain and praisonai_tools are replaced by minimal stand-ins
+when they are not installed, so the suite runs fully offline.
+
+Usage: python benchmarks/bench_memory.py --sizes 1000,10000,100000 --output memory-bench.json
+"""
+from typing import Dict, List, Any, Callable
+import argparse
+import json
+import os
+import platform
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks.stubs import install_stubs
+
+CASES = [
+    "core:json", "core:json-lazy", "core:compact", "core:journal", "core:sqlite", "core:sqlite-lazy",
+    "legacy:json", "legacy:json-lazy", "legacy:write-behind",
+]
+LAZY_TAIL = 100
+PAGE = 50
+
+def make_message(i: int) -> Dict[str, str]:
+    role = "user" if i % 2 == 0 else "assistant"
+    return {"role": role, "content": f"Message {i}: " + "lorem ipsum dolor sit amet " * 4}
+
+def timed(fn: Callable) -> float:
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+def dir_size(path: str) -> int:
+    return sum(os.path.getsize(os.path.join(path, name)) for name in os.listdir(path))
+
+def peak_rss_bytes() -> int:
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in KiB on Linux and bytes on macOS
+    return rss if sys.platform == "darwin" else rss * 1024
+
+def seed_core(backend: str, size: int):
+    from core.lazy import write_line_json
+    from core.storage import JournalStorage, SQLiteStorage
+    messages = (make_message(i) for i in range(size))
+    if backend in ("json", "json-lazy", "compact"):
+        write_line_json("memory.json", "conversation_history", messages, {"context": {"seeded": True}}, fsync=False)
+    elif backend == "journal":
+        storage = JournalStorage("memory", compact_threshold=1 << 40)
+        storage.append_messages(list(messages))
+        storage.close()
+    elif backend in ("sqlite", "sqlite-lazy"):
+        storage = SQLiteStorage("memory.db")
+        storage.append_messages(list(messages))
+        storage.close()
+
+def core_manager(backend: str):
+    from core.memory import MemoryManager
+    from core.storage import JournalStorage, SQLiteStorage
+    if backend == "journal":
+        return MemoryManager(storage=JournalStorage("memory", compact_threshold=1 << 40))
+    if backend in ("sqlite", "sqlite-lazy"):
+        return MemoryManager(storage=SQLiteStorage("memory.db"))
+    return MemoryManager(compact=backend == "compact")
+
+def run_core(backend: str, size: int, adds: int) -> Dict[str, Any]:
+    seed_core(backend, size)
+    lazy_tail = LAZY_TAIL if backend.endswith("-lazy") else None
+    manager = core_manager(backend)
+    result = {"load_seconds": timed(lambda: manager.load_memory(lazy_tail=lazy_tail))}
+    result["get_latest_seconds"] = timed(lambda: manager.get_conversation_history(limit=PAGE))
+    result["get_middle_seconds"] = timed(lambda: manager.get_conversation_history(since=size // 2, limit=PAGE))
+    add_seconds = timed(lambda: [manager.add_message("user", make_message(i)["content"]) for i in range(adds)])
+    result["add_per_second"] = adds / add_seconds if add_seconds else None
+    manager.close()
+    return result
+
+def seed_legacy(size: int):
+    from core.lazy import write_line_json
+    messages = ({"content": make_message(i)["content"], "type": "human", "additional_kwargs": {}} for i in range(size))
+    write_line_json("memory.json", "messages", messages, {"context": {"seeded": True}}, fsync=False)
+
+def run_legacy(backend: str, size: int, adds: int) -> Dict[str, Any]:
+    seed_legacy(size)
+    from langchain.schema import BaseMessage
+    from memory import MemoryManager
+    lazy_tail = LAZY_TAIL if backend.endswith("-lazy") else None
+    manager = MemoryManager(write_behind=backend == "write-behind")
+    result = {"load_seconds": timed(lambda: manager.load_memory(lazy_tail=lazy_tail))}
+    result["get_latest_seconds"] = timed(lambda: manager.get_messages(limit=PAGE))
+    result["get_middle_seconds"] = timed(lambda: manager.get_messages(offset=size // 2, limit=PAGE))
+    add_seconds = timed(lambda: [manager.add_message(BaseMessage(content=make_message(i)["content"]))
+                                 for i in range(adds)])
+    result["add_per_second"] = adds / add_seconds if add_seconds else None
+    manager.close()
+    return result
+
+def run_case(case: str, size: int, adds: int) -> Dict[str, Any]:
+    """Run one case in the current process, inside a scratch directory."""
+    stubbed = install_stubs()
+    module, backend = case.split(":")
+    workdir = tempfile.mkdtemp(prefix="bench-memory-")
+    cwd = os.getcwd()
+    os.chdir(workdir)
+    try:
+        if module == "core":
+            result = run_core(backend, size, adds)
+        else:
+            result = run_legacy(backend, size, adds)
+        result["disk_bytes"] = dir_size(workdir)
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(workdir, ignore_errors=True)
+    result.update({"case": case, "messages": size, "adds": adds, "stubbed": stubbed, "peak_rss_bytes": peak_rss_bytes()})
+    return result
+
+def run_isolated(case: str, size: int, adds: int, timeout: float) -> Dict[str, Any]:
+    """Run one case in a child process so peak RSS is not shared between cases."""
+    command = [sys.executable, os.path.abspath(__file__), "--child", case, "--sizes", str(size), "--adds", str(adds)]
+    try:
+        completed = subprocess.run(command, capture_output=True, text=True, timeout=timeout)
+    except subprocess.TimeoutExpired:
+        return {"case": case, "messages": size, "error": f"timed out after {timeout}s"}
+    if completed.returncode != 0:
+        return {"case": case, "messages": size, "error": completed.stderr.strip().splitlines()[-1:]}
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="1000,10000,100000,1000000", help="Comma separated history sizes")
+    parser.add_argument("--cases", default=",".join(CASES), help="Comma separated cases")
+    parser.add_argument("--adds", type=int, default=100, help="add_message calls timed per case")
+    parser.add_argument("--timeout", type=float, default=1800, help="Per-case timeout in seconds")
+    parser.add_argument("--output", help="Write results as JSON to this file")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    sizes = [int(size) for size in args.sizes.split(",")]
+
+    if args.child:
+        print(json.dumps(run_case(args.child, sizes[0], args.adds)))
+        return
+
+    results: List[Dict[str, Any]] = []
+    for size in sizes:
+        for case in args.cases.split(","):
+            result = run_isolated(case, size, args.adds, args.timeout)
+            results.append(result)
+            print(json.dumps(result), flush=True)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({
+                "benchmark": "memory",
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "results": results,
+            }, f, indent=2)
+
+if __name__ == "__main__":
+    main()
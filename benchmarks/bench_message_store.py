@@ -0,0 +1,72 @@
+"""Measure bytes per retained message for each conversation history layout.
+
+Usage: python benchmarks/bench_message_store.py --messages 200000
+"""
+from typing import Dict, Any, Callable
+import argparse
+import gc
+import json
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.messages import Message, MessageStore
+
+ROLES = ["user", "assistant", "system", "tool"]
+
+def make_contents(count: int):
+    # Shared content strings, so only the per-message overhead is measured
+    return [f"message body {i % 1000}" for i in range(count)]
+
+def list_of_dicts(contents):
+    history = []
+    for i, content in enumerate(contents):
+        history.append({"role": ROLES[i % 4], "content": content})
+    return history
+
+def row_store(contents):
+    history = MessageStore()
+    for i, content in enumerate(contents):
+        history.append(Message(ROLES[i % 4], content))
+    return history
+
+def columnar_store(contents):
+    history = MessageStore(columnar=True)
+    for i, content in enumerate(contents):
+        history.append(Message(ROLES[i % 4], content))
+    return history
+
+def measure(build: Callable, contents) -> int:
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    history = build(contents)
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del history
+    return after - before
+
+def run(messages: int) -> Dict[str, Any]:
+    contents = make_contents(messages)
+    layouts = {"list_of_dicts": list_of_dicts, "message_store": row_store, "columnar_store": columnar_store}
+    results = {"benchmark": "message_store", "messages": messages}
+    for name, build in layouts.items():
+        results[f"{name}_bytes_per_message"] = measure(build, contents) / messages
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--messages", type=int, default=200_000)
+    parser.add_argument("--output", help="Write results as JSON to this file")
+    args = parser.parse_args()
+
+    result = run(args.messages)
+    print(json.dumps(result, indent=2))
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(result, f, indent=2)
+
+if __name__ == "__main__":
+    main()
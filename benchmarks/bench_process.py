@@ -0,0 +1,74 @@
+"""Measure ProcessManager throughput for I/O-bound tasks as the pool grows.
+
+Each task awaits a fixed sleep, standing in for a network-bound
+process_tool.execute_task call.
+
+Usage: python benchmarks/bench_process.py --tasks 400 --sleep-ms 20 --workers 1,2,4,8,16,32
+"""
+from typing import Dict, Any
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.stubs import install_stubs
+
+install_stubs()
+
+from process import ProcessManager
+
+class SleepTool:
+    """I/O-bound stand-in for ProcessTool."""
+
+    def __init__(self):
+        self.completed = 0
+
+    async def execute_task(self, task: Dict[str, Any]) -> Any:
+        await asyncio.sleep(task["sleep"])
+        self.completed += 1
+        return task["n"]
+
+async def run_pool(tasks: int, sleep: float, workers: int, max_in_flight: int) -> Dict[str, Any]:
+    manager = ProcessManager(num_workers=workers, max_in_flight=max_in_flight)
+    tool = manager.process_tool = SleepTool()
+    await manager.start()
+    start = time.perf_counter()
+    for n in range(tasks):
+        await manager.create_process({"n": n, "sleep": sleep})
+    await manager.stop(drain=True)
+    elapsed = time.perf_counter() - start
+    return {
+        "workers": workers,
+        "max_in_flight": max_in_flight,
+        "concurrency": workers * max_in_flight,
+        "completed": tool.completed,
+        "seconds": elapsed,
+        "tasks_per_second": tasks / elapsed,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tasks", type=int, default=400)
+    parser.add_argument("--sleep-ms", type=float, default=20)
+    parser.add_argument("--workers", default="1,2,4,8,16,32")
+    parser.add_argument("--max-in-flight", type=int, default=1)
+    parser.add_argument("--output", help="Write results as JSON to this file")
+    args = parser.parse_args()
+
+    results = []
+    for workers in (int(w) for w in args.workers.split(",")):
+        result = asyncio.run(run_pool(args.tasks, args.sleep_ms / 1000, workers, args.max_in_flight))
+        result["speedup"] = result["tasks_per_second"] / results[0]["tasks_per_second"] if results else 1.0
+        results.append(result)
+        print(json.dumps(result))
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({"benchmark": "process_pool", "tasks": args.tasks, "sleep_ms": args.sleep_ms,
+                       "results": results}, f, indent=2)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""Benchmark the semantic recall index on a large synthetic conversation.
+
+Usage: python benchmarks/bench_recall.py --messages 100000 --queries 200
+"""
+from typing import Dict, Any, List
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.recall import RecallIndex, HashingVectorizer
+
+TOPICS = [
+    "invoice billing payment refund", "deploy server kubernetes cluster", "marketing campaign email newsletter",
+    "python bug traceback exception", "hiring interview candidate resume", "database index query latency",
+    "travel flight hotel booking", "security encryption key rotation", "design logo brand colors",
+    "budget forecast revenue quarter",
+]
+FILLER = "the a we should maybe please thanks then also about with for on it this that".split()
+
+def make_message(rng: random.Random) -> str:
+    topic = rng.choice(TOPICS).split()
+    words = [rng.choice(topic if rng.random() < 0.4 else FILLER) for _ in range(rng.randint(8, 40))]
+    return " ".join(words)
+
+def run(messages: int, queries: int, n_features: int, k: int, seed: int = 0) -> Dict[str, Any]:
+    rng = random.Random(seed)
+    texts = [make_message(rng) for _ in range(messages)]
+    index = RecallIndex(HashingVectorizer(n_features=n_features))
+
+    start = time.perf_counter()
+    for i, text in enumerate(texts):
+        index.add(text, i)
+    add_seconds = time.perf_counter() - start
+
+    latencies: List[float] = []
+    for _ in range(queries):
+        query = rng.choice(TOPICS)
+        start = time.perf_counter()
+        index.search(query, k)
+        latencies.append(time.perf_counter() - start)
+    latencies.sort()
+
+    return {
+        "benchmark": "recall_index",
+        "messages": messages,
+        "n_features": n_features,
+        "k": k,
+        "add_per_second": messages / add_seconds,
+        "search_p50_ms": statistics.median(latencies) * 1000,
+        "search_p95_ms": latencies[int(len(latencies) * 0.95) - 1] * 1000,
+        "matrix_bytes": index.nbytes,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--messages", type=int, default=100_000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--features", type=int, default=256)
+    parser.add_argument("-k", type=int, default=5)
+    parser.add_argument("--output", help="Write results as JSON to this file")
+    args = parser.parse_args()
+
+    result = run(args.messages, args.queries, args.features, args.k)
+    print(json.dumps(result, indent=2))
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(result, f, indent=2)
+
+if __name__ == "__main__":
+    main()
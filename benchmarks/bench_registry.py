@@ -0,0 +1,103 @@
+"""Measure the process registry at scale: insert rate, status transitions,
+indexed listing, eviction and memory per record.
+
+Usage: python benchmarks/bench_registry.py --records 1000000
+"""
+from typing import Dict, Any
+import argparse
+import gc
+import json
+import os
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.stubs import install_stubs
+
+install_stubs()
+
+from process import ProcessRegistry, ProcessStatus
+
+def _timed(fn) -> float:
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+def make_record(registry: ProcessRegistry, created_at: datetime) -> Dict[str, Any]:
+    return {
+        "id": registry.new_id(),
+        "task": {},
+        "tenant": "default",
+        "status": ProcessStatus.PENDING,
+        "created_at": created_at,
+        "updated_at": created_at,
+        "result": None,
+        "error": None,
+    }
+
+def measure_bytes(count: int) -> float:
+    registry = ProcessRegistry()
+    base = datetime.now()
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    for i in range(count):
+        registry.add(make_record(registry, base + timedelta(microseconds=i)))
+    used = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    return used / count
+
+def run(count: int, max_records: int) -> Dict[str, Any]:
+    registry = ProcessRegistry(max_records=None)
+    base = datetime.now()
+    insert = _timed(lambda: [registry.add(make_record(registry, base + timedelta(microseconds=i)))
+                             for i in range(count)])
+    ids = list(registry)
+    assert len(set(ids)) == count, "process ids collided"
+
+    # Leave 1% pending, 1% running and finish the rest
+    def transition():
+        for n, process_id in enumerate(ids):
+            if n % 100 == 0:
+                continue
+            registry.update(process_id, ProcessStatus.RUNNING)
+            if n % 100 != 1:
+                registry.update(process_id, ProcessStatus.FAILED if n % 10 == 0 else ProcessStatus.COMPLETED)
+    update = _timed(transition)
+
+    results = {"benchmark": "process_registry", "records": count, "bytes_per_record": measure_bytes(min(count, 100_000)),
+               "insert_per_second": count / insert, "transitions_per_second": (2 * count) / update}
+    results["list_pending_seconds"] = _timed(lambda: registry.list(ProcessStatus.PENDING))
+    # The previous list_processes: a scan over every record
+    results["linear_scan_pending_seconds"] = _timed(
+        lambda: [p for p in registry.values() if p["status"] == ProcessStatus.PENDING])
+    results["list_pending_count"] = registry.count(ProcessStatus.PENDING)
+    results["list_running_page_seconds"] = _timed(lambda: registry.list(ProcessStatus.RUNNING, limit=100))
+    middle = base + timedelta(microseconds=count // 2)
+    results["list_time_range_seconds"] = _timed(
+        lambda: registry.list(since=middle, until=middle + timedelta(microseconds=1000)))
+
+    registry.max_records = max_records
+    results["evict_seconds"] = _timed(registry.evict)
+    results["evicted"] = registry.evictions
+    results["retained"] = len(registry)
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--records", type=int, default=1_000_000)
+    parser.add_argument("--max-records", type=int, default=100_000, help="Size bound applied before the eviction pass")
+    parser.add_argument("--output", help="Write results as JSON to this file")
+    args = parser.parse_args()
+
+    result = run(args.records, args.max_records)
+    print(json.dumps(result, indent=2))
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(result, f, indent=2)
+
+if __name__ == "__main__":
+    main()
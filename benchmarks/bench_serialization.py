@@ -0,0 +1,76 @@
+"""Compare memory snapshot formats: file size, save time and load time.
+
+Usage: python benchmarks/bench_serialization.py --messages 100000
+"""
+from typing import Dict, List, Any
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.serialization import JSONSerializer, BinarySerializer, load_snapshot
+
+KEY = "messages"
+
+def make_messages(count: int) -> List[Dict[str, Any]]:
+    # Shaped like LangChain's msg.dict() output, which memory.py persists
+    return [{
+        "content": f"Message {i}: please summarise the quarterly report and list open action items.",
+        "additional_kwargs": {},
+        "response_metadata": {},
+        "type": "human" if i % 2 == 0 else "ai",
+        "name": None,
+        "id": None,
+        "example": False,
+    } for i in range(count)]
+
+def _timed(fn) -> float:
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+def run(count: int, repeat: int) -> Dict[str, Any]:
+    messages = make_messages(count)
+    extra = {"context": {"user": "bench"}}
+    serializers = {
+        "json": JSONSerializer(),
+        "binary": BinarySerializer(None),
+        "binary-zlib": BinarySerializer("zlib"),
+        "binary-lzma": BinarySerializer("lzma"),
+    }
+    workdir = tempfile.mkdtemp(prefix="bench-serialization-")
+    results = {"benchmark": "serialization", "messages": count, "formats": {}}
+    try:
+        for name, serializer in serializers.items():
+            path = os.path.join(workdir, f"memory.{name}")
+            save = min(_timed(lambda: serializer.dump(path, KEY, messages, extra, fsync=False)) for _ in range(repeat))
+            load = min(_timed(lambda: load_snapshot(path, KEY)) for _ in range(repeat))
+            results["formats"][name] = {
+                "bytes": os.path.getsize(path),
+                "save_seconds": save,
+                "load_seconds": load,
+            }
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--messages", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", help="Write results as JSON to this file")
+    args = parser.parse_args()
+
+    result = run(args.messages, args.repeat)
+    print(json.dumps(result, indent=2))
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(result, f, indent=2)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""Measure durable task queue throughput with and without write batching.
+
+Compares committing every enqueue / ack on its own against the queue's
+batched commits, then runs a full claim / complete cycle.
+
+Usage: python benchmarks/bench_taskqueue.py --tasks 20000
+"""
+from typing import Dict, Any
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from taskqueue import SQLiteTaskQueue
+
+def run(tasks: int, batch_size: int, claim_size: int, synchronous: str) -> Dict[str, Any]:
+    workdir = tempfile.mkdtemp(prefix="bench-taskqueue-")
+    results = {"benchmark": "taskqueue", "tasks": tasks, "batch_size": batch_size, "synchronous": synchronous}
+    try:
+        for mode in ("per_task", "batched"):
+            store = SQLiteTaskQueue(os.path.join(workdir, f"{mode}.db"), batch_size=batch_size,
+                                    synchronous=synchronous)
+            start = time.perf_counter()
+            for i in range(tasks):
+                store.enqueue(f"task_{i}", {"n": i})
+                if mode == "per_task":
+                    store.flush()
+            store.flush()
+            enqueue = time.perf_counter() - start
+
+            start = time.perf_counter()
+            done = 0
+            while done < tasks:
+                claimed = store.claim("bench", claim_size if mode == "batched" else 1)
+                for row in claimed:
+                    store.complete(row["id"], "bench", row["task"]["n"])
+                    if mode == "per_task":
+                        store.flush()
+                done += len(claimed)
+            store.flush()
+            cycle = time.perf_counter() - start
+            assert store.stats()["done"] == tasks
+            store.close()
+            results[mode] = {"enqueue_per_second": tasks / enqueue, "claim_complete_per_second": tasks / cycle}
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tasks", type=int, default=20_000)
+    parser.add_argument("--batch-size", type=int, default=256)
+    parser.add_argument("--claim-size", type=int, default=64)
+    parser.add_argument("--synchronous", choices=["OFF", "NORMAL", "FULL"], default="FULL",
+                        help="SQLite synchronous level; FULL fsyncs every commit")
+    parser.add_argument("--output", help="Write results as JSON to this file")
+    args = parser.parse_args()
+
+    result = run(args.tasks, args.batch_size, args.claim_size, args.synchronous)
+    print(json.dumps(result, indent=2))
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(result, f, indent=2)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""Measure tools.py import time and time to the first tool response.
+
+Each mode runs in a fresh interpreter:
+  eager  import tools, then do what the module used to do at import:
+         import PraisonAI tools, Playwright, requests and Embassai and build
+         every tool, then call --tool
+  lazy   import tools, then call --tool once (building only that tool)
+  warm   import tools, warm --tool on a background thread while the caller
+         does --startup-ms of other start-up work, then call it
+  app    import app and run app.main() up to the agent's run(), then call
+         --tool through the tools the agent was given
+Dependencies that are not installed are replaced by stand-ins costing
+--import-ms to import and --build-ms per PraisonAI tool.
+
+Usage: python benchmarks/bench_tools.py --runs 5 --tool search --import-ms 300 --build-ms 50
+"""
+from typing import Dict, List, Any
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def child(mode: str, tool: str, import_ms: float, build_ms: float, startup_ms: float) -> Dict[str, Any]:
+    sys.path.insert(0, ROOT)
+    from benchmarks.stubs import install_tool_stubs
+    stubbed = install_tool_stubs(import_ms, build_ms)
+    start = time.perf_counter()
+    if mode == "app":
+        import app
+    import tools
+    imported = time.perf_counter()
+    handle = None
+    if mode == "eager":
+        import embassai, playwright.async_api, requests  # noqa: F401
+        tools.warmup_tools(tools.PRAISONAI_TOOLS, background=False)
+        for name in ("web_search", "file_system", "api"):
+            tools.get_tool_by_name(name)
+    elif mode == "warm":
+        tools.warmup_tools([tool])
+        time.sleep(startup_ms / 1000)
+    elif mode == "app":
+        app.main()
+        loaded = sys.modules["praisonai.agent"].Agent.loaded
+        if tool in tools.PRAISONAI_TOOLS:
+            handle = loaded[list(tools.PRAISONAI_TOOLS).index(tool)]
+    ready = time.perf_counter()
+    built_at_ready = tools.TOOL_REGISTRY.stats()["built"]
+    modules_at_ready = sorted(m for m in ("aiohttp", "requests", "playwright", "praisonai.tools") if m in sys.modules)
+    (handle or tools.get_tool_by_name(tool))._run("benchmark")
+    responded = time.perf_counter()
+    return {
+        "mode": mode,
+        "tool": tool,
+        "stubbed": stubbed,
+        "import_ms": (imported - start) * 1000,
+        "ready_ms": (ready - start) * 1000,
+        # From importing tools until the first response returned
+        "first_response_ms": (responded - start) * 1000,
+        "first_call_ms": (responded - ready) * 1000,
+        "tools_built_when_ready": built_at_ready,
+        "heavy_modules_when_ready": modules_at_ready,
+        "heavy_modules_loaded": sorted(m for m in ("aiohttp", "requests", "playwright", "praisonai.tools")
+                                       if m in sys.modules),
+    }
+
+def run(mode: str, args) -> Dict[str, Any]:
+    output = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), "--child", mode, "--tool", args.tool, "--import-ms", str(args.import_ms),
+         "--build-ms", str(args.build_ms), "--startup-ms", str(args.startup_ms)],
+        capture_output=True, text=True, check=True, cwd=ROOT,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--tool", default="search", help="Tool whose first response is timed")
+    parser.add_argument("--import-ms", type=float, default=300)
+    parser.add_argument("--build-ms", type=float, default=50)
+    parser.add_argument("--startup-ms", type=float, default=400, help="Other start-up work in warm mode")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    parser.add_argument("--output", help="Write results as JSON to this file")
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(child(args.child, args.tool, args.import_ms, args.build_ms, args.startup_ms)))
+        return
+    results = []
+    for mode in ("eager", "lazy", "warm", "app"):
+        runs: List[Dict[str, Any]] = [run(mode, args) for _ in range(args.runs)]
+        result = {**runs[-1], **{key: statistics.median(r[key] for r in runs)
+                                 for key in ("import_ms", "ready_ms", "first_response_ms", "first_call_ms")}}
+        results.append(result)
+        print(json.dumps(result))
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({"benchmark": "tool_registry", "runs": args.runs, "tool": args.tool, "import_ms": args.import_ms,
+                       "build_ms": args.build_ms, "results": results}, f, indent=2)
+
+if __name__ == "__main__":
+    main()
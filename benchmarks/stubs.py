@@ -0,0 +1,173 @@
+"""Offline stand-ins for optional dependencies used by the benchmarks."""
+from typing import Dict, Any
+import asyncio
+import importlib.util
+import sys
+import time
+import types
+
+def install_stubs() -> bool:
+    """Provide minimal LangChain / praisonai_tools stand-ins if they are missing.
+
+    Returns whether stand-ins were installed.
+    """
+    try:
+        import langchain.memory  # noqa: F401
+        import langchain.schema  # noqa: F401
+        import praisonai_tools  # noqa: F401
+        return False
+    except ImportError:
+        pass
+
+    class BaseMessage:
+        def __init__(self, content: str, type: str = "human", **kwargs):
+            self.content = content
+            self.type = type
+            self.additional_kwargs = kwargs.get("additional_kwargs", {})
+
+        def dict(self) -> Dict[str, Any]:
+            return {"content": self.content, "type": self.type, "additional_kwargs": self.additional_kwargs}
+
+        @classmethod
+        def parse_obj(cls, data: Dict[str, Any]) -> "BaseMessage":
+            return cls(**data)
+
+    class SystemMessage(BaseMessage):
+        def __init__(self, content: str, **kwargs):
+            super().__init__(content, "system", **kwargs)
+
+    class ChatMessageHistory:
+        def __init__(self):
+            self.messages = []
+
+        def add_message(self, message: BaseMessage):
+            self.messages.append(message)
+
+    class ConversationBufferMemory:
+        def __init__(self, **kwargs):
+            self.chat_memory = ChatMessageHistory()
+
+        def clear(self):
+            self.chat_memory.messages = []
+
+    class MemoryTool:
+        def __init__(self):
+            self._memory = {}
+
+        def add_memory(self, key, value):
+            self._memory[key] = value
+
+        def get_memory(self, key):
+            return self._memory.get(key)
+
+        def clear_memory(self):
+            self._memory = {}
+
+    class ProcessTool:
+        async def execute_task(self, task: Dict[str, Any]) -> Any:
+            await asyncio.sleep(task.get("sleep", 0))
+            return {"task": task}
+
+    langchain = types.ModuleType("langchain")
+    memory_module = types.ModuleType("langchain.memory")
+    memory_module.ConversationBufferMemory = ConversationBufferMemory
+    schema_module = types.ModuleType("langchain.schema")
+    schema_module.BaseMessage = BaseMessage
+    schema_module.SystemMessage = SystemMessage
+    langchain.memory = memory_module
+    langchain.schema = schema_module
+    praisonai_tools = types.ModuleType("praisonai_tools")
+    praisonai_tools.MemoryTool = MemoryTool
+    praisonai_tools.ProcessTool = ProcessTool
+    sys.modules.update({
+        "langchain": langchain, "langchain.memory": memory_module,
+        "langchain.schema": schema_module, "praisonai_tools": praisonai_tools,
+    })
+    return True
+
+class _SlowModuleFinder:
+    """Meta path finder that builds stand-in modules, sleeping to mimic their import cost."""
+
+    def __init__(self, modules: Dict[str, Any], import_seconds: float):
+        self.modules = modules
+        self.import_seconds = import_seconds
+
+    def find_spec(self, name, path=None, target=None):
+        if name not in self.modules:
+            return None
+        return importlib.util.spec_from_loader(name, self, is_package="." not in name)
+
+    def create_module(self, spec):
+        return None
+
+    def exec_module(self, module):
+        if self.modules[module.__name__]:
+            time.sleep(self.import_seconds)
+        module.__dict__.update(self.modules[module.__name__])
+
+def install_tool_stubs(import_ms: float = 300.0, build_ms: float = 50.0) -> bool:
+    """Provide LangChain BaseTool, PraisonAI agent and tools, and Embassai stand-ins if they are missing.
+
+    Importing ``praisonai.agent``, ``praisonai.tools`` or ``embassai`` sleeps
+    ``import_ms`` and building each PraisonAI tool sleeps ``build_ms``,
+    standing in for their real costs. The stand-in ``Agent`` keeps the tools
+    passed to ``load_tools`` in ``Agent.loaded``. Returns whether stand-ins
+    were installed.
+    """
+    try:
+        import langchain.tools  # noqa: F401
+        import praisonai.tools  # noqa: F401
+        import embassai  # noqa: F401
+        return False
+    except ImportError:
+        pass
+    install_stubs()
+
+    class BaseTool:
+        name = ""
+        description = ""
+
+        def run(self, *args, **kwargs):
+            return self._run(*args, **kwargs)
+
+    def praisonai_tool(class_name: str):
+        def __init__(self):
+            time.sleep(build_ms / 1000)
+
+        def _run(self, *args, **kwargs):
+            return {"tool": class_name, "args": args}
+        return type(class_name, (BaseTool,), {"name": class_name, "__init__": __init__, "_run": _run})
+
+    class Agent:
+        loaded: list = []
+
+        @classmethod
+        def from_yaml(cls, path: str, agent_name: str = None) -> "Agent":
+            return cls()
+
+        def load_tools(self, tools):
+            Agent.loaded = list(tools)
+
+        def run(self):
+            pass
+
+    class EmbassaiClient:
+        def encrypt(self, data):
+            return data
+
+        def decrypt(self, data):
+            return data
+
+    tool_classes = ("BrowserTool", "SearchTool", "CalculatorTool", "FileReaderTool", "TerminalTool",
+                    "JSONExplorerTool", "CodeInterpreterTool")
+    tools_module = types.ModuleType("langchain.tools")
+    tools_module.BaseTool = BaseTool
+    sys.modules["langchain.tools"] = tools_module
+    sys.modules["langchain"].tools = tools_module
+    sys.meta_path.insert(0, _SlowModuleFinder({
+        "praisonai": {},
+        "praisonai.agent": {"Agent": Agent},
+        "praisonai.tools": {name: praisonai_tool(name) for name in tool_classes},
+        "embassai": {"EmbassaiClient": EmbassaiClient},
+    }, import_ms / 1000))
+    return True
@@ -0,0 +1,208 @@
+from typing import Dict, List, Any, AsyncIterator, Optional
+from contextlib import asynccontextmanager
+import asyncio
+import atexit
+import time
+import weakref
+from playwright.async_api import async_playwright
+
+class _Lease:
+    __slots__ = ("context", "page", "uses", "checked_at", "broken")
+
+    def __init__(self, context, page):
+        self.context = context
+        self.page = page
+        self.uses = 0
+        self.checked_at = time.monotonic()
+        self.broken = False
+
+class BrowserPool:
+    """One long-lived browser with a bounded pool of reusable contexts.
+
+    ``page()`` leases an isolated browser context and its page; at most
+    ``max_contexts`` are leased at once and further callers wait. On
+    return the page is reset (storage and cookies cleared, navigated to
+    ``about:blank``) and the context goes back to the idle pool, unless it
+    failed or has served ``max_uses`` leases, in which case it is closed
+    and a fresh one is created on demand. Idle contexts unused for
+    ``health_interval`` seconds are probed before reuse, and the browser
+    is relaunched if it has disconnected or crashed.
+
+    Playwright objects belong to the event loop that created them, so a
+    pool must be used from one loop; see ``get_browser_pool``.
+    """
+
+    def __init__(self, max_contexts: int = 4, max_uses: int = 50, browser_type: str = "chromium",
+                 launch_options: Optional[Dict[str, Any]] = None,
+                 context_options: Optional[Dict[str, Any]] = None,
+                 timeout: float = 30.0, health_interval: float = 30.0):
+        self.max_contexts = max_contexts
+        self.max_uses = max_uses
+        self.browser_type = browser_type
+        self.launch_options = launch_options or {}
+        self.context_options = context_options or {}
+        self.timeout = timeout
+        self.health_interval = health_interval
+        self._playwright = None
+        self._browser = None
+        self._idle: List[_Lease] = []
+        self._leased = 0
+        self._slots = asyncio.Semaphore(max_contexts)
+        self._launch_lock = asyncio.Lock()
+        self.closed = False
+        self.counters = {"launches": 0, "contexts_created": 0, "contexts_recycled": 0,
+                         "leases": 0, "health_failures": 0}
+
+    async def __aenter__(self) -> "BrowserPool":
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def start(self):
+        await self._ensure_browser()
+
+    async def _ensure_browser(self):
+        async with self._launch_lock:
+            if self.closed:
+                raise RuntimeError("Browser pool is closed")
+            if self._browser is not None and self._browser.is_connected():
+                return
+            # Contexts of a dead browser cannot be reused
+            self._idle.clear()
+            if self._playwright is None:
+                self._playwright = await async_playwright().start()
+            self._browser = await getattr(self._playwright, self.browser_type).launch(**self.launch_options)
+            self.counters["launches"] += 1
+
+    async def _new_lease(self) -> _Lease:
+        await self._ensure_browser()
+        context = await self._browser.new_context(**self.context_options)
+        context.set_default_timeout(self.timeout * 1000)
+        self.counters["contexts_created"] += 1
+        return _Lease(context, await context.new_page())
+
+    async def _healthy(self, lease: _Lease) -> bool:
+        if lease.page.is_closed() or not self._browser.is_connected():
+            return False
+        if time.monotonic() - lease.checked_at < self.health_interval:
+            return True
+        try:
+            await asyncio.wait_for(lease.page.evaluate("1"), timeout=min(self.timeout, 5.0))
+        except Exception:
+            return False
+        lease.checked_at = time.monotonic()
+        return True
+
+    async def _checkout(self) -> _Lease:
+        while self._idle:
+            lease = self._idle.pop()
+            if await self._healthy(lease):
+                return lease
+            self.counters["health_failures"] += 1
+            await self._discard(lease)
+        return await self._new_lease()
+
+    async def _checkin(self, lease: _Lease):
+        lease.uses += 1
+        if lease.broken or self.closed or lease.uses >= self.max_uses:
+            self.counters["contexts_recycled"] += 1
+            await self._discard(lease)
+            return
+        try:
+            await lease.page.evaluate("() => { try { localStorage.clear(); sessionStorage.clear(); } catch (e) {} }")
+            await lease.context.clear_cookies()
+            await lease.page.goto("about:blank")
+        except Exception:
+            self.counters["contexts_recycled"] += 1
+            await self._discard(lease)
+            return
+        lease.checked_at = time.monotonic()
+        self._idle.append(lease)
+
+    async def _discard(self, lease: _Lease):
+        try:
+            await lease.context.close()
+        except Exception:
+            pass  # Already gone with its browser
+
+    @asynccontextmanager
+    async def page(self) -> AsyncIterator[Any]:
+        """Lease a page in an isolated context for the duration of the block."""
+        async with self._slots:
+            lease = await self._checkout()
+            self._leased += 1
+            self.counters["leases"] += 1
+            try:
+                yield lease.page
+            except BaseException:
+                # State after a failed or cancelled action is unknown; don't reuse it
+                lease.broken = True
+                raise
+            finally:
+                self._leased -= 1
+                await asyncio.shield(self._checkin(lease))
+
+    async def close(self):
+        """Close every context, the browser and the Playwright driver."""
+        self.closed = True
+        idle, self._idle = self._idle, []
+        for lease in idle:
+            await self._discard(lease)
+        if self._browser is not None:
+            try:
+                await self._browser.close()
+            except Exception:
+                pass
+            self._browser = None
+        if self._playwright is not None:
+            await self._playwright.stop()
+            self._playwright = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            **self.counters,
+            "max_contexts": self.max_contexts,
+            "leased": self._leased,
+            "idle": len(self._idle),
+            "connected": self._browser is not None and self._browser.is_connected(),
+        }
+
+_pools: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, BrowserPool]" = weakref.WeakKeyDictionary()
+_keepers: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Task]" = weakref.WeakKeyDictionary()
+
+async def _close_with_loop(pool: BrowserPool):
+    """Close the pool when its loop shuts down; asyncio.run cancels leftover tasks before closing."""
+    try:
+        await asyncio.get_running_loop().create_future()
+    finally:
+        await pool.close()
+
+def get_browser_pool() -> BrowserPool:
+    """Shared BrowserPool for the running event loop (e.g. for tools).
+
+    The pool is closed, and its browser with it, when the loop shuts down,
+    so a caller running each call under its own ``asyncio.run`` does not
+    leave a browser behind per call.
+    """
+    loop = asyncio.get_running_loop()
+    pool = _pools.get(loop)
+    if pool is None or pool.closed:
+        keeper = _keepers.pop(loop, None)
+        if keeper is not None:
+            keeper.cancel()
+        pool = _pools[loop] = BrowserPool()
+        _keepers[loop] = loop.create_task(_close_with_loop(pool))
+    return pool
+
+@atexit.register
+def _close_pools():
+    # Pools whose loop was left open without cancelling its tasks
+    for loop, keeper in list(_keepers.items()):
+        if not keeper.done() and not loop.is_closed() and not loop.is_running():
+            keeper.cancel()
+            try:
+                loop.run_until_complete(asyncio.gather(keeper, return_exceptions=True))
+            except Exception:
+                pass
@@ -2,13 +2,35 @@ from typing import Dict, Any, List, Optional
 import base64
 from datetime import datetime
 import json
+import sys
+import time
 from .security import SecurityManager
 
+class ChatRecord:
+    """Compact chat history entry with an integer (epoch ms) timestamp."""
+
+    __slots__ = ("type", "secure", "data", "decrypted", "ts")
+
+    def __init__(self, type: str, secure: bool, data: Any, decrypted: Optional[str] = None):
+        self.type = sys.intern(type)
+        self.secure = secure
+        self.data = data
+        self.decrypted = decrypted
+        self.ts = time.time_ns() // 1_000_000
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Render the entry in the original chat history dict format."""
+        entry = {"type": self.type, "secure": self.secure, "data": self.data}
+        if self.decrypted is not None:
+            entry["decrypted"] = self.decrypted
+        entry["timestamp"] = datetime.fromtimestamp(self.ts / 1000).isoformat()
+        return entry
+
 class SecureChatManager:
     def __init__(self, embassai_config: Dict[str, str]):
         self.embassai_config = embassai_config
         self.security = SecurityManager()
-        self.chat_history: List[Dict[str, Any]] = []
+        self.chat_history: List[ChatRecord] = []
     
     def _encrypt_message(self, message: str) -> Dict[str, Any]:
         """Encrypt a message using Embassai encryption."""
@@ -48,43 +70,22 @@ class SecureChatManager:
         """Send a message, optionally encrypting it."""
         if secure:
             encrypted_message = self._encrypt_message(message)
-            self.chat_history.append({
-                "type": "sent",
-                "secure": True,
-                "data": encrypted_message,
-                "timestamp": datetime.now().isoformat()
-            })
+            self.chat_history.append(ChatRecord("sent", True, encrypted_message))
             return encrypted_message
         else:
-            self.chat_history.append({
-                "type": "sent",
-                "secure": False,
-                "data": message,
-                "timestamp": datetime.now().isoformat()
-            })
+            self.chat_history.append(ChatRecord("sent", False, message))
             return {"data": message}
     
     async def receive_message(self, message: Dict[str, Any]) -> str:
         """Receive and decrypt a message."""
         if message.get("encrypted"):
             decrypted = self._decrypt_message(message)
-            self.chat_history.append({
-                "type": "received",
-                "secure": True,
-                "data": message,
-                "decrypted": decrypted,
-                "timestamp": datetime.now().isoformat()
-            })
+            self.chat_history.append(ChatRecord("received", True, message, decrypted))
             return decrypted
         else:
-            self.chat_history.append({
-                "type": "received",
-                "secure": False,
-                "data": message.get("data", ""),
-                "timestamp": datetime.now().isoformat()
-            })
+            self.chat_history.append(ChatRecord("received", False, message.get("data", "")))
             return message.get("data", "")
     
     def get_chat_history(self) -> List[Dict[str, Any]]:
-        """Get the chat history with decrypted messages."""
-        return self.chat_history 
\ No newline at end of file
+        """Get the chat history with decrypted messages, as a new list of dicts."""
+        return [record.to_dict() for record in self.chat_history]
\ No newline at end of file
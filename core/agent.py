@@ -224,7 +224,14 @@ class JuiciAgent:
     
     async def _handle_execute(self, request: Dict[str, Any]) -> Dict[str, Any]:
         """Handle workflow execution tasks"""
-        return {"status": "executing", "request": request}
+        try:
+            if "rerun" in request:
+                run = await self.workflow.rerun(request["rerun"], request.get("from_steps"))
+            else:
+                run = await self.workflow.run(request.get("workflow", request), fail_fast=request.get("fail_fast", False))
+        except (KeyError, ValueError) as e:
+            return {"error": f"Invalid workflow: {e}"}
+        return {"status": run["status"], "run": self.workflow.summarize(run)}
     
     async def _handle_review(self, request: Dict[str, Any]) -> Dict[str, Any]:
         """Handle task review and optimization"""
@@ -0,0 +1,185 @@
+from typing import Dict, List, Any, Iterable, Iterator, Optional
+from array import array
+import json
+import os
+import threading
+
+BLOCK_SIZE = 64 * 1024
+
+def _header(key: str) -> bytes:
+    return ("{" + json.dumps(key) + ": [\n").encode('utf-8')
+
+def write_line_json(path: str, key: str, items: Iterable[Any], extra: Dict[str, Any],
+                    cold: Optional["LineJSONFile"] = None, fsync: bool = True):
+    """Atomically write ``{key: [...items], **extra}`` with one item per line.
+
+    The result is ordinary JSON, but because every item sits on its own line
+    and the other keys come after the array, ``LineJSONFile`` can read the
+    tail or any page without parsing the rest. Items still on disk in
+    ``cold`` (everything before ``cold.cold_end``) are copied byte for byte.
+    """
+    tmp_path = f"{path}.tmp.{os.getpid()}.{threading.get_ident()}"
+    with open(tmp_path, 'wb') as f:
+        f.write(_header(key))
+        written = cold.copy_prefix(f) if cold else False
+        for item in items:
+            if written:
+                f.write(b",\n")
+            f.write(json.dumps(item).encode('utf-8'))
+            written = True
+        if written:
+            f.write(b"\n")
+        trailer = json.dumps(extra)[1:] if extra else "}"
+        f.write((("], " if extra else "]") + trailer + "\n").encode('utf-8'))
+        f.flush()
+        if fsync:
+            os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+    if cold:
+        cold.reopen()
+
+class LineJSONFile:
+    """Lazy reader for files written by ``write_line_json``.
+
+    Opening reads only the header and the trailing keys. ``load_tail``
+    parses the last N items; older items are paged in with ``read`` using
+    a line offset index that is built on first use without JSON parsing.
+    Raises ValueError if the file was not written in this layout.
+    """
+
+    def __init__(self, path: str, key: str):
+        self.path = path
+        self.key = key
+        self._header_len = len(_header(key))
+        self._lock = threading.Lock()
+        self._offsets: Optional[array] = None
+        self._count: Optional[int] = None
+        self._file = open(path, 'rb')
+        try:
+            if self._file.read(self._header_len) != _header(key):
+                raise ValueError(f"{path} is not in line-delimited layout")
+            size = os.fstat(self._file.fileno()).st_size
+            self.trailer_start = self._rfind_newline(size - 1) + 1
+            self._file.seek(self.trailer_start)
+            trailer = self._file.read().decode('utf-8').strip()
+            if not trailer.startswith("]"):
+                raise ValueError(f"{path} is not in line-delimited layout")
+            rest = trailer[1:].lstrip(", ")
+            self.extra: Dict[str, Any] = json.loads("{" + rest) if rest != "}" else {}
+        except Exception:
+            self._file.close()
+            raise
+        # Items before cold_end are left on disk; load_tail moves it back
+        self.cold_end = self.trailer_start
+
+    def reopen(self):
+        """Reopen the path after it was rewritten with the same cold prefix."""
+        with self._lock:
+            self._file.close()
+            self._file = open(self.path, 'rb')
+            size = os.fstat(self._file.fileno()).st_size
+            self.trailer_start = self._rfind_newline(size - 1) + 1
+
+    def close(self):
+        self._file.close()
+
+    def _rfind_newline(self, end: int) -> int:
+        """Offset of the last newline before ``end``, or header_len - 1."""
+        position = end
+        while position > self._header_len:
+            start = max(self._header_len, position - BLOCK_SIZE)
+            self._file.seek(start)
+            found = self._file.read(position - start).rfind(b"\n")
+            if found >= 0:
+                return start + found
+            position = start
+        return self._header_len - 1
+
+    def load_tail(self, n: int) -> List[Dict[str, Any]]:
+        """Parse the last n items and leave everything before them cold."""
+        with self._lock:
+            end = self.trailer_start
+            start = end
+            for _ in range(n):
+                if start <= self._header_len:
+                    break
+                start = self._rfind_newline(start - 1) + 1
+            self._file.seek(start)
+            lines = self._file.read(end - start).splitlines()
+            self.cold_end = start
+            self._count = None
+        return [json.loads(line.rstrip(b",")) for line in lines if line]
+
+    def copy_prefix(self, out) -> bool:
+        """Stream the cold items, without the final separator, into a file.
+
+        Returns whether anything was written.
+        """
+        with self._lock:
+            total = self.cold_end - self._header_len
+            if total <= 0:
+                return False
+            self._file.seek(self.cold_end - 2)
+            total -= 2 if self._file.read(2) == b",\n" else 1
+            self._file.seek(self._header_len)
+            while total > 0:
+                block = self._file.read(min(BLOCK_SIZE, total))
+                out.write(block)
+                total -= len(block)
+            return True
+
+    def _build_index(self):
+        """Record the start offset of every cold item line. Caller holds the lock."""
+        offsets = array('q')
+        line_start = position = self._header_len
+        self._file.seek(position)
+        while position < self.cold_end:
+            block = self._file.read(min(BLOCK_SIZE, self.cold_end - position))
+            if not block:
+                break
+            found = block.find(b"\n")
+            while found >= 0:
+                offsets.append(line_start)
+                line_start = position + found + 1
+                found = block.find(b"\n", found + 1)
+            position += len(block)
+        self._offsets = offsets
+        self._count = len(offsets)
+
+    def __len__(self) -> int:
+        """Number of cold items (those not loaded by load_tail)."""
+        with self._lock:
+            if self._count is None:
+                self._build_index()
+            return self._count
+
+    def read(self, start: int, stop: int) -> List[Dict[str, Any]]:
+        """Parse cold items in [start, stop)."""
+        with self._lock:
+            if self._offsets is None or self._count is None:
+                self._build_index()
+            stop = min(stop, self._count)
+            if start >= stop:
+                return []
+            begin = self._offsets[start]
+            end = self._offsets[stop] if stop < self._count else self.cold_end
+            self._file.seek(begin)
+            lines = self._file.read(end - begin).splitlines()
+        return [json.loads(line.rstrip(b",")) for line in lines if line]
+
+    def iter_items(self, page_size: int = 1000) -> Iterator[Dict[str, Any]]:
+        """Iterate cold items oldest first, one page in memory at a time."""
+        start = 0
+        total = len(self)
+        while start < total:
+            yield from self.read(start, start + page_size)
+            start += page_size
+
+def open_line_json(path: str, key: str) -> Optional[LineJSONFile]:
+    """Open a lazy reader, or None if the file is missing or in another layout."""
+    if not os.path.exists(path):
+        return None
+    try:
+        return LineJSONFile(path, key)
+    except ValueError:
+        return None
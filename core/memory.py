@@ -1,17 +1,55 @@
-from typing import Dict, List, Any
-import json
+from typing import Dict, List, Any, Iterator, Optional
 import os
+from .lazy import LineJSONFile, open_line_json
+from .messages import Message, MessageStore
+from .serialization import JSONSerializer, load_snapshot
+from .storage import MemoryStorage, slice_history
+from .tiered import TieredMemory
+
+MESSAGE_OVERHEAD = 200
+
+def estimate_message_bytes(message: Dict[str, Any]) -> int:
+    """Rough in-memory footprint of a message dict"""
+    return MESSAGE_OVERHEAD + len(message.get("role", "")) + len(message.get("content", ""))
 
 class MemoryManager:
-    def __init__(self):
+    def __init__(self, storage: Optional[MemoryStorage] = None, tiered: Optional[TieredMemory] = None,
+                 session_id: str = "default", recall_index=None, compact: bool = False, columnar: bool = False,
+                 serializer=None):
+        # Compact mode keeps history in a MessageStore of slotted records
+        # (optionally column-backed) that reads like the list of dicts
+        self.compact = compact or columnar
+        self.columnar = columnar
         self.context = {}
-        self.conversation_history = []
+        self.conversation_history = self._new_history()
         self.memory_file = "memory.json"
+        # Snapshot format for memory_file; loading detects the format
+        self.serializer = serializer or JSONSerializer()
+        self.storage = storage
+        self.session_id = session_id
+        # Optional core.recall.RecallIndex for semantic lookup of past turns
+        self.recall_index = recall_index
+        # In tiered mode conversation_history only holds the hot window
+        self.tiered = tiered
+        # In lazy mode conversation_history only holds the newest messages;
+        # the _cold_count messages before them stay on disk
+        self._cold: Optional[LineJSONFile] = None
+        # Approximate bytes held by conversation_history, for cache sizing
+        self.approx_bytes = 0
+    
+    def _new_history(self, messages: List[Dict[str, str]] = ()) -> List[Dict[str, str]]:
+        """Create the container for conversation history"""
+        if self.compact:
+            return MessageStore(messages, columnar=self.columnar)
+        return list(messages)
     
     def add_context(self, key: str, value: Any):
         """Add context to memory"""
         self.context[key] = value
-        self._save_memory()
+        if self.storage:
+            self.storage.set_context(key, value)
+        else:
+            self._save_memory()
     
     def get_context(self, key: str) -> Any:
         """Get context from memory"""
@@ -20,38 +58,166 @@ class MemoryManager:
     def clear_context(self):
         """Clear all context"""
         self.context = {}
-        self._save_memory()
+        if self.storage:
+            self.storage.clear_context()
+        else:
+            self._save_memory()
     
     def add_message(self, role: str, content: str):
         """Add a message to conversation history"""
-        self.conversation_history.append({
-            "role": role,
-            "content": content
-        })
-        self._save_memory()
-    
-    def get_conversation_history(self) -> List[Dict[str, str]]:
-        """Get conversation history"""
+        if self.compact:
+            message = Message(role, content)
+        else:
+            message = {
+                "role": role,
+                "content": content
+            }
+        self.conversation_history.append(message)
+        self.approx_bytes += estimate_message_bytes(message)
+        if self.recall_index is not None:
+            self.recall_index.add(content, message)
+        if self.tiered:
+            spilled = self.tiered.add(message)
+            if spilled:
+                del self.conversation_history[:len(spilled)]
+                self.approx_bytes -= sum(estimate_message_bytes(m) for m in spilled)
+        if self.storage:
+            self.storage.append_message(message.to_dict() if self.compact else message)
+        else:
+            self._save_memory()
+    
+    def get_conversation_history(self, session: Optional[str] = None, since: Optional[int] = None,
+                                 limit: Optional[int] = None) -> List[Dict[str, str]]:
+        """Get conversation history, optionally the messages after `since` capped at `limit`
+
+        In lazy mode a call without arguments returns only the messages held
+        in memory; `since`/`limit` page through the whole history.
+        """
+        if self.storage and self.storage.range_reads:
+            if session is not None or since is not None or limit is not None:
+                return self.storage.read_messages(since, limit, session_id=session or self.session_id)
+        elif session is not None and session != self.session_id:
+            raise ValueError(f"Memory storage does not hold session {session}")
+        if self._cold is None or (since is None and limit is None):
+            return self._as_dicts(slice_history(self.conversation_history, since, limit))
+        cold_count = len(self._cold)
+        total = cold_count + len(self.conversation_history)
+        if since is not None:
+            start = since
+            stop = total if limit is None else min(total, since + limit)
+        else:
+            start = max(0, total - limit)
+            stop = total
+        messages = self._cold.read(start, min(stop, cold_count)) if start < cold_count else []
+        return messages + self._as_dicts(self.conversation_history[max(0, start - cold_count):max(0, stop - cold_count)])
+
+    def _as_dicts(self, messages: Any) -> List[Dict[str, str]]:
+        """Plain message dicts for callers; compact history holds Message records"""
+        if not self.compact:
+            return messages
+        if isinstance(messages, MessageStore):
+            return messages.to_dicts()
+        return [message.to_dict() if isinstance(message, Message) else message for message in messages]
+    
+    def count_messages(self) -> int:
+        """Get the total number of messages, including ones not loaded"""
+        if self.storage and self.storage.range_reads:
+            return self.storage.count_messages()
+        cold_count = len(self._cold) if self._cold is not None else 0
+        return cold_count + len(self.conversation_history)
+    
+    def iter_conversation_history(self, page_size: int = 1000) -> Iterator[Dict[str, str]]:
+        """Iterate the whole conversation history, one page in memory at a time"""
+        since = 0
+        while True:
+            page = self.get_conversation_history(since=since, limit=page_size)
+            yield from page
+            if len(page) < page_size:
+                return
+            since += len(page)
+    
+    def get_prompt_history(self) -> List[Dict[str, str]]:
+        """Get the history to send to the LLM: rolling summary plus hot window"""
+        if self.tiered:
+            summary = self.tiered.summary_message()
+            if summary:
+                return [summary] + list(self.conversation_history)
         return self.conversation_history
     
+    def recall(self, query: str, k: int = 5) -> List[Dict[str, str]]:
+        """Get the k past messages most relevant to a query"""
+        if self.recall_index is None:
+            raise ValueError("No recall index configured")
+        return [message for message, _ in self.recall_index.search(query, k)]
+    
     def clear_conversation_history(self):
         """Clear conversation history"""
-        self.conversation_history = []
-        self._save_memory()
+        self.conversation_history = self._new_history()
+        self.approx_bytes = 0
+        if self._cold is not None:
+            self._cold.close()
+            self._cold = None
+        if self.recall_index is not None:
+            self.recall_index.clear()
+        if self.tiered:
+            self.tiered.clear()
+        if self.storage:
+            self.storage.clear_messages()
+        else:
+            self._save_memory()
     
     def _save_memory(self):
-        """Save memory to file"""
-        memory_data = {
-            "context": self.context,
-            "conversation_history": self.conversation_history
-        }
-        with open(self.memory_file, 'w') as f:
-            json.dump(memory_data, f)
-    
-    def load_memory(self):
-        """Load memory from file"""
-        if os.path.exists(self.memory_file):
-            with open(self.memory_file, 'r') as f:
-                memory_data = json.load(f)
-                self.context = memory_data.get("context", {})
-                self.conversation_history = memory_data.get("conversation_history", []) 
\ No newline at end of file
+        """Save memory to file with the configured serializer"""
+        extra = {"context": self.context}
+        if self.tiered:
+            extra["archived"] = self.tiered.archived
+        history = self.conversation_history.iter_dicts() if self.compact else self.conversation_history
+        self.serializer.dump(self.memory_file, "conversation_history", history, extra,
+                             cold=self._cold, fsync=False)
+    
+    def load_memory(self, lazy_tail: Optional[int] = None):
+        """Load memory from file
+
+        With `lazy_tail` only the context and the last `lazy_tail` messages are
+        read up front; older messages are paged in by get_conversation_history.
+        """
+        offset = 0
+        if self._cold is not None:
+            self._cold.close()
+            self._cold = None
+        cold = None
+        if lazy_tail is not None and not self.storage:
+            cold = open_line_json(self.memory_file, "conversation_history")
+        if self.storage and lazy_tail is not None and self.storage.range_reads:
+            self.context = self.storage.load_context()
+            self.conversation_history = self.storage.read_messages(limit=lazy_tail)
+            # The tail's position in the conversation, so tiered memory can tell what it has archived
+            offset = self.storage.count_messages() - len(self.conversation_history)
+        elif self.storage:
+            self.context, self.conversation_history = self.storage.load()
+        elif cold is not None:
+            self._cold = cold
+            self.context = self._cold.extra.get("context", {})
+            self.conversation_history = self._cold.load_tail(lazy_tail)
+            offset = self._cold.extra.get("archived", 0)
+            if self.tiered:
+                offset += len(self._cold)
+        elif os.path.exists(self.memory_file):
+            memory_data, self.conversation_history = load_snapshot(self.memory_file, "conversation_history")
+            self.context = memory_data.get("context", {})
+            offset = memory_data.get("archived", 0)
+        if self.compact:
+            self.conversation_history = self._new_history(self.conversation_history)
+        if self.recall_index is not None:
+            self.recall_index.clear()
+            self.recall_index.add_many((m["content"], m) for m in self.conversation_history)
+        if self.tiered:
+            self.conversation_history = self._new_history(self.tiered.restore(self.conversation_history, offset))
+        self.approx_bytes = sum(estimate_message_bytes(m) for m in self.conversation_history)
+
+    def close(self):
+        """Flush and close the storage backend, if any"""
+        if self._cold is not None:
+            self._cold.close()
+        if self.storage:
+            self.storage.close()
\ No newline at end of file
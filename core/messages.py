@@ -0,0 +1,188 @@
+from typing import Dict, List, Any, Iterable, Iterator, Optional, Union
+from array import array
+from collections.abc import Mapping, MutableSequence
+import sys
+import time
+
+MESSAGE_KEYS = ("role", "content")
+
+# Roles are interned once and stored as small integer codes in columnar mode
+_role_codes: Dict[str, int] = {}
+_roles: List[str] = []
+
+def role_code(role: str) -> int:
+    """Return the integer code for a role, registering it if new."""
+    code = _role_codes.get(role)
+    if code is None:
+        if len(_roles) >= 256:
+            raise ValueError("Too many distinct message roles")
+        code = len(_roles)
+        _roles.append(sys.intern(role))
+        _role_codes[_roles[code]] = code
+    return code
+
+def now_ms() -> int:
+    return time.time_ns() // 1_000_000
+
+class Message(Mapping):
+    """Compact conversation message.
+
+    Uses ``__slots__``, an interned role and an integer millisecond timestamp,
+    and reads like the ``{"role": ..., "content": ...}`` dict it replaces.
+    """
+
+    __slots__ = ("role", "content", "ts")
+
+    def __init__(self, role: str, content: str, ts: Optional[int] = None):
+        self.role = _roles[role_code(role)]
+        self.content = content
+        self.ts = now_ms() if ts is None else ts
+
+    @classmethod
+    def from_dict(cls, data: Mapping) -> "Message":
+        if isinstance(data, Message):
+            return data
+        return cls(data["role"], data["content"])
+
+    def __getitem__(self, key: str) -> Any:
+        if key == "role":
+            return self.role
+        if key == "content":
+            return self.content
+        raise KeyError(key)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(MESSAGE_KEYS)
+
+    def __len__(self) -> int:
+        return len(MESSAGE_KEYS)
+
+    def __eq__(self, other: Any) -> bool:
+        if isinstance(other, Mapping):
+            return dict(self) == dict(other)
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return repr(self.to_dict())
+
+    def to_dict(self) -> Dict[str, str]:
+        return {"role": self.role, "content": self.content}
+
+class MessageStore(MutableSequence):
+    """List-like conversation history with a compact representation.
+
+    In row mode each message is a ``Message``. In columnar mode roles are
+    kept as one byte codes and timestamps as int64 in ``array`` buffers,
+    with only the content strings in a list; items are materialized as
+    ``Message`` views on access. Either way indexing, slicing, iteration,
+    ``append`` of dicts and ``del`` work like on the list of dicts.
+    """
+
+    def __init__(self, messages: Iterable[Mapping] = (), columnar: bool = False):
+        self.columnar = columnar
+        if columnar:
+            self._roles = array('B')
+            self._timestamps = array('q')
+            self._contents: List[str] = []
+        else:
+            self._rows: List[Message] = []
+        self.extend(messages)
+
+    def __len__(self) -> int:
+        return len(self._contents) if self.columnar else len(self._rows)
+
+    def _materialize(self, index: int) -> Message:
+        return Message(_roles[self._roles[index]], self._contents[index], self._timestamps[index])
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[Message, List[Message]]:
+        if not self.columnar:
+            return self._rows[index]
+        if isinstance(index, slice):
+            return [self._materialize(i) for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("message index out of range")
+        return self._materialize(index)
+
+    def __setitem__(self, index: Union[int, slice], value: Any):
+        if isinstance(index, slice):
+            # Rare for conversation history; rebuild the affected range
+            items = list(self)
+            items[index] = [Message.from_dict(v) for v in value]
+            self.clear()
+            self.extend(items)
+            return
+        message = Message.from_dict(value)
+        if not self.columnar:
+            self._rows[index] = message
+            return
+        self._roles[index] = role_code(message.role)
+        self._contents[index] = message.content
+        self._timestamps[index] = message.ts
+
+    def __delitem__(self, index: Union[int, slice]):
+        if not self.columnar:
+            del self._rows[index]
+            return
+        del self._roles[index]
+        del self._contents[index]
+        del self._timestamps[index]
+
+    def insert(self, index: int, value: Mapping):
+        message = Message.from_dict(value)
+        if not self.columnar:
+            self._rows.insert(index, message)
+            return
+        self._roles.insert(index, role_code(message.role))
+        self._contents.insert(index, message.content)
+        self._timestamps.insert(index, message.ts)
+
+    def append(self, value: Mapping):
+        message = Message.from_dict(value)
+        if not self.columnar:
+            self._rows.append(message)
+            return
+        self._roles.append(role_code(message.role))
+        self._contents.append(message.content)
+        self._timestamps.append(message.ts)
+
+    def clear(self):
+        if self.columnar:
+            self._roles = array('B')
+            self._timestamps = array('q')
+            self._contents = []
+        else:
+            self._rows = []
+
+    def __iter__(self) -> Iterator[Message]:
+        if not self.columnar:
+            return iter(self._rows)
+        return (self._materialize(i) for i in range(len(self)))
+
+    def __eq__(self, other: Any) -> bool:
+        if isinstance(other, (list, MessageStore)):
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return f"MessageStore({self.to_dicts()!r})"
+
+    def timestamps(self) -> List[int]:
+        """Creation times of the messages in milliseconds."""
+        if self.columnar:
+            return self._timestamps.tolist()
+        return [message.ts for message in self._rows]
+
+    def iter_dicts(self) -> Iterator[Dict[str, str]]:
+        """Iterate the messages as plain dicts, e.g. for serialization."""
+        if self.columnar:
+            return ({"role": _roles[r], "content": c} for r, c in zip(self._roles, self._contents))
+        return (message.to_dict() for message in self._rows)
+
+    def to_dicts(self) -> List[Dict[str, str]]:
+        return list(self.iter_dicts())
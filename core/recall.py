@@ -0,0 +1,108 @@
+from typing import List, Any, Tuple, Iterable, Optional
+import re
+import zlib
+import numpy as np
+
+_TOKEN_RE = re.compile(r"\w+")
+
+class HashingVectorizer:
+    """Stateless text vectorizer using signed feature hashing.
+
+    Unigrams and bigrams are hashed with CRC32 into ``n_features`` buckets
+    (the high bit picks the sign to reduce collision bias). Term counts are
+    log-scaled and rows are L2-normalized so a dot product is a cosine.
+    """
+
+    def __init__(self, n_features: int = 256, bigrams: bool = True):
+        if n_features & (n_features - 1):
+            raise ValueError("n_features must be a power of two")
+        self.n_features = n_features
+        self.bigrams = bigrams
+        self._mask = n_features - 1
+
+    def tokens(self, text: str) -> List[str]:
+        words = _TOKEN_RE.findall(text.lower())
+        if self.bigrams:
+            words += [f"{a} {b}" for a, b in zip(words, words[1:])]
+        return words
+
+    def transform_into(self, text: str, out: np.ndarray):
+        """Write the normalized vector for text into a preallocated row."""
+        out[:] = 0
+        for token in self.tokens(text):
+            h = zlib.crc32(token.encode('utf-8'))
+            out[h & self._mask] += 1.0 if h & 0x80000000 else -1.0
+        np.copysign(np.log1p(np.abs(out)), out, out=out)
+        norm = np.linalg.norm(out)
+        if norm:
+            out /= norm
+
+    def transform(self, text: str) -> np.ndarray:
+        vector = np.zeros(self.n_features, dtype=np.float32)
+        self.transform_into(text, vector)
+        return vector
+
+class RecallIndex:
+    """Incremental top-k cosine recall over conversation messages.
+
+    Embeddings live in one contiguous float32 matrix whose capacity doubles
+    as it fills, so adding a message writes a single row in place and a
+    query is one matrix-vector product plus ``argpartition``.
+    """
+
+    def __init__(self, vectorizer: Optional[HashingVectorizer] = None, initial_capacity: int = 1024):
+        if initial_capacity < 0:
+            raise ValueError(f"initial_capacity must not be negative, got {initial_capacity}")
+        self.vectorizer = vectorizer or HashingVectorizer()
+        self._matrix = np.zeros((initial_capacity, self.vectorizer.n_features), dtype=np.float32)
+        self._items: List[Any] = []
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    @property
+    def nbytes(self) -> int:
+        return self._matrix.nbytes
+
+    def _reserve(self, size: int):
+        capacity = self._matrix.shape[0]
+        if size <= capacity:
+            return
+        # Doubling has to start from at least one row
+        capacity = max(1, capacity)
+        while capacity < size:
+            capacity *= 2
+        matrix = np.zeros((capacity, self.vectorizer.n_features), dtype=np.float32)
+        matrix[:len(self._items)] = self._matrix[:len(self._items)]
+        self._matrix = matrix
+
+    def add(self, text: str, item: Any):
+        """Index one message; ``item`` is what search returns for it."""
+        row = len(self._items)
+        self._reserve(row + 1)
+        self.vectorizer.transform_into(text, self._matrix[row])
+        self._items.append(item)
+
+    def add_many(self, entries: Iterable[Tuple[str, Any]]):
+        """Index several (text, item) pairs."""
+        entries = list(entries)
+        self._reserve(len(self._items) + len(entries))
+        for text, item in entries:
+            self.vectorizer.transform_into(text, self._matrix[len(self._items)])
+            self._items.append(item)
+
+    def search(self, query: str, k: int = 5, min_score: float = 0.0) -> List[Tuple[Any, float]]:
+        """Return up to k (item, score) pairs most similar to the query."""
+        size = len(self._items)
+        if not size or k <= 0:
+            return []
+        scores = self._matrix[:size] @ self.vectorizer.transform(query)
+        k = min(k, size)
+        top = np.argpartition(scores, size - k)[size - k:]
+        top = top[np.argsort(scores[top])[::-1]]
+        return [(self._items[i], float(scores[i])) for i in top if scores[i] > min_score]
+
+    def clear(self):
+        """Drop every indexed message."""
+        self._matrix[:len(self._items)] = 0
+        self._items = []
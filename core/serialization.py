@@ -0,0 +1,176 @@
+from typing import Dict, List, Any, Iterable, Iterator, Optional, Tuple
+from array import array
+from itertools import accumulate, chain
+import json
+import lzma
+import os
+import struct
+import sys
+import threading
+import zlib
+from .lazy import LineJSONFile, write_line_json
+
+MAGIC = b"JGMEM"
+FORMAT_VERSION = 1
+CODECS = {None: 0, "zlib": 1, "lzma": 2}
+CODEC_NAMES = {code: name for name, code in CODECS.items()}
+
+_HEADER = struct.Struct("<5sBB")
+_LENGTH = struct.Struct("<I")
+_BLOCK = struct.Struct("<II")
+
+class JSONSerializer:
+    """Line-delimited JSON snapshots (see core.lazy); supports lazy loading."""
+
+    name = "json"
+
+    def dump(self, path: str, key: str, items: Iterable[Any], extra: Dict[str, Any],
+             cold: Optional[LineJSONFile] = None, fsync: bool = True):
+        write_line_json(path, key, items, extra, cold=cold, fsync=fsync)
+
+    def load(self, path: str, key: str) -> Tuple[Dict[str, Any], List[Any]]:
+        with open(path, 'r') as f:
+            data = json.load(f)
+        items = data.pop(key, [])
+        return data, items
+
+class BinarySerializer:
+    """Compact binary snapshots with optional block compression.
+
+    Layout: a header (``JGMEM``, format version, codec), the length-prefixed
+    JSON of the extra keys, then blocks of up to ``block_records`` records.
+    Each block is ``<count><payload length>`` followed by the payload, which
+    is the little-endian uint32 record lengths and then the records,
+    compressed as a whole with the codec. A block with count 0 ends the file.
+    """
+
+    name = "binary"
+
+    def __init__(self, compression: Optional[str] = "zlib", level: Optional[int] = None, block_records: int = 4096):
+        if compression not in CODECS:
+            raise ValueError(f"Unknown compression: {compression}")
+        self.compression = compression
+        self.level = level
+        self.block_records = block_records
+
+    def _compress(self, payload: bytes) -> bytes:
+        if self.compression == "zlib":
+            return zlib.compress(payload, 6 if self.level is None else self.level)
+        if self.compression == "lzma":
+            return lzma.compress(payload, preset=6 if self.level is None else self.level)
+        return payload
+
+    @staticmethod
+    def _decompress(codec: int, payload: bytes) -> bytes:
+        name = CODEC_NAMES[codec]
+        if name == "zlib":
+            return zlib.decompress(payload)
+        if name == "lzma":
+            return lzma.decompress(payload)
+        return payload
+
+    def _write_block(self, f, records: List[bytes]):
+        lengths = array('I', (len(record) for record in records))
+        if sys.byteorder != "little":
+            lengths.byteswap()
+        payload = self._compress(lengths.tobytes() + b"".join(records))
+        f.write(_BLOCK.pack(len(records), len(payload)))
+        f.write(payload)
+
+    def dump(self, path: str, key: str, items: Iterable[Any], extra: Dict[str, Any],
+             cold: Optional[LineJSONFile] = None, fsync: bool = True):
+        if cold is not None:
+            items = chain(cold.iter_items(), items)
+        tmp_path = f"{path}.tmp.{os.getpid()}.{threading.get_ident()}"
+        with open(tmp_path, 'wb') as f:
+            f.write(_HEADER.pack(MAGIC, FORMAT_VERSION, CODECS[self.compression]))
+            encoded_extra = json.dumps(extra, separators=(",", ":")).encode('utf-8')
+            f.write(_LENGTH.pack(len(encoded_extra)))
+            f.write(encoded_extra)
+            records = []
+            for item in items:
+                records.append(json.dumps(item, separators=(",", ":")).encode('utf-8'))
+                if len(records) >= self.block_records:
+                    self._write_block(f, records)
+                    records = []
+            if records:
+                self._write_block(f, records)
+            f.write(_BLOCK.pack(0, 0))
+            f.flush()
+            if fsync:
+                os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+
+    @staticmethod
+    def iter_blocks(f) -> Iterator[List[Any]]:
+        """Yield the decoded records of each block of an open snapshot."""
+        magic, version, codec = _HEADER.unpack(f.read(_HEADER.size))
+        if magic != MAGIC:
+            raise ValueError("Not a binary memory snapshot")
+        if version > FORMAT_VERSION:
+            raise ValueError(f"Unsupported snapshot version {version}")
+        (extra_length,) = _LENGTH.unpack(f.read(_LENGTH.size))
+        f.seek(extra_length, os.SEEK_CUR)
+        while True:
+            count, length = _BLOCK.unpack(f.read(_BLOCK.size))
+            if not count:
+                return
+            payload = BinarySerializer._decompress(codec, f.read(length))
+            lengths = array('I')
+            lengths.frombytes(payload[:4 * count])
+            if sys.byteorder != "little":
+                lengths.byteswap()
+            body = memoryview(payload)[4 * count:]
+            ends = list(accumulate(lengths))
+            starts = [0] + ends[:-1]
+            # One json.loads per block instead of one per record
+            yield json.loads(b"[" + b",".join(body[s:e] for s, e in zip(starts, ends)) + b"]")
+
+    def load(self, path: str, key: str) -> Tuple[Dict[str, Any], List[Any]]:
+        with open(path, 'rb') as f:
+            f.seek(_HEADER.size)
+            (extra_length,) = _LENGTH.unpack(f.read(_LENGTH.size))
+            extra = json.loads(f.read(extra_length))
+            f.seek(0)
+            items = []
+            for block in self.iter_blocks(f):
+                items.extend(block)
+        return extra, items
+
+def detect_serializer(path: str):
+    """Return a serializer able to read the snapshot at path."""
+    with open(path, 'rb') as f:
+        header = f.read(_HEADER.size)
+    if len(header) == _HEADER.size and header.startswith(MAGIC):
+        return BinarySerializer(CODEC_NAMES.get(header[-1]))
+    return JSONSerializer()
+
+def load_snapshot(path: str, key: str) -> Tuple[Dict[str, Any], List[Any]]:
+    """Load (extra, items) from a snapshot in any supported format."""
+    return detect_serializer(path).load(path, key)
+
+def convert(src: str, dst: str, key: str, serializer) -> Tuple[int, int]:
+    """Rewrite a snapshot in another format; returns (source bytes, destination bytes)."""
+    extra, items = load_snapshot(src, key)
+    serializer.dump(dst, key, items, extra)
+    return os.path.getsize(src), os.path.getsize(dst)
+
+def main():
+    import argparse
+    parser = argparse.ArgumentParser(description="Convert a memory snapshot between formats")
+    parser.add_argument("src")
+    parser.add_argument("dst")
+    parser.add_argument("--key", default="conversation_history",
+                        help="History key: conversation_history (core) or messages (memory.py)")
+    parser.add_argument("--format", choices=["json", "binary"], default="binary")
+    parser.add_argument("--compression", choices=["none", "zlib", "lzma"], default="zlib")
+    args = parser.parse_args()
+    if args.format == "json":
+        serializer = JSONSerializer()
+    else:
+        serializer = BinarySerializer(None if args.compression == "none" else args.compression)
+    src_size, dst_size = convert(args.src, args.dst, args.key, serializer)
+    print(f"{args.src} ({src_size} bytes) -> {args.dst} ({dst_size} bytes)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+from typing import Dict, List, Any, Callable, Optional
+from collections import OrderedDict
+import threading
+import time
+from .memory import MemoryManager
+from .storage import MemoryStorage, SQLiteStorage
+
+class SessionManager:
+    """Cache of per-session MemoryManagers under an LRU, TTL and byte budget.
+
+    Sessions are loaded from the persistence backend on first access and
+    kept in least-recently-used order. When the cache holds more than
+    ``max_sessions`` sessions or more than ``max_bytes`` of history, or a
+    session has been idle for ``ttl`` seconds, it is evicted: its storage is
+    flushed and closed, and the next access reloads it transparently.
+    """
+
+    def __init__(self, storage_factory: Optional[Callable[[str], MemoryStorage]] = None,
+                 max_sessions: int = 1000, max_bytes: int = 256 * 1024 * 1024,
+                 ttl: Optional[float] = None, lazy_tail: Optional[int] = None,
+                 manager_factory: Optional[Callable[[str, MemoryStorage], MemoryManager]] = None):
+        self.storage_factory = storage_factory or (lambda session_id: SQLiteStorage("memory.db", session_id))
+        self.manager_factory = manager_factory or (
+            lambda session_id, storage: MemoryManager(storage=storage, session_id=session_id)
+        )
+        self.max_sessions = max_sessions
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.lazy_tail = lazy_tail
+        self._sessions: "OrderedDict[str, MemoryManager]" = OrderedDict()
+        self._last_access: Dict[str, float] = {}
+        self._lock = threading.RLock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def __contains__(self, session_id: str) -> bool:
+        return session_id in self._sessions
+
+    @property
+    def total_bytes(self) -> int:
+        return sum(manager.approx_bytes for manager in self._sessions.values())
+
+    def get(self, session_id: str) -> MemoryManager:
+        """Get the memory for a session, loading it if it is not cached."""
+        with self._lock:
+            now = time.monotonic()
+            manager = self._sessions.get(session_id)
+            if manager is not None and self._is_expired(session_id, now):
+                self._evict(session_id)
+                self.expirations += 1
+                manager = None
+            if manager is not None:
+                self.hits += 1
+                self._sessions.move_to_end(session_id)
+            else:
+                self.misses += 1
+                manager = self.manager_factory(session_id, self.storage_factory(session_id))
+                manager.load_memory(lazy_tail=self.lazy_tail)
+                self._sessions[session_id] = manager
+            self._last_access[session_id] = now
+            self._enforce_limits(keep=session_id)
+            return manager
+
+    def add_message(self, session_id: str, role: str, content: str):
+        """Add a message to a session and re-apply the cache limits."""
+        with self._lock:
+            self.get(session_id).add_message(role, content)
+            self._enforce_limits(keep=session_id)
+
+    def add_context(self, session_id: str, key: str, value: Any):
+        """Add context to a session."""
+        with self._lock:
+            self.get(session_id).add_context(key, value)
+
+    def _is_expired(self, session_id: str, now: float) -> bool:
+        return self.ttl is not None and now - self._last_access[session_id] > self.ttl
+
+    def _enforce_limits(self, keep: Optional[str] = None):
+        """Evict least recently used sessions until the cache fits. Caller holds the lock."""
+        total = self.total_bytes
+        for session_id in list(self._sessions):
+            if len(self._sessions) <= self.max_sessions and total <= self.max_bytes:
+                break
+            if session_id == keep:
+                continue
+            total -= self._sessions[session_id].approx_bytes
+            self._evict(session_id)
+            self.evictions += 1
+
+    def _evict(self, session_id: str):
+        """Drop a session from the cache after flushing it to storage. Caller holds the lock."""
+        manager = self._sessions.pop(session_id)
+        self._last_access.pop(session_id, None)
+        try:
+            manager.close()
+        except Exception as e:
+            print(f"Error closing session {session_id}: {e}")
+
+    def expire(self) -> int:
+        """Evict every session idle for longer than the TTL and return how many."""
+        if self.ttl is None:
+            return 0
+        with self._lock:
+            now = time.monotonic()
+            expired = [sid for sid in self._sessions if self._is_expired(sid, now)]
+            for session_id in expired:
+                self._evict(session_id)
+            self.expirations += len(expired)
+            return len(expired)
+
+    def evict(self, session_id: str):
+        """Evict a session from the cache if present."""
+        with self._lock:
+            if session_id in self._sessions:
+                self._evict(session_id)
+                self.evictions += 1
+
+    def list_sessions(self) -> List[str]:
+        """List cached session ids, least recently used first."""
+        return list(self._sessions)
+
+    def stats(self) -> Dict[str, Any]:
+        """Get cache counters for sizing."""
+        lookups = self.hits + self.misses
+        return {
+            "sessions": len(self._sessions),
+            "bytes": self.total_bytes,
+            "max_sessions": self.max_sessions,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
+
+    def close(self):
+        """Flush and evict every cached session."""
+        with self._lock:
+            for session_id in list(self._sessions):
+                self._evict(session_id)
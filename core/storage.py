@@ -0,0 +1,419 @@
+from typing import Dict, List, Any, Tuple, Optional
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+
+def atomic_write_bytes(path: str, data: bytes, fsync: bool = True):
+    """Write bytes to path atomically via a temp file and rename."""
+    tmp_path = f"{path}.tmp.{os.getpid()}.{threading.get_ident()}"
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+        f.flush()
+        if fsync:
+            os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+def atomic_write_json(path: str, data: Any, fsync: bool = True):
+    """Write a JSON document to path atomically."""
+    atomic_write_bytes(path, json.dumps(data).encode('utf-8'), fsync=fsync)
+
+def slice_history(history: List[Any], since: Optional[int] = None, limit: Optional[int] = None) -> List[Any]:
+    """Select messages after the first ``since`` ones, capped at ``limit``.
+
+    Without ``since`` the last ``limit`` messages are returned.
+    """
+    if since is not None:
+        history = history[since:]
+        return history[:limit] if limit is not None else history
+    if limit is not None:
+        return history[-limit:] if limit > 0 else []
+    return history
+
+class MemoryStorage:
+    """Base class for MemoryManager persistence backends.
+
+    Backends receive one call per mutation instead of the whole memory
+    state, so the cost of persisting a turn does not grow with history.
+    Backends that set ``range_reads`` can serve ``read_messages`` and
+    ``count_messages`` without loading the whole history.
+    """
+
+    range_reads = False
+
+    def load(self) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
+        """Return the persisted (context, conversation_history)."""
+        raise NotImplementedError
+
+    def load_context(self) -> Dict[str, Any]:
+        """Return the persisted context without loading messages."""
+        return self.load()[0]
+
+    def append_message(self, message: Dict[str, Any]):
+        """Persist a new conversation message."""
+        raise NotImplementedError
+
+    def append_messages(self, messages: List[Dict[str, Any]]):
+        """Persist several messages, e.g. when importing history."""
+        for message in messages:
+            self.append_message(message)
+
+    def set_context(self, key: str, value: Any):
+        """Persist a context value."""
+        raise NotImplementedError
+
+    def clear_context(self):
+        """Persist clearing all context."""
+        raise NotImplementedError
+
+    def clear_messages(self):
+        """Persist clearing the conversation history."""
+        raise NotImplementedError
+
+    def read_messages(self, since: Optional[int] = None, limit: Optional[int] = None,
+                      session_id: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Read a range of messages, see ``slice_history``."""
+        raise NotImplementedError
+
+    def count_messages(self, session_id: Optional[str] = None) -> int:
+        """Return the number of messages stored for a session."""
+        raise NotImplementedError
+
+    def flush(self):
+        """Flush any buffered writes."""
+
+    def close(self):
+        """Flush and release any resources held by the backend."""
+        self.flush()
+
+class JournalStorage(MemoryStorage):
+    """Append-only JSONL journal with background snapshot compaction.
+
+    Every mutation is appended as one JSON record to the current journal
+    segment (``<base>.journal.<generation>.jsonl``). Once the segment grows
+    past ``compact_threshold`` bytes a new segment is started and the older
+    segments are folded into ``<base>.snapshot.json`` on a background
+    thread. The snapshot records the last generation it contains, so a
+    crash at any point during compaction is recovered by replaying only
+    the segments newer than the snapshot.
+    """
+
+    def __init__(self, base_path: str = "memory", compact_threshold: int = 4 * 1024 * 1024,
+                 fsync: bool = False, background: bool = True):
+        self.base_path = base_path
+        self.snapshot_file = f"{base_path}.snapshot.json"
+        self.compact_threshold = compact_threshold
+        self.fsync = fsync
+        self.background = background
+        self._lock = threading.Lock()
+        self._compact_lock = threading.Lock()
+        self._compactor: Optional[threading.Thread] = None
+        self._sealed_generation = 0
+        self._journal = None
+        self._journal_size = 0
+        self.generation = max(self._segment_generations(), default=self._snapshot_generation()) + 1
+        self._open_segment()
+
+    def _segment_path(self, generation: int) -> str:
+        return f"{self.base_path}.journal.{generation}.jsonl"
+
+    def _segment_generations(self) -> List[int]:
+        """List the generations of the journal segments on disk."""
+        directory = os.path.dirname(self.base_path) or "."
+        prefix = os.path.basename(self.base_path)
+        pattern = re.compile(re.escape(prefix) + r"\.journal\.(\d+)\.jsonl$")
+        generations = []
+        if os.path.isdir(directory):
+            for name in os.listdir(directory):
+                match = pattern.match(name)
+                if match:
+                    generations.append(int(match.group(1)))
+        return sorted(generations)
+
+    def _snapshot_generation(self) -> int:
+        snapshot = self._read_snapshot()
+        return snapshot.get("generation", 0)
+
+    def _read_snapshot(self) -> Dict[str, Any]:
+        if os.path.exists(self.snapshot_file):
+            with open(self.snapshot_file, 'r') as f:
+                return json.load(f)
+        return {}
+
+    def _open_segment(self):
+        path = self._segment_path(self.generation)
+        self._journal = open(path, 'a', encoding='utf-8')
+        self._journal_size = self._journal.tell()
+
+    def _append(self, record: Dict[str, Any]):
+        """Append one record and flush it so a crash loses at most this record."""
+        self._append_lines(json.dumps(record) + "\n")
+
+    def _append_lines(self, lines: str):
+        """Append and flush one or more newline-terminated records."""
+        with self._lock:
+            self._journal.write(lines)
+            self._journal.flush()
+            if self.fsync:
+                os.fsync(self._journal.fileno())
+            self._journal_size += len(lines)
+            rotated = self._journal_size >= self.compact_threshold
+            if rotated:
+                self._rotate()
+        if rotated:
+            self._schedule_compaction()
+
+    def _rotate(self):
+        """Seal the current journal segment and start a new one. Caller holds the lock."""
+        self._journal.close()
+        self._sealed_generation = self.generation
+        self.generation += 1
+        self._open_segment()
+
+    def _schedule_compaction(self):
+        """Compact sealed segments, on a background thread unless disabled."""
+        if not self.background:
+            self.compact(self._sealed_generation)
+        elif self._compactor is None or not self._compactor.is_alive():
+            self._compactor = threading.Thread(target=self._compact_loop, daemon=True)
+            self._compactor.start()
+
+    def _compact_loop(self):
+        """Compact sealed segments until the snapshot catches up with rotation."""
+        compacted = 0
+        while True:
+            with self._lock:
+                sealed = self._sealed_generation
+            if sealed <= compacted:
+                return
+            try:
+                self.compact(sealed)
+            except Exception as e:
+                print(f"Error compacting memory journal: {e}")
+                return
+            compacted = sealed
+
+    @staticmethod
+    def _apply(record: Dict[str, Any], context: Dict[str, Any], history: List[Dict[str, Any]]):
+        """Apply a journal record to in-memory state."""
+        op = record.get("op")
+        if op == "message":
+            history.append(record["message"])
+        elif op == "context":
+            context[record["key"]] = record["value"]
+        elif op == "clear_context":
+            context.clear()
+        elif op == "clear_messages":
+            history.clear()
+
+    def _replay(self, path: str, context: Dict[str, Any], history: List[Dict[str, Any]]):
+        """Replay a journal segment, ignoring a torn trailing record."""
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                if not line.endswith("\n"):
+                    break
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    break
+                self._apply(record, context, history)
+
+    def compact(self, upto_generation: Optional[int] = None):
+        """Fold every journal segment up to a generation into the snapshot."""
+        with self._compact_lock:
+            if upto_generation is None:
+                with self._lock:
+                    self._rotate()
+                    upto_generation = self._sealed_generation
+            snapshot = self._read_snapshot()
+            start = snapshot.get("generation", 0)
+            if upto_generation <= start:
+                return
+            context = snapshot.get("context", {})
+            history = snapshot.get("conversation_history", [])
+            segments = [g for g in self._segment_generations() if start < g <= upto_generation]
+            for generation in segments:
+                self._replay(self._segment_path(generation), context, history)
+            atomic_write_json(self.snapshot_file, {
+                "generation": upto_generation,
+                "context": context,
+                "conversation_history": history
+            })
+            for generation in segments:
+                os.remove(self._segment_path(generation))
+
+    def load(self) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
+        with self._compact_lock:
+            snapshot = self._read_snapshot()
+            start = snapshot.get("generation", 0)
+            context = snapshot.get("context", {})
+            history = snapshot.get("conversation_history", [])
+            with self._lock:
+                self._journal.flush()
+                for generation in self._segment_generations():
+                    if generation > start:
+                        self._replay(self._segment_path(generation), context, history)
+        return context, history
+
+    def append_message(self, message: Dict[str, Any]):
+        self._append({"op": "message", "message": message})
+
+    def append_messages(self, messages: List[Dict[str, Any]]):
+        lines = "".join(json.dumps({"op": "message", "message": m}) + "\n" for m in messages)
+        if lines:
+            self._append_lines(lines)
+
+    def set_context(self, key: str, value: Any):
+        self._append({"op": "context", "key": key, "value": value})
+
+    def clear_context(self):
+        self._append({"op": "clear_context"})
+
+    def clear_messages(self):
+        self._append({"op": "clear_messages"})
+
+    def flush(self):
+        with self._lock:
+            self._journal.flush()
+            os.fsync(self._journal.fileno())
+
+    def close(self):
+        self.flush()
+        if self._compactor is not None:
+            self._compactor.join()
+        with self._lock:
+            self._journal.close()
+
+
+class SQLiteStorage(MemoryStorage):
+    """SQLite (WAL mode) storage keyed by session id.
+
+    Several worker processes can share one database file: WAL lets readers
+    proceed alongside a writer and ``busy_timeout`` serializes writers.
+    Messages are keyed by ``(session_id, seq)`` where ``seq`` is the 1-based
+    position of the message in its session, so ranged reads are a primary
+    key range scan.
+    """
+
+    range_reads = True
+
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS messages (
+        session_id TEXT NOT NULL,
+        seq INTEGER NOT NULL,
+        role TEXT NOT NULL,
+        content TEXT NOT NULL,
+        created_at REAL NOT NULL,
+        PRIMARY KEY (session_id, seq)
+    ) WITHOUT ROWID;
+    CREATE TABLE IF NOT EXISTS context (
+        session_id TEXT NOT NULL,
+        key TEXT NOT NULL,
+        value TEXT NOT NULL,
+        PRIMARY KEY (session_id, key)
+    ) WITHOUT ROWID;
+    """
+
+    def __init__(self, db_path: str = "memory.db", session_id: str = "default", busy_timeout: float = 30.0):
+        self.db_path = db_path
+        self.session_id = session_id
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, timeout=busy_timeout, isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(self.SCHEMA)
+
+    def for_session(self, session_id: str) -> "SQLiteStorage":
+        """Open a storage handle for another session in the same database."""
+        return SQLiteStorage(self.db_path, session_id)
+
+    def _write(self, sql: str, params: Tuple):
+        with self._lock:
+            self._conn.execute(sql, params)
+
+    def load(self) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
+        return self.load_context(), self.read_messages()
+
+    def load_context(self) -> Dict[str, Any]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT key, value FROM context WHERE session_id = ?", (self.session_id,)
+            ).fetchall()
+        return {key: json.loads(value) for key, value in rows}
+
+    def append_message(self, message: Dict[str, Any]):
+        # A single INSERT ... SELECT is atomic, so concurrent writers never reuse a seq
+        self._write(
+            "INSERT INTO messages (session_id, seq, role, content, created_at) "
+            "SELECT ?, COALESCE(MAX(seq), 0) + 1, ?, ?, ? FROM messages WHERE session_id = ?",
+            (self.session_id, message["role"], message["content"], time.time(), self.session_id)
+        )
+
+    def append_messages(self, messages: List[Dict[str, Any]]):
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute(
+                    "SELECT COALESCE(MAX(seq), 0) FROM messages WHERE session_id = ?", (self.session_id,)
+                ).fetchone()
+                self._conn.executemany(
+                    "INSERT INTO messages (session_id, seq, role, content, created_at) VALUES (?, ?, ?, ?, ?)",
+                    ((self.session_id, row[0] + i, m["role"], m["content"], now) for i, m in enumerate(messages, 1))
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def set_context(self, key: str, value: Any):
+        self._write(
+            "INSERT OR REPLACE INTO context (session_id, key, value) VALUES (?, ?, ?)",
+            (self.session_id, key, json.dumps(value))
+        )
+
+    def clear_context(self):
+        self._write("DELETE FROM context WHERE session_id = ?", (self.session_id,))
+
+    def clear_messages(self):
+        self._write("DELETE FROM messages WHERE session_id = ?", (self.session_id,))
+
+    def read_messages(self, since: Optional[int] = None, limit: Optional[int] = None,
+                      session_id: Optional[str] = None) -> List[Dict[str, Any]]:
+        session_id = session_id or self.session_id
+        if since is None and limit is not None:
+            # Last ``limit`` messages: walk the index backwards, then restore order
+            sql = "SELECT role, content FROM messages WHERE session_id = ? ORDER BY seq DESC LIMIT ?"
+            params = (session_id, limit)
+        else:
+            sql = "SELECT role, content FROM messages WHERE session_id = ? AND seq > ? ORDER BY seq LIMIT ?"
+            params = (session_id, since or 0, -1 if limit is None else limit)
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        if since is None and limit is not None:
+            rows.reverse()
+        return [{"role": role, "content": content} for role, content in rows]
+
+    def count_messages(self, session_id: Optional[str] = None) -> int:
+        """Return the number of messages stored for a session."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT COALESCE(MAX(seq), 0) FROM messages WHERE session_id = ?",
+                (session_id or self.session_id,)
+            ).fetchone()
+        return row[0]
+
+    def list_sessions(self) -> List[str]:
+        """List the session ids that have messages or context."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT session_id FROM messages GROUP BY session_id "
+                "UNION SELECT session_id FROM context GROUP BY session_id"
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
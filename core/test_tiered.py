@@ -0,0 +1,114 @@
+import json
+
+from core.tiered import TieredMemory
+
+
+def summarize(summary, messages):
+    """Deterministic stand-in for a summarizer: joins the spilled contents."""
+    return "|".join(filter(None, [summary] + [message["content"] for message in messages]))
+
+
+def message(n):
+    return {"role": "user", "content": f"m{n}"}
+
+
+def make_memory(tmp_path, **kwargs):
+    kwargs.setdefault("token_budget", 50)
+    kwargs.setdefault("low_water", 0.6)
+    return TieredMemory(summarizer=summarize, token_counter=lambda text: 10,
+                        archive_file=str(tmp_path / "memory.archive.jsonl"), **kwargs)
+
+
+def test_messages_within_budget_stay_hot(tmp_path):
+    memory = make_memory(tmp_path)
+    for n in range(5):
+        assert memory.add(message(n)) == []
+    assert memory.window_tokens == 50
+    assert memory.summary == ""
+    assert memory.summary_message() is None
+    assert list(memory.iter_archive()) == []
+
+
+def test_overflow_spills_down_to_low_water(tmp_path):
+    memory = make_memory(tmp_path)
+    for n in range(5):
+        memory.add(message(n))
+    spilled = memory.add(message(5))
+    # 60 tokens > 50 drains to 30 (0.6 of the budget), oldest first
+    assert spilled == [message(0), message(1), message(2)]
+    assert list(memory._window) == [message(3), message(4), message(5)]
+    assert memory.window_tokens == 30
+    assert memory.archived == 3
+    assert memory.summary == "m0|m1|m2"
+    assert memory.summary_message() == {
+        "role": "system", "content": "Summary of the earlier conversation:\nm0|m1|m2"
+    }
+    assert list(memory.iter_archive()) == spilled
+
+
+def test_summary_folds_each_spill(tmp_path):
+    memory = make_memory(tmp_path)
+    for n in range(9):
+        memory.add(message(n))
+    assert memory.summary == "m0|m1|m2|m3|m4|m5"
+    assert memory.archived == 6
+    assert [m["content"] for m in memory.iter_archive()] == [f"m{n}" for n in range(6)]
+
+
+def test_newest_message_is_always_kept(tmp_path):
+    memory = TieredMemory(token_budget=5, summarizer=summarize, token_counter=len,
+                          archive_file=str(tmp_path / "memory.archive.jsonl"))
+    memory.add({"role": "user", "content": "abc"})
+    spilled = memory.add({"role": "user", "content": "much too long"})
+    assert spilled == [{"role": "user", "content": "abc"}]
+    assert list(memory._window) == [{"role": "user", "content": "much too long"}]
+
+
+def test_state_survives_reload(tmp_path):
+    memory = make_memory(tmp_path)
+    history = [message(n) for n in range(6)]
+    for entry in history:
+        memory.add(entry)
+    with open(memory.state_file) as f:
+        assert json.load(f) == {"summary": "m0|m1|m2", "archived": 3}
+
+    reloaded = make_memory(tmp_path)
+    assert reloaded.summary == "m0|m1|m2"
+    assert reloaded.archived == 3
+    # Already summarized messages are not added to the hot window again
+    assert reloaded.restore(history) == history[3:]
+    assert reloaded.window_tokens == 30
+
+
+def test_restore_with_offset(tmp_path):
+    memory = make_memory(tmp_path)
+    for n in range(6):
+        memory.add(message(n))
+    reloaded = make_memory(tmp_path)
+    # Only the last four messages were loaded; two precede them
+    assert reloaded.restore([message(n) for n in range(2, 6)], offset=2) == [message(3), message(4), message(5)]
+    # A tail that starts after the archived messages is restored whole
+    assert reloaded.restore([message(4), message(5)], offset=4) == [message(4), message(5)]
+
+
+def test_clear_keeps_the_archive(tmp_path):
+    memory = make_memory(tmp_path)
+    for n in range(6):
+        memory.add(message(n))
+    memory.clear()
+    assert memory.window_tokens == 0
+    assert list(memory._window) == []
+    assert memory.summary == ""
+    assert memory.archived == 0
+    assert len(list(memory.iter_archive())) == 3
+    assert make_memory(tmp_path).summary == ""
+
+
+def test_without_archive_file(tmp_path):
+    memory = TieredMemory(token_budget=20, summarizer=summarize, token_counter=lambda text: 10, archive_file=None)
+    for n in range(3):
+        memory.add(message(n))
+    assert memory.state_file is None
+    assert memory.summary == "m0|m1"
+    assert list(memory.iter_archive()) == []
+    assert list(tmp_path.iterdir()) == []
@@ -0,0 +1,146 @@
+import asyncio
+
+import pytest
+
+from core.workflow import WorkflowManager, critical_path, descendants, parse_workflow
+
+
+class FakeTool:
+    """Process tool that records the order tasks start and fails on request."""
+
+    def __init__(self):
+        self.calls = []
+
+    async def execute_task(self, task):
+        self.calls.append(task["name"])
+        await asyncio.sleep(task.get("sleep", 0))
+        if task.get("fail"):
+            raise RuntimeError(f"{task['name']} failed")
+        return {"name": task["name"], "inputs": task.get("inputs", {})}
+
+
+def step(step_id, *depends_on, **task):
+    return {"id": step_id, "task": {"name": step_id, **task}, "depends_on": list(depends_on)}
+
+
+def statuses(run):
+    return {step_id: state["status"] for step_id, state in run["steps"].items()}
+
+
+@pytest.fixture
+def run_workflows():
+    pytest.importorskip("praisonai_tools")
+    from process import ProcessManager
+
+    def run(body):
+        async def main():
+            manager = ProcessManager(num_workers=4)
+            tool = manager.process_tool = FakeTool()
+            try:
+                return await asyncio.wait_for(body(WorkflowManager(manager), tool), 10)
+            finally:
+                await manager.stop()
+
+        return asyncio.run(main())
+
+    return run
+
+
+def test_parse_workflow_validates_steps():
+    with pytest.raises(ValueError, match="needs an id"):
+        parse_workflow({"steps": [{"task": {}}]})
+    with pytest.raises(ValueError, match="Duplicate"):
+        parse_workflow({"steps": [step("a"), step("a")]})
+    with pytest.raises(ValueError, match="unknown step b"):
+        parse_workflow({"steps": [step("a", "b")]})
+    with pytest.raises(ValueError, match="cycle through: a, b"):
+        parse_workflow({"steps": [step("a", "b"), step("b", "a"), step("c")]})
+    with pytest.raises(ValueError, match="unknown execution class 'gpu'"):
+        parse_workflow({"steps": [step("a", execution="gpu")]})
+    assert list(parse_workflow({"steps": [step("a"), step("b", "a")]})) == ["a", "b"]
+
+
+def test_descendants_and_critical_path():
+    steps = parse_workflow({"steps": [step("a"), step("b", "a"), step("c", "a"), step("d", "b", "c"), step("e")]})
+    assert descendants(steps, ["b"]) == {"b", "d"}
+    assert descendants(steps, ["a"]) == {"a", "b", "c", "d"}
+    latencies = {"a": 1.0, "b": 3.0, "c": 1.0, "d": 1.0, "e": 4.0}
+    states = {step_id: {"latency_seconds": seconds} for step_id, seconds in latencies.items()}
+    assert critical_path(steps, states) == {"steps": ["a", "b", "d"], "seconds": 5.0}
+
+
+def test_steps_run_after_their_dependencies(run_workflows):
+    async def body(workflows, tool):
+        run = await workflows.run({"steps": [step("a"), step("b", "a"), step("c", "a"), step("d", "b", "c")]})
+        return run, tool.calls
+
+    run, calls = run_workflows(body)
+    assert run["status"] == "completed"
+    assert set(statuses(run).values()) == {"completed"}
+    assert calls[0] == "a" and calls[-1] == "d"
+    # Outputs of upstream steps are handed to their dependents
+    assert run["steps"]["d"]["result"]["inputs"] == {
+        "b": {"name": "b", "inputs": {"a": {"name": "a", "inputs": {}}}},
+        "c": {"name": "c", "inputs": {"a": {"name": "a", "inputs": {}}}},
+    }
+    assert run["critical_path"]["steps"][0] == "a"
+
+
+def test_failure_skips_dependents_only(run_workflows):
+    async def body(workflows, tool):
+        return await workflows.run({"steps": [
+            step("a"), step("b", "a", fail=True), step("c", "b"), step("d", "a"), step("e", sleep=0.05),
+        ]})
+
+    run = run_workflows(body)
+    assert run["status"] == "failed"
+    assert statuses(run) == {"a": "completed", "b": "failed", "c": "skipped", "d": "completed", "e": "completed"}
+    assert run["steps"]["b"]["error"] == "b failed"
+    assert run["steps"]["c"]["error"] == "Upstream step b failed"
+
+
+def test_fail_fast_skips_waiting_steps(run_workflows):
+    async def body(workflows, tool):
+        return await workflows.run({"steps": [
+            step("a", fail=True), step("b", sleep=0.2), step("c", "b"), step("d", "a"),
+        ]}, fail_fast=True)
+
+    run = run_workflows(body)
+    assert statuses(run) == {"a": "failed", "b": "completed", "c": "skipped", "d": "skipped"}
+    assert run["steps"]["c"]["error"] == "Workflow stopped after a failure"
+    assert run["steps"]["d"]["error"] == "Upstream step a failed"
+
+
+def test_rejected_submission_fails_the_step(run_workflows):
+    async def body(workflows, tool):
+        return await workflows.run({"steps": [step("a"), step("b", "a", batch="missing"), step("c", "b"), step("d", "a")]})
+
+    run = run_workflows(body)
+    assert run["status"] == "failed"
+    assert run["finished_at"] is not None
+    assert statuses(run) == {"a": "completed", "b": "failed", "c": "skipped", "d": "completed"}
+    assert run["steps"]["b"]["error"].startswith("Could not submit step:")
+
+
+def test_rerun_reuses_completed_steps(run_workflows):
+    async def body(workflows, tool):
+        workflow = {"steps": [step("a"), step("b", "a", fail=True), step("c", "b"), step("d", "a")]}
+        first = await workflows.run(workflow)
+        # The run keeps the workflow it was given, so fixing the step fixes the rerun
+        workflow["steps"][1]["task"]["fail"] = False
+        tool.calls.clear()
+        second = await workflows.rerun(first["id"])
+        retried = list(tool.calls)
+        tool.calls.clear()
+        third = await workflows.rerun(second["id"], ["b"])
+        with pytest.raises(ValueError, match="Unknown workflow steps: x"):
+            await workflows.rerun(first["id"], ["x"])
+        return second, retried, third, list(tool.calls)
+
+    second, retried, third, calls = run_workflows(body)
+    assert second["status"] == "completed"
+    assert retried == ["b", "c"]
+    assert statuses(second) == {"a": "reused", "b": "completed", "c": "completed", "d": "reused"}
+    assert second["resumed_from"] == "run_1"
+    assert calls == ["b", "c"]
+    assert statuses(third) == {"a": "reused", "b": "completed", "c": "completed", "d": "reused"}
@@ -0,0 +1,157 @@
+from typing import Dict, List, Any, Callable, Optional
+from collections import deque
+from collections.abc import Mapping
+import json
+import os
+from .storage import atomic_write_json
+
+def estimate_tokens(text: str) -> int:
+    """Rough token estimate (about four characters per token)."""
+    return len(text) // 4 + 1
+
+def message_text(message: Any) -> str:
+    """Return the text of a dict message or a LangChain message."""
+    if isinstance(message, Mapping):
+        return str(message.get("content", ""))
+    return str(getattr(message, "content", message))
+
+def message_role(message: Any) -> str:
+    """Return the role of a dict message or a LangChain message."""
+    if isinstance(message, Mapping):
+        return str(message.get("role", ""))
+    return str(getattr(message, "type", ""))
+
+def serialize_message(message: Any) -> Any:
+    """Convert a message to something JSON serializable."""
+    if isinstance(message, dict):
+        return message
+    if isinstance(message, Mapping):
+        return dict(message)
+    return message.dict()
+
+def extractive_summarizer(max_chars: int = 2000, line_chars: int = 200) -> Callable[[str, List[Any]], str]:
+    """Build a summarizer that keeps the start of each spilled turn, no LLM required."""
+    def summarize(summary: str, messages: List[Any]) -> str:
+        lines = [summary] if summary else []
+        for message in messages:
+            lines.append(f"{message_role(message)}: {message_text(message)[:line_chars]}")
+        return "\n".join(lines)[-max_chars:]
+    return summarize
+
+def llm_summarizer(llm: Callable[[str], str]) -> Callable[[str, List[Any]], str]:
+    """Build a summarizer that folds spilled turns into the summary with an LLM call."""
+    def summarize(summary: str, messages: List[Any]) -> str:
+        turns = "\n".join(f"{message_role(m)}: {message_text(m)}" for m in messages)
+        prompt = (
+            "Update the running summary of a conversation with the new turns below. "
+            "Keep facts, decisions and open questions; be concise.\n\n"
+            f"Current summary:\n{summary or '(empty)'}\n\nNew turns:\n{turns}\n\nUpdated summary:"
+        )
+        return llm(prompt).strip()
+    return summarize
+
+class TieredMemory:
+    """Token-budgeted conversation memory.
+
+    Recent messages stay in a hot window capped at ``token_budget`` tokens.
+    When a new message overflows the window the oldest messages spill out:
+    they are folded into a cached rolling summary by ``summarizer`` and
+    appended to a cold JSONL archive on disk. The summary is only recomputed
+    on spill, so adding a message that fits costs one token count. A spill
+    drains the window down to ``low_water`` of the budget so summaries are
+    recomputed in batches rather than once per turn.
+    """
+
+    def __init__(self, token_budget: int = 3000, summarizer: Optional[Callable[[str, List[Any]], str]] = None,
+                 token_counter: Callable[[str], int] = estimate_tokens, archive_file: Optional[str] = "memory.archive.jsonl",
+                 serializer: Callable[[Any], Any] = serialize_message, low_water: float = 0.75):
+        self.token_budget = token_budget
+        self.low_water = low_water
+        self.summarizer = summarizer or extractive_summarizer()
+        self.token_counter = token_counter
+        self.archive_file = archive_file
+        self.serializer = serializer
+        self.summary = ""
+        self.archived = 0
+        self.window_tokens = 0
+        self._window_costs = deque()
+        self._window = deque()
+        self._load_state()
+
+    @property
+    def state_file(self) -> Optional[str]:
+        return f"{self.archive_file}.summary.json" if self.archive_file else None
+
+    def _load_state(self):
+        if self.state_file and os.path.exists(self.state_file):
+            with open(self.state_file, 'r') as f:
+                state = json.load(f)
+            self.summary = state.get("summary", "")
+            self.archived = state.get("archived", 0)
+
+    def _save_state(self):
+        if self.state_file:
+            atomic_write_json(self.state_file, {"summary": self.summary, "archived": self.archived})
+
+    def add(self, message: Any) -> List[Any]:
+        """Add a message to the hot window and return the messages it spilled."""
+        cost = self.token_counter(message_text(message))
+        self._window.append(message)
+        self._window_costs.append(cost)
+        self.window_tokens += cost
+        spilled = []
+        if self.window_tokens > self.token_budget:
+            target = self.token_budget * self.low_water
+            # Always keep the newest message, even if it alone exceeds the budget
+            while self.window_tokens > target and len(self._window) > 1:
+                spilled.append(self._window.popleft())
+                self.window_tokens -= self._window_costs.popleft()
+        if spilled:
+            self._spill(spilled)
+        return spilled
+
+    def _spill(self, messages: List[Any]):
+        """Archive spilled messages and fold them into the rolling summary."""
+        if self.archive_file:
+            with open(self.archive_file, 'a', encoding='utf-8') as f:
+                for message in messages:
+                    f.write(json.dumps(self.serializer(message)) + "\n")
+        self.summary = self.summarizer(self.summary, messages)
+        self.archived += len(messages)
+        self._save_state()
+
+    def restore(self, history: List[Any], offset: int = 0) -> List[Any]:
+        """Rebuild the hot window from loaded history.
+
+        ``offset`` is the number of conversation messages that precede
+        ``history``; anything before ``archived`` is already summarized.
+        Returns the messages that make up the hot window.
+        """
+        self._window.clear()
+        self._window_costs.clear()
+        self.window_tokens = 0
+        for message in history[max(0, self.archived - offset):]:
+            self.add(message)
+        return list(self._window)
+
+    def clear(self):
+        """Forget the hot window and summary; the cold archive is kept."""
+        self._window.clear()
+        self._window_costs.clear()
+        self.window_tokens = 0
+        self.summary = ""
+        self.archived = 0
+        self._save_state()
+
+    def iter_archive(self):
+        """Iterate archived (cold) messages, oldest first."""
+        if self.archive_file and os.path.exists(self.archive_file):
+            with open(self.archive_file, 'r', encoding='utf-8') as f:
+                for line in f:
+                    yield json.loads(line)
+
+    def summary_message(self) -> Optional[Dict[str, str]]:
+        """Return the rolling summary as a system message, if there is one."""
+        if not self.summary:
+            return None
+        return {"role": "system", "content": f"Summary of the earlier conversation:\n{self.summary}"}
@@ -0,0 +1,312 @@
+from typing import Dict, List, Any, Iterable, Optional, Set
+from collections import OrderedDict
+import asyncio
+import copy
+import itertools
+import time
+import weakref
+
+PENDING = "pending"
+RUNNING = "running"
+COMPLETED = "completed"
+FAILED = "failed"
+SKIPPED = "skipped"
+REUSED = "reused"
+
+_DONE = {COMPLETED, REUSED}
+
+def _topological_order(steps: Dict[str, Dict[str, Any]]) -> List[str]:
+    """Order step ids so dependencies come first; raises ValueError on cycles."""
+    remaining = {step_id: set(step["depends_on"]) for step_id, step in steps.items()}
+    order = []
+    ready = [step_id for step_id, deps in remaining.items() if not deps]
+    dependents: Dict[str, List[str]] = {step_id: [] for step_id in steps}
+    for step_id, deps in remaining.items():
+        for dep in deps:
+            dependents[dep].append(step_id)
+    while ready:
+        step_id = ready.pop()
+        order.append(step_id)
+        for dependent in dependents[step_id]:
+            remaining[dependent].discard(step_id)
+            if not remaining[dependent]:
+                ready.append(dependent)
+    if len(order) != len(steps):
+        cycle = sorted(step_id for step_id in steps if step_id not in order)
+        raise ValueError(f"Workflow has a dependency cycle through: {', '.join(cycle)}")
+    return order
+
+def parse_workflow(workflow: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+    """Validate a workflow definition and return its steps by id.
+
+    A workflow is ``{"name": ..., "steps": [...]}`` where each step is
+    ``{"id": ..., "task": {...}, "depends_on": [...]}``. The task is a
+    ProcessManager task; optional step keys ``tenant``, ``priority``,
+    ``deadline`` and ``dedupe`` are passed to ``create_process``.
+    """
+    from executors import ExecutionClass
+    steps: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+    for step in workflow.get("steps", []):
+        step_id = step.get("id")
+        if not step_id:
+            raise ValueError("Every workflow step needs an id")
+        if step_id in steps:
+            raise ValueError(f"Duplicate workflow step: {step_id}")
+        execution = step.get("task", {}).get("execution", ExecutionClass.ASYNC.value)
+        if execution not in {member.value for member in ExecutionClass}:
+            raise ValueError(f"Step {step_id} has unknown execution class {execution!r}")
+        steps[step_id] = {**step, "depends_on": list(step.get("depends_on", []))}
+    for step_id, step in steps.items():
+        for dep in step["depends_on"]:
+            if dep not in steps:
+                raise ValueError(f"Step {step_id} depends on unknown step {dep}")
+    _topological_order(steps)
+    return steps
+
+def descendants(steps: Dict[str, Dict[str, Any]], roots: Iterable[str]) -> Set[str]:
+    """Return the given steps and every step that depends on them, transitively."""
+    dependents: Dict[str, List[str]] = {step_id: [] for step_id in steps}
+    for step_id, step in steps.items():
+        for dep in step["depends_on"]:
+            dependents[dep].append(step_id)
+    found = set()
+    stack = list(roots)
+    while stack:
+        step_id = stack.pop()
+        if step_id not in found:
+            found.add(step_id)
+            stack.extend(dependents[step_id])
+    return found
+
+def critical_path(steps: Dict[str, Dict[str, Any]], states: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+    """Longest chain of step latencies (ready to finished) through the run.
+
+    Each step's latency starts when its last dependency finished, so the
+    chain sums to the time from the start of the run to the last step of
+    the chain finishing; shortening any step on it shortens the run.
+    """
+    finish: Dict[str, float] = {}
+    previous: Dict[str, Optional[str]] = {}
+    for step_id in _topological_order(steps):
+        state = states[step_id]
+        deps = [dep for dep in steps[step_id]["depends_on"] if dep in finish]
+        before = max(deps, key=finish.get) if deps else None
+        previous[step_id] = before
+        finish[step_id] = (finish[before] if before else 0.0) + (state.get("latency_seconds") or 0.0)
+    if not finish:
+        return {"steps": [], "seconds": 0.0}
+    step_id = max(finish, key=finish.get)
+    path = []
+    while step_id is not None:
+        path.append(step_id)
+        step_id = previous[step_id]
+    path.reverse()
+    return {"steps": path, "seconds": finish[path[-1]]}
+
+class WorkflowManager:
+    """Runs DAG workflows, one ProcessManager process per step.
+
+    Steps whose dependencies have completed are submitted together, so
+    independent branches run concurrently on the process manager's
+    workers. Outputs of the dependencies are handed to a step as
+    ``task["inputs"]`` (``{step_id: result}``) by reference, without a
+    serialization round trip while the processes run in this interpreter.
+    When a step fails, its downstream steps are skipped while independent
+    branches carry on; ``rerun`` then executes only what did not complete,
+    or everything downstream of chosen steps, reusing the other outputs.
+
+    A process manager's workers live on one event loop. When this manager
+    created its own, a run on a new loop (e.g. a later ``asyncio.run``)
+    replaces it once the old loop has closed; run records are kept.
+    """
+
+    def __init__(self, process_manager=None, max_runs: int = 100):
+        self._owns_process_manager = process_manager is None
+        self.process_manager = process_manager or self._new_process_manager()
+        self._loop: Optional["weakref.ReferenceType[asyncio.AbstractEventLoop]"] = None
+        self.max_runs = max_runs
+        self.runs: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._counter = itertools.count(1)
+
+    @staticmethod
+    def _new_process_manager():
+        from process import ProcessManager
+        return ProcessManager(num_workers=4)
+
+    def _bind_loop(self):
+        """Tie the process manager to the running loop, replacing it if its own loop is gone."""
+        loop = asyncio.get_running_loop()
+        bound = self._loop() if self._loop is not None else None
+        if bound is loop:
+            return
+        if bound is not None and not bound.is_closed():
+            raise RuntimeError("WorkflowManager is in use on another event loop")
+        if self._loop is not None:
+            if not self._owns_process_manager:
+                raise RuntimeError("The process manager's event loop has closed")
+            # Its workers died with their loop, though it still reports running
+            self.process_manager = self._new_process_manager()
+        self._loop = weakref.ref(loop)
+
+    def get_run(self, run_id: str) -> Optional[Dict[str, Any]]:
+        return self.runs.get(run_id)
+
+    async def run(self, workflow: Dict[str, Any], fail_fast: bool = False) -> Dict[str, Any]:
+        """Execute a workflow and return its run record."""
+        return await self._execute(workflow, parse_workflow(workflow), {}, None, fail_fast)
+
+    async def rerun(self, run_id: str, from_steps: Optional[Iterable[str]] = None,
+                    fail_fast: bool = False) -> Dict[str, Any]:
+        """Re-execute part of a previous run.
+
+        By default the failed and skipped steps run again; with
+        ``from_steps`` those steps and everything downstream of them do.
+        Outputs of all other completed steps are reused.
+        """
+        previous = self.runs.get(run_id)
+        if previous is None:
+            raise KeyError(run_id)
+        steps = parse_workflow(previous["workflow"])
+        if from_steps is None:
+            rerun = {step_id for step_id, state in previous["steps"].items() if state["status"] not in _DONE}
+        else:
+            from_steps = list(from_steps)
+            unknown = [step_id for step_id in from_steps if step_id not in steps]
+            if unknown:
+                raise ValueError(f"Unknown workflow steps: {', '.join(unknown)}")
+            rerun = descendants(steps, from_steps)
+        reused = {step_id: state["result"] for step_id, state in previous["steps"].items()
+                  if step_id not in rerun and state["status"] in _DONE}
+        return await self._execute(previous["workflow"], steps, reused, run_id, fail_fast)
+
+    def _new_run(self, workflow: Dict[str, Any], steps: Dict[str, Dict[str, Any]],
+                 resumed_from: Optional[str]) -> Dict[str, Any]:
+        run_id = f"run_{next(self._counter)}"
+        run = {
+            "id": run_id,
+            "name": workflow.get("name"),
+            "workflow": workflow,
+            "status": RUNNING,
+            "resumed_from": resumed_from,
+            "started_at": time.time(),
+            "finished_at": None,
+            "steps": {step_id: {"status": PENDING, "process_id": None, "result": None, "error": None,
+                                "ready_at": None, "started_at": None, "finished_at": None,
+                                "queue_seconds": None, "run_seconds": None, "latency_seconds": None}
+                      for step_id in steps},
+        }
+        self.runs[run_id] = run
+        while len(self.runs) > self.max_runs:
+            self.runs.popitem(last=False)
+        return run
+
+    async def _submit(self, step: Dict[str, Any], inputs: Dict[str, Any]) -> str:
+        task = copy.copy(step["task"])
+        if step["depends_on"]:
+            task["inputs"] = inputs
+        return await self.process_manager.create_process(
+            task,
+            tenant=step.get("tenant", "default"),
+            priority=step.get("priority", 1),
+            deadline=step.get("deadline"),
+            # Content keys would hash the upstream outputs; opt in per step
+            dedupe=step.get("dedupe", False),
+        )
+
+    async def _execute(self, workflow: Dict[str, Any], steps: Dict[str, Dict[str, Any]], reused: Dict[str, Any],
+                       resumed_from: Optional[str], fail_fast: bool) -> Dict[str, Any]:
+        from process import ProcessStatus
+        self._bind_loop()
+        await self.process_manager.start()
+        run = self._new_run(workflow, steps, resumed_from)
+        states = run["steps"]
+        for step_id, result in reused.items():
+            states[step_id].update(status=REUSED, result=result, latency_seconds=0.0)
+        waiting = {step_id: {dep for dep in step["depends_on"] if dep not in reused}
+                   for step_id, step in steps.items() if step_id not in reused}
+        running: Dict[asyncio.Task, str] = {}
+
+        async def launch(step_id: str):
+            state = states[step_id]
+            state["status"] = RUNNING
+            state["ready_at"] = time.time()
+            inputs = {dep: states[dep]["result"] for dep in steps[step_id]["depends_on"]}
+            try:
+                state["process_id"] = await self._submit(steps[step_id], inputs)
+            except Exception as e:
+                # Rejected by admission control, or a task the process manager can't take
+                state["finished_at"] = time.time()
+                state["latency_seconds"] = state["finished_at"] - state["ready_at"]
+                fail(step_id, f"Could not submit step: {e}")
+                return
+            waiter = asyncio.create_task(self.process_manager.wait_for(state["process_id"]))
+            running[waiter] = step_id
+
+        def fail(step_id: str, error: str):
+            states[step_id].update(status=FAILED, error=error)
+            for dependent in descendants(steps, [step_id]) - {step_id}:
+                if states[dependent]["status"] == PENDING:
+                    states[dependent].update(status=SKIPPED, error=f"Upstream step {step_id} failed")
+                    waiting.pop(dependent, None)
+            if fail_fast:
+                for other in waiting:
+                    states[other].update(status=SKIPPED, error="Workflow stopped after a failure")
+                waiting.clear()
+
+        try:
+            for step_id in [step_id for step_id, deps in waiting.items() if not deps]:
+                # A failed launch can skip the rest of the roots
+                if waiting.pop(step_id, None) is not None:
+                    await launch(step_id)
+            while running:
+                done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                for waiter in done:
+                    step_id = running.pop(waiter)
+                    state = states[step_id]
+                    process = waiter.result()
+                    state["finished_at"] = time.time()
+                    started = process.get("started_at")
+                    state["started_at"] = started.timestamp() if started else None
+                    state["latency_seconds"] = state["finished_at"] - state["ready_at"]
+                    if state["started_at"] is not None:
+                        state["queue_seconds"] = max(0.0, state["started_at"] - state["ready_at"])
+                        state["run_seconds"] = state["finished_at"] - state["started_at"]
+                    if process["status"] == ProcessStatus.COMPLETED:
+                        state.update(status=COMPLETED, result=process["result"])
+                        for dependent, deps in list(waiting.items()):
+                            deps.discard(step_id)
+                            if not deps and waiting.pop(dependent, None) is not None:
+                                await launch(dependent)
+                    else:
+                        fail(step_id, process["error"] or process["status"].value)
+        finally:
+            for waiter in running:
+                waiter.cancel()
+            for state in states.values():
+                # Only left unfinished when the run itself was interrupted
+                if state["status"] in (PENDING, RUNNING):
+                    state.update(status=FAILED, error="Workflow interrupted")
+            self._finish(run, steps)
+        return run
+
+    @staticmethod
+    def _finish(run: Dict[str, Any], steps: Dict[str, Dict[str, Any]]):
+        states = run["steps"]
+        run["finished_at"] = time.time()
+        run["status"] = COMPLETED if all(state["status"] in _DONE for state in states.values()) else FAILED
+        run["wall_seconds"] = run["finished_at"] - run["started_at"]
+        run["critical_path"] = critical_path(steps, states)
+
+    @staticmethod
+    def summarize(run: Dict[str, Any]) -> Dict[str, Any]:
+        """A run record without the workflow definition, for tool and API responses."""
+        return {key: value for key, value in run.items() if key != "workflow"}
+
+_default_manager: Optional[WorkflowManager] = None
+
+def get_workflow_manager() -> WorkflowManager:
+    """Shared WorkflowManager for callers without one of their own (e.g. tools)."""
+    global _default_manager
+    if _default_manager is None:
+        _default_manager = WorkflowManager()
+    return _default_manager
@@ -0,0 +1,73 @@
+from typing import Dict, Any, Optional, Tuple
+from collections import OrderedDict
+import hashlib
+import json
+import time
+
+def task_key(task: Dict[str, Any], tenant: str = "default") -> str:
+    """Content address of a task: SHA-256 of its canonical JSON, scoped to the tenant."""
+    canonical = json.dumps([tenant, task], sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+class TaskDeduplicator:
+    """Singleflight for identical in-flight tasks plus a TTL/LRU result cache.
+
+    ``in_flight`` maps a task key to the pending or running process that
+    owns it, so identical submissions attach to that process. When the
+    process completes its result is cached under the key for ``ttl``
+    seconds (at most ``max_results`` entries, least recently used evicted).
+    Failed processes are not cached.
+    """
+
+    def __init__(self, ttl: float = 300.0, max_results: int = 10_000):
+        self.ttl = ttl
+        self.max_results = max_results
+        self.in_flight: Dict[str, str] = {}
+        self._results: "OrderedDict[str, Tuple[float, str, Any]]" = OrderedDict()
+        self.submitted = 0
+        self.deduplicated = 0
+        self.cache_hits = 0
+        self.cache_evictions = 0
+
+    def lookup_in_flight(self, key: str) -> Optional[str]:
+        return self.in_flight.get(key)
+
+    def lookup_result(self, key: str) -> Optional[Tuple[str, Any]]:
+        """Return (process_id, result) of a cached completion, if still fresh."""
+        entry = self._results.get(key)
+        if entry is None:
+            return None
+        expires_at, process_id, result = entry
+        if expires_at <= time.monotonic():
+            del self._results[key]
+            self.cache_evictions += 1
+            return None
+        self._results.move_to_end(key)
+        return process_id, result
+
+    def start(self, key: str, process_id: str):
+        self.in_flight[key] = process_id
+
+    def finish(self, key: str, process_id: str, completed: bool, result: Any = None):
+        if self.in_flight.get(key) == process_id:
+            del self.in_flight[key]
+        if completed and self.ttl > 0:
+            self._results[key] = (time.monotonic() + self.ttl, process_id, result)
+            self._results.move_to_end(key)
+            while len(self._results) > self.max_results:
+                self._results.popitem(last=False)
+                self.cache_evictions += 1
+
+    def invalidate(self, key: str):
+        self._results.pop(key, None)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "submitted": self.submitted,
+            "deduplicated": self.deduplicated,
+            "cache_hits": self.cache_hits,
+            "executed": self.submitted - self.deduplicated - self.cache_hits,
+            "in_flight": len(self.in_flight),
+            "cached_results": len(self._results),
+            "cache_evictions": self.cache_evictions,
+        }
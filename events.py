@@ -0,0 +1,98 @@
+from typing import Dict, List, Any, Collection, Deque, Optional, Set
+from collections import deque
+import asyncio
+
+class Subscription:
+    """Bounded buffer of events for one consumer; iterate with ``async for``.
+
+    Holds at most ``maxsize`` undelivered events. When a slow consumer
+    falls behind, the oldest buffered events are dropped (and counted in
+    ``dropped``) rather than letting the buffer grow, so publishers never
+    block and memory stays bounded.
+    """
+
+    def __init__(self, bus: "EventBus", maxsize: int, process_id: Optional[str], statuses: Optional[Set[str]]):
+        self._bus = bus
+        self.process_id = process_id
+        self.statuses = statuses
+        self._events: Deque[Dict[str, Any]] = deque(maxlen=maxsize)
+        self._ready = asyncio.Event()
+        self.dropped = 0
+        self.closed = False
+
+    def _push(self, event: Dict[str, Any]):
+        if self.statuses is not None and event["status"] not in self.statuses:
+            return
+        if len(self._events) == self._events.maxlen:
+            self.dropped += 1
+        self._events.append(event)
+        self._ready.set()
+
+    async def get(self) -> Dict[str, Any]:
+        while not self._events:
+            if self.closed:
+                raise StopAsyncIteration
+            self._ready.clear()
+            await self._ready.wait()
+        return self._events.popleft()
+
+    def __aiter__(self) -> "Subscription":
+        return self
+
+    async def __anext__(self) -> Dict[str, Any]:
+        return await self.get()
+
+    def close(self):
+        if not self.closed:
+            self.closed = True
+            self._bus._unsubscribe(self)
+            self._ready.set()
+
+class EventBus:
+    """Fan-out of process events to subscriptions.
+
+    Subscriptions to one process are indexed by process id, so publishing
+    costs O(watchers of that process + global subscriptions) however many
+    processes are being watched.
+    """
+
+    def __init__(self):
+        self._by_process: Dict[str, List[Subscription]] = {}
+        self._global: List[Subscription] = []
+        self.published = 0
+
+    def subscribe(self, process_id: Optional[str] = None, statuses: Optional[Collection[str]] = None,
+                  maxsize: int = 1000) -> Subscription:
+        subscription = Subscription(self, maxsize, process_id, None if statuses is None else set(statuses))
+        if process_id is None:
+            self._global.append(subscription)
+        else:
+            self._by_process.setdefault(process_id, []).append(subscription)
+        return subscription
+
+    def _unsubscribe(self, subscription: Subscription):
+        if subscription.process_id is None:
+            self._global.remove(subscription)
+            return
+        subscriptions = self._by_process.get(subscription.process_id, [])
+        if subscription in subscriptions:
+            subscriptions.remove(subscription)
+        if not subscriptions:
+            self._by_process.pop(subscription.process_id, None)
+
+    def publish(self, event: Dict[str, Any]):
+        self.published += 1
+        for subscription in self._by_process.get(event["process_id"], ()):
+            subscription._push(event)
+        for subscription in self._global:
+            subscription._push(event)
+
+    def stats(self) -> Dict[str, Any]:
+        subscriptions = self._global + [s for subs in self._by_process.values() for s in subs]
+        return {
+            "published": self.published,
+            "subscriptions": len(subscriptions),
+            "watched_processes": len(self._by_process),
+            "buffered": sum(len(s._events) for s in subscriptions),
+            "dropped": sum(s.dropped for s in subscriptions),
+        }
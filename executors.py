@@ -0,0 +1,185 @@
+from typing import Dict, Any, Callable, Iterable, Optional, Sequence
+from concurrent.futures import Executor, ThreadPoolExecutor, ProcessPoolExecutor
+from enum import Enum
+from functools import lru_cache
+from multiprocessing import get_context, shared_memory
+import asyncio
+import contextvars
+import importlib
+import os
+import time
+import numpy as np
+
+class ExecutionClass(Enum):
+    ASYNC = "async"
+    THREAD = "thread"
+    PROCESS = "process"
+
+@lru_cache(maxsize=None)
+def resolve(path: str) -> Callable:
+    """Import a ``module:attribute`` path; cached so warm workers resolve it once."""
+    module_name, _, attribute = path.partition(":")
+    if not attribute:
+        raise ValueError(f"Expected 'module:function', got {path!r}")
+    target = importlib.import_module(module_name)
+    for part in attribute.split("."):
+        target = getattr(target, part)
+    return target
+
+def _warm(modules: Sequence[str]):
+    """Process pool initializer: import heavy modules once per worker."""
+    for module in modules:
+        importlib.import_module(module)
+
+def _ping(delay: float) -> int:
+    time.sleep(delay)
+    return os.getpid()
+
+class SharedResult:
+    """Handle to a large result left in shared memory by a pool worker.
+
+    Only the segment name and layout are pickled back to the parent, which
+    copies the data out once and frees the segment.
+    """
+
+    __slots__ = ("name", "size", "dtype", "shape")
+
+    def __init__(self, name: str, size: int, dtype: Optional[str] = None, shape: Optional[tuple] = None):
+        self.name = name
+        self.size = size
+        self.dtype = dtype
+        self.shape = shape
+
+    @classmethod
+    def export(cls, value: Any, threshold: int) -> Any:
+        """Move large bytes-like values and numpy arrays into shared memory."""
+        if isinstance(value, np.ndarray):
+            if value.nbytes < threshold or value.dtype.hasobject:
+                return value
+            data = np.ascontiguousarray(value)
+            dtype, shape = data.dtype.str, data.shape
+            source = memoryview(data).cast("B")
+        elif isinstance(value, (bytes, bytearray, memoryview)):
+            source = memoryview(value).cast("B")
+            if source.nbytes < threshold:
+                return value
+            dtype = shape = None
+        else:
+            return value
+        segment = shared_memory.SharedMemory(create=True, size=max(source.nbytes, 1))
+        try:
+            segment.buf[:source.nbytes] = source
+        finally:
+            segment.close()
+        return cls(segment.name, source.nbytes, dtype, shape)
+
+    def discard(self):
+        segment = shared_memory.SharedMemory(name=self.name)
+        segment.close()
+        segment.unlink()
+
+    def load(self) -> Any:
+        segment = shared_memory.SharedMemory(name=self.name)
+        try:
+            if self.dtype is None:
+                return bytes(segment.buf[:self.size])
+            return np.frombuffer(segment.buf, dtype=self.dtype, count=int(np.prod(self.shape))).reshape(self.shape).copy()
+        finally:
+            segment.close()
+            segment.unlink()
+
+def _discard_result(future):
+    # The caller gave up on this task; free any segment the worker left behind
+    if not future.cancelled() and future.exception() is None and isinstance(future.result(), SharedResult):
+        future.result().discard()
+
+def _call(path: str, args: Sequence[Any], kwargs: Dict[str, Any], shm_threshold: int) -> Any:
+    return SharedResult.export(resolve(path)(*args, **kwargs), shm_threshold)
+
+class TaskExecutor:
+    """Runs blocking or CPU-bound task functions off the event loop.
+
+    THREAD tasks go to a bounded ``ThreadPoolExecutor`` (for blocking I/O
+    and libraries that release the GIL); PROCESS tasks go to a bounded
+    ``ProcessPoolExecutor`` whose workers are created once, run the
+    ``warm_modules`` imports on start-up and are reused for every task.
+    Functions are named by ``module:function`` path so only the path and
+    arguments are pickled. Process results that are bytes-like or numpy
+    arrays of at least ``shm_threshold`` bytes come back through shared
+    memory instead of the result pipe.
+    """
+
+    def __init__(self, thread_workers: Optional[int] = None, process_workers: Optional[int] = None,
+                 warm_modules: Iterable[str] = (), shm_threshold: int = 1 << 20,
+                 start_method: Optional[str] = None):
+        cpus = os.cpu_count() or 1
+        self.thread_workers = thread_workers or min(32, cpus + 4)
+        self.process_workers = process_workers or cpus
+        self.warm_modules = tuple(warm_modules)
+        self.shm_threshold = shm_threshold
+        # fork is unsafe once the parent runs threads (SQLite flushers, pools)
+        self.start_method = start_method or "forkserver"
+        self._threads: Optional[ThreadPoolExecutor] = None
+        self._processes: Optional[ProcessPoolExecutor] = None
+        self.submitted = {execution: 0 for execution in (ExecutionClass.THREAD, ExecutionClass.PROCESS)}
+        self.shared_results = 0
+
+    def _pool(self, execution: ExecutionClass) -> Executor:
+        if execution == ExecutionClass.THREAD:
+            if self._threads is None:
+                self._threads = ThreadPoolExecutor(self.thread_workers, thread_name_prefix="task")
+            return self._threads
+        if self._processes is None:
+            self._processes = ProcessPoolExecutor(
+                self.process_workers, mp_context=get_context(self.start_method),
+                initializer=_warm, initargs=(self.warm_modules,)
+            )
+        return self._processes
+
+    async def run(self, execution: ExecutionClass, function: str, args: Sequence[Any] = (),
+                  kwargs: Optional[Dict[str, Any]] = None) -> Any:
+        """Run ``function`` (a ``module:function`` path) in the pool for ``execution``."""
+        execution = ExecutionClass(execution)
+        kwargs = kwargs or {}
+        loop = asyncio.get_running_loop()
+        self.submitted[execution] += 1
+        if execution == ExecutionClass.THREAD:
+            # Carry context variables (e.g. the current process for progress reports) into the thread
+            context = contextvars.copy_context()
+            return await loop.run_in_executor(
+                self._pool(execution), lambda: context.run(resolve(function), *args, **kwargs)
+            )
+        if execution == ExecutionClass.PROCESS:
+            future = self._pool(execution).submit(_call, function, tuple(args), kwargs, self.shm_threshold)
+            try:
+                result = await asyncio.wrap_future(future)
+            except asyncio.CancelledError:
+                future.add_done_callback(_discard_result)
+                raise
+            if isinstance(result, SharedResult):
+                self.shared_results += 1
+                return result.load()
+            return result
+        raise ValueError(f"{execution} tasks run on the event loop")
+
+    async def warmup(self):
+        """Start every process worker now instead of on the first tasks."""
+        loop = asyncio.get_running_loop()
+        pool = self._pool(ExecutionClass.PROCESS)
+        await asyncio.gather(*(loop.run_in_executor(pool, _ping, 0.05) for _ in range(self.process_workers)))
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "thread_workers": self.thread_workers,
+            "process_workers": self.process_workers,
+            "submitted": {execution.value: count for execution, count in self.submitted.items()},
+            "shared_results": self.shared_results,
+        }
+
+    def shutdown(self, wait: bool = True):
+        if self._threads is not None:
+            self._threads.shutdown(wait=wait, cancel_futures=not wait)
+            self._threads = None
+        if self._processes is not None:
+            self._processes.shutdown(wait=wait, cancel_futures=not wait)
+            self._processes = None
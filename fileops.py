@@ -0,0 +1,217 @@
+from typing import Dict, List, Any, AsyncIterable, Callable, Iterable, Optional, Tuple, Union
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+import asyncio
+import itertools
+import mmap
+import os
+import re
+import secrets
+
+CHUNK_SIZE = 1 << 20
+
+Chunk = Union[str, bytes]
+
+def _decode(data: bytes) -> str:
+    return data.decode('utf-8', errors='replace')
+
+def read_range(path: str, offset: int = 0, length: Optional[int] = None) -> str:
+    """Read ``length`` bytes from ``offset`` (negative: from the end); all of the rest if no length."""
+    with open(path, 'rb') as f:
+        if offset < 0:
+            f.seek(max(0, os.fstat(f.fileno()).st_size + offset))
+        else:
+            f.seek(offset)
+        return _decode(f.read(-1 if length is None else length))
+
+def head(path: str, lines: int = 10) -> str:
+    """First ``lines`` lines, read line by line."""
+    out = []
+    with open(path, 'rb') as f:
+        for line in f:
+            if len(out) >= lines:
+                break
+            out.append(line)
+    return _decode(b"".join(out))
+
+def tail(path: str, lines: int = 10, block_size: int = 1 << 16) -> str:
+    """Last ``lines`` lines, reading backwards from the end in blocks."""
+    with open(path, 'rb') as f:
+        position = f.seek(0, os.SEEK_END)
+        blocks = []
+        newlines = 0
+        while position > 0 and newlines <= lines:
+            step = min(block_size, position)
+            position -= step
+            f.seek(position)
+            block = f.read(step)
+            newlines += block.count(b"\n")
+            blocks.append(block)
+    data = b"".join(reversed(blocks))
+    return _decode(b"".join(data.splitlines(keepends=True)[-lines:]) if lines > 0 else b"")
+
+def read_lines(path: str, start: int = 1, end: Optional[int] = None) -> str:
+    """Lines ``start`` to ``end`` inclusive (1-based), streaming past the ones before."""
+    out = []
+    with open(path, 'rb') as f:
+        for number, line in enumerate(f, 1):
+            if end is not None and number > end:
+                break
+            if number >= start:
+                out.append(line)
+    return _decode(b"".join(out))
+
+def _count_newlines(buffer: mmap.mmap, start: int, stop: int) -> int:
+    count = 0
+    for position in range(start, stop, CHUNK_SIZE):
+        count += buffer[position:min(stop, position + CHUNK_SIZE)].count(b"\n")
+    return count
+
+def _windows(buffer: mmap.mmap, size: int) -> Iterable[Tuple[int, int]]:
+    """Split a map into windows of about ``size`` bytes that end on line boundaries."""
+    start, total = 0, len(buffer)
+    while start < total:
+        end = min(total, start + size)
+        if end < total:
+            newline = buffer.rfind(b"\n", start, end)
+            end = newline + 1 if newline != -1 else end
+        yield start, end
+        start = end
+
+def search(path: str, pattern: str, regex: bool = False, ignore_case: bool = False,
+           max_matches: int = 100, window: int = 64 << 20) -> List[Dict[str, Any]]:
+    """Find ``pattern`` in a file through a memory map; returns line number, offset and line per match.
+
+    The map is scanned in line-aligned windows of about ``window`` bytes
+    (so a regex match cannot span two windows), and each window's pages
+    are released from the process once it has been searched: memory stays
+    bounded however large the file is.
+    """
+    matches = []
+    if os.path.getsize(path) == 0:
+        return matches
+    needle = pattern.encode('utf-8')
+    compiled = None
+    if regex or ignore_case:
+        compiled = re.compile(needle if regex else re.escape(needle), re.IGNORECASE if ignore_case else 0)
+    with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+        line, counted_to, released = 1, 0, 0
+        for start, end in _windows(buffer, window):
+            limit = max_matches - len(matches)
+            if compiled is not None:
+                positions = [match.start() for match in itertools.islice(compiled.finditer(buffer, start, end), limit)]
+            else:
+                positions = _find_all(buffer, needle, start, end, limit)
+            for position in positions:
+                line += _count_newlines(buffer, counted_to, position)
+                counted_to = position
+                line_start = buffer.rfind(b"\n", 0, position) + 1
+                line_end = buffer.find(b"\n", position)
+                text = buffer[line_start:line_end if line_end != -1 else len(buffer)]
+                matches.append({"line": line, "offset": position, "text": _decode(text[:1000])})
+                if len(matches) >= max_matches:
+                    return matches
+            # Count the rest of the window now, while it is mapped, so later line
+            # numbers never need pages that have been released
+            line += _count_newlines(buffer, counted_to, end)
+            counted_to = end
+            if hasattr(mmap, "MADV_DONTNEED"):
+                # The pages stay in the OS cache; only this process's mapping of them is dropped
+                until = end - end % mmap.PAGESIZE
+                if until > released:
+                    buffer.madvise(mmap.MADV_DONTNEED, released, until - released)
+                    released = until
+    return matches
+
+def _find_all(buffer: mmap.mmap, needle: bytes, start: int, end: int, limit: int) -> List[int]:
+    positions = []
+    position = buffer.find(needle, start, end + len(needle) - 1)
+    while position != -1 and len(positions) < limit:
+        positions.append(position)
+        position = buffer.find(needle, position + max(1, len(needle)), end + len(needle) - 1)
+    return positions
+
+def _encode(chunk: Chunk) -> bytes:
+    return chunk.encode('utf-8') if isinstance(chunk, str) else chunk
+
+def _open_temp(path: str) -> Tuple[int, str, str]:
+    """Create a temporary file beside the real target of ``path`` (symlinks resolved).
+
+    It gets the mode a plain open() would give a new file (0o666 less the
+    umask). Returns its descriptor, its path and the target it should replace.
+    """
+    target = os.path.realpath(path)
+    directory, name = os.path.split(target)
+    flags = os.O_CREAT | os.O_EXCL | os.O_WRONLY | getattr(os, "O_BINARY", 0)
+    while True:
+        temp_path = os.path.join(directory, f".tmp-{secrets.token_hex(6)}-{name}")
+        try:
+            return os.open(temp_path, flags, 0o666), temp_path, target
+        except FileExistsError:
+            continue
+
+def _replace(temp_path: str, target: str):
+    """Move a finished temporary file over ``target``, keeping the mode of the file it replaces."""
+    try:
+        os.chmod(temp_path, os.stat(target).st_mode & 0o7777)
+    except FileNotFoundError:
+        pass
+    os.replace(temp_path, target)
+
+def write_chunks(path: str, chunks: Iterable[Chunk], append: bool = False) -> int:
+    """Write chunks as they are produced; returns bytes written.
+
+    A new write goes to a temporary file that replaces ``path`` (or the
+    file it links to) only once complete, so readers never see a partial
+    file; the file keeps its mode. Appends go straight to the end of ``path``.
+    """
+    written = 0
+    if append:
+        with open(path, 'ab') as f:
+            for chunk in chunks:
+                written += f.write(_encode(chunk))
+        return written
+    fd, temp_path, target = _open_temp(path)
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            for chunk in chunks:
+                written += f.write(_encode(chunk))
+        _replace(temp_path, target)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+    return written
+
+_io_executor: Optional[ThreadPoolExecutor] = None
+
+def get_io_executor(max_workers: int = 4) -> ThreadPoolExecutor:
+    """Bounded thread pool for blocking file I/O from async code."""
+    global _io_executor
+    if _io_executor is None:
+        _io_executor = ThreadPoolExecutor(max_workers, thread_name_prefix="file-io")
+    return _io_executor
+
+async def run_io(function: Callable, *args, **kwargs) -> Any:
+    return await asyncio.get_running_loop().run_in_executor(get_io_executor(), partial(function, *args, **kwargs))
+
+async def awrite_chunks(path: str, chunks: AsyncIterable[Chunk], append: bool = False) -> int:
+    """``write_chunks`` for an async chunk source; each write runs on the I/O pool."""
+    written = 0
+    if append:
+        f = await run_io(open, path, 'ab')
+        try:
+            async for chunk in chunks:
+                written += await run_io(f.write, _encode(chunk))
+        finally:
+            await run_io(f.close)
+        return written
+    fd, temp_path, target = _open_temp(path)
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            async for chunk in chunks:
+                written += await run_io(f.write, _encode(chunk))
+        await run_io(_replace, temp_path, target)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+    return written
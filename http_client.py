@@ -0,0 +1,187 @@
+from typing import TYPE_CHECKING, Dict, Any, AsyncIterator, Optional
+from contextlib import asynccontextmanager
+from http.cookiejar import CookiePolicy
+import asyncio
+import threading
+import weakref
+
+if TYPE_CHECKING:
+    # aiohttp and requests take ~300 ms to import; they load with the first session
+    import aiohttp
+    import requests
+
+class HTTPResponse:
+    """A fully read response: status, headers (lower-cased names) and body bytes."""
+
+    __slots__ = ("status", "headers", "body", "url")
+
+    def __init__(self, status: int, headers: Dict[str, str], body: bytes, url: str):
+        self.status = status
+        self.headers = headers
+        self.body = body
+        self.url = url
+
+    @property
+    def text(self) -> str:
+        return self.body.decode('utf-8', errors='replace')
+
+class _NoCookies(CookiePolicy):
+    """Cookie policy that neither stores nor sends cookies."""
+
+    netscape = True
+    rfc2965 = False
+    hide_cookie2 = False
+
+    def set_ok(self, cookie, request) -> bool:
+        return False
+
+    def return_ok(self, cookie, request) -> bool:
+        return False
+
+    def domain_return_ok(self, domain, request) -> bool:
+        return False
+
+    def path_return_ok(self, path, request) -> bool:
+        return False
+
+class HTTPClient:
+    """Pooled HTTP client with a native async path and a blocking one.
+
+    The async path uses one ``aiohttp.ClientSession`` per event loop, with
+    keep-alive connections capped at ``limit`` in total and
+    ``limit_per_host`` per host. The blocking path uses one
+    ``requests.Session`` per thread, with pools of the same size. Timeouts
+    are in seconds and can be overridden per request. Large bodies can be
+    consumed incrementally with ``stream`` or written to disk with
+    ``download``, so they need not be buffered in memory.
+
+    Sessions are shared by every caller, so neither keeps cookies: a
+    ``Set-Cookie`` from one request is never sent with another. Pass
+    cookies per request where they are needed.
+    """
+
+    def __init__(self, limit: int = 100, limit_per_host: int = 10, timeout: float = 30.0,
+                 connect_timeout: float = 10.0, keepalive_timeout: float = 30.0,
+                 chunk_size: int = 1 << 16, headers: Optional[Dict[str, str]] = None):
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.timeout = timeout
+        self.connect_timeout = connect_timeout
+        self.keepalive_timeout = keepalive_timeout
+        self.chunk_size = chunk_size
+        self.headers = headers or {}
+        self._sessions: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, aiohttp.ClientSession]" = \
+            weakref.WeakKeyDictionary()
+        self._local = threading.local()
+        self._sync_sessions = []
+        self._sync_lock = threading.Lock()
+        self.requests = 0
+        self.bytes_received = 0
+
+    def _timeout(self, timeout: Optional[float]) -> "aiohttp.ClientTimeout":
+        import aiohttp
+        return aiohttp.ClientTimeout(total=timeout or self.timeout, connect=self.connect_timeout)
+
+    def session(self) -> "aiohttp.ClientSession":
+        """The pooled session for the running event loop."""
+        import aiohttp
+        loop = asyncio.get_running_loop()
+        session = self._sessions.get(loop)
+        if session is None or session.closed:
+            connector = aiohttp.TCPConnector(limit=self.limit, limit_per_host=self.limit_per_host,
+                                             keepalive_timeout=self.keepalive_timeout)
+            session = self._sessions[loop] = aiohttp.ClientSession(
+                connector=connector, timeout=self._timeout(None), headers=self.headers,
+                cookie_jar=aiohttp.DummyCookieJar()
+            )
+        return session
+
+    def sync_session(self) -> "requests.Session":
+        """The pooled ``requests.Session`` for the calling thread."""
+        session = getattr(self._local, "session", None)
+        if session is None:
+            import requests
+            from requests.adapters import HTTPAdapter
+            session = self._local.session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=self.limit_per_host, pool_maxsize=self.limit_per_host)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            session.headers.update(self.headers)
+            session.cookies.set_policy(_NoCookies())
+            with self._sync_lock:
+                self._sync_sessions.append(session)
+        return session
+
+    async def request(self, method: str, url: str, timeout: Optional[float] = None,
+                      **kwargs) -> HTTPResponse:
+        """Send a request and read the whole body; ``kwargs`` go to aiohttp (json, data, headers, params)."""
+        self.requests += 1
+        async with self.session().request(method, url, timeout=self._timeout(timeout), **kwargs) as response:
+            body = await response.read()
+        self.bytes_received += len(body)
+        return HTTPResponse(response.status, {k.lower(): v for k, v in response.headers.items()},
+                            body, str(response.url))
+
+    @asynccontextmanager
+    async def stream(self, method: str, url: str, timeout: Optional[float] = None,
+                     **kwargs) -> AsyncIterator["aiohttp.ClientResponse"]:
+        """Open a response without reading its body; iterate ``response.content.iter_chunked(n)``."""
+        self.requests += 1
+        async with self.session().request(method, url, timeout=self._timeout(timeout), **kwargs) as response:
+            yield response
+
+    async def download(self, method: str, url: str, path: str, timeout: Optional[float] = None,
+                       **kwargs) -> int:
+        """Stream a response body to ``path`` in chunks; returns the number of bytes written."""
+        size = 0
+        async with self.stream(method, url, timeout=timeout, **kwargs) as response:
+            response.raise_for_status()
+            with open(path, 'wb') as f:
+                async for chunk in response.content.iter_chunked(self.chunk_size):
+                    # Disk writes are short next to the network reads they follow
+                    f.write(chunk)
+                    size += len(chunk)
+        self.bytes_received += size
+        return size
+
+    def request_sync(self, method: str, url: str, timeout: Optional[float] = None, **kwargs) -> HTTPResponse:
+        """Blocking ``request`` on the calling thread's pooled session."""
+        self.requests += 1
+        response = self.sync_session().request(
+            method, url, timeout=(self.connect_timeout, timeout or self.timeout), **kwargs
+        )
+        self.bytes_received += len(response.content)
+        return HTTPResponse(response.status_code, {k.lower(): v for k, v in response.headers.items()},
+                            response.content, response.url)
+
+    async def aclose(self):
+        """Close the running loop's session and every thread's blocking session."""
+        session = self._sessions.pop(asyncio.get_running_loop(), None)
+        if session is not None:
+            await session.close()
+        self.close()
+
+    def close(self):
+        with self._sync_lock:
+            sessions, self._sync_sessions = self._sync_sessions, []
+        for session in sessions:
+            session.close()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "requests": self.requests,
+            "bytes_received": self.bytes_received,
+            "async_sessions": len(self._sessions),
+            "sync_sessions": len(self._sync_sessions),
+            "limit": self.limit,
+            "limit_per_host": self.limit_per_host,
+        }
+
+_default_client: Optional[HTTPClient] = None
+
+def get_http_client() -> HTTPClient:
+    """Shared HTTPClient for callers without one of their own (e.g. tools)."""
+    global _default_client
+    if _default_client is None:
+        _default_client = HTTPClient()
+    return _default_client
@@ -1,12 +1,18 @@
-from typing import Dict, Any, List
+from typing import Dict, Any, Iterator, List, Optional
 from praisonai_tools import MemoryTool
 from langchain.memory import ConversationBufferMemory
-from langchain.schema import BaseMessage
-import json
+from langchain.schema import BaseMessage, SystemMessage
+from core.lazy import LineJSONFile, open_line_json
+from core.serialization import JSONSerializer, load_snapshot
+from core.tiered import TieredMemory
+import atexit
 import os
+import threading
+import time
 
 class MemoryManager:
-    def __init__(self):
+    def __init__(self, write_behind: bool = False, flush_interval: float = 1.0, max_dirty: int = 50,
+                 tiered: Optional[TieredMemory] = None, recall_index=None, serializer=None):
         self.memory = ConversationBufferMemory(
             memory_key="chat_history",
             return_messages=True
@@ -14,6 +20,34 @@ class MemoryManager:
         self.memory_tool = MemoryTool()
         self.context: Dict[str, Any] = {}
         self.persistence_file = "memory.json"
+        # Snapshot format for persistence_file; loading detects the format
+        self.serializer = serializer or JSONSerializer()
+        # In tiered mode the buffer memory only holds the hot window
+        self.tiered = tiered
+        # Optional core.recall.RecallIndex for semantic lookup of past turns
+        self.recall_index = recall_index
+        # In lazy mode the buffer memory only holds the newest messages;
+        # older ones stay on disk and are parsed a page at a time
+        self._cold: Optional[LineJSONFile] = None
+
+        # Write-behind persistence: mutations only mark memory dirty and a
+        # background thread coalesces them into a single atomic write.
+        self.write_behind = write_behind
+        self.flush_interval = flush_interval
+        self.max_dirty = max_dirty
+        self._dirty = 0
+        self._first_dirty_at: Optional[float] = None
+        # Written without fsync since the last flush
+        self._unsynced = False
+        self._state_lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._wakeup = threading.Condition(self._state_lock)
+        self._closed = False
+        self._flusher: Optional[threading.Thread] = None
+        if write_behind:
+            self._flusher = threading.Thread(target=self._flush_loop, daemon=True)
+            self._flusher.start()
+            atexit.register(self.close)
 
     def add_context(self, key: str, value: Any):
         """Add context to the memory."""
@@ -34,38 +68,197 @@ class MemoryManager:
     def add_message(self, message: BaseMessage):
         """Add a message to the conversation history."""
         self.memory.chat_memory.add_message(message)
+        if self.recall_index is not None:
+            self.recall_index.add(message.content, message)
+        if self.tiered:
+            spilled = self.tiered.add(message)
+            if spilled:
+                del self.memory.chat_memory.messages[:len(spilled)]
         self._persist_memory()
 
-    def get_messages(self) -> List[BaseMessage]:
-        """Get all messages from the conversation history."""
-        return self.memory.chat_memory.messages
+    def get_messages(self, offset: Optional[int] = None, limit: Optional[int] = None) -> List[BaseMessage]:
+        """Get messages from the conversation history.
+
+        Without arguments this returns the messages held in memory (all of
+        them unless loaded lazily). ``offset``/``limit`` select a page of the
+        whole history, counting from the oldest message; ``limit`` alone
+        selects the newest messages.
+        """
+        messages = self.memory.chat_memory.messages
+        if offset is None and limit is None:
+            return messages
+        cold_count = len(self._cold) if self._cold is not None else 0
+        total = cold_count + len(messages)
+        start = offset if offset is not None else max(0, total - limit)
+        stop = total if limit is None else min(total, start + limit)
+        page = []
+        if self._cold is not None and start < cold_count:
+            page = [BaseMessage.parse_obj(msg) for msg in self._cold.read(start, min(stop, cold_count))]
+        return page + messages[max(0, start - cold_count):max(0, stop - cold_count)]
+
+    def count_messages(self) -> int:
+        """Get the total number of messages, including ones not loaded."""
+        cold_count = len(self._cold) if self._cold is not None else 0
+        return cold_count + len(self.memory.chat_memory.messages)
+
+    def iter_messages(self, page_size: int = 1000) -> Iterator[BaseMessage]:
+        """Iterate the whole conversation history, one page in memory at a time."""
+        offset = 0
+        while True:
+            page = self.get_messages(offset=offset, limit=page_size)
+            yield from page
+            if len(page) < page_size:
+                return
+            offset += len(page)
+
+    def get_prompt_messages(self) -> List[BaseMessage]:
+        """Get the messages to send to the LLM: rolling summary plus hot window."""
+        messages = self.memory.chat_memory.messages
+        if self.tiered:
+            summary = self.tiered.summary_message()
+            if summary:
+                return [SystemMessage(content=summary["content"])] + list(messages)
+        return messages
+
+    def recall(self, query: str, k: int = 5) -> List[BaseMessage]:
+        """Get the k past messages most relevant to a query."""
+        if self.recall_index is None:
+            raise ValueError("No recall index configured")
+        return [message for message, _ in self.recall_index.search(query, k)]
 
     def clear_messages(self):
         """Clear all messages from the conversation history."""
         self.memory.clear()
+        self._cold = None
+        if self.recall_index is not None:
+            self.recall_index.clear()
+        if self.tiered:
+            self.tiered.clear()
         self._persist_memory()
 
     def _persist_memory(self):
-        """Persist memory to disk."""
+        """Persist memory to disk, or schedule it when write-behind is enabled."""
+        if not self.write_behind or self._closed:
+            with self._write_lock:
+                # Durable from the next flush() or close(); an fsync per turn would stall the caller
+                self._write_memory(*self._snapshot())
+                self._unsynced = True
+            return
+        with self._wakeup:
+            self._dirty += 1
+            if self._first_dirty_at is None:
+                self._first_dirty_at = time.monotonic()
+                self._wakeup.notify()
+            elif self._dirty >= self.max_dirty:
+                self._wakeup.notify()
+
+    def _snapshot(self):
+        """Take a cheap copy of the state to be written."""
+        archived = self.tiered.archived if self.tiered else None
+        return dict(self.context), list(self.memory.chat_memory.messages), archived, self._cold
+
+    def _write_memory(self, context: Dict[str, Any], messages: List[BaseMessage], archived: Optional[int] = None,
+                      cold: Optional[LineJSONFile] = None, fsync: bool = False):
+        """Serialize and atomically write memory to disk. Caller holds the write lock.
+
+        The default JSON serializer writes one message per line so the file can
+        be loaded lazily; messages still on disk in ``cold`` are carried over.
+        """
         try:
-            data = {
-                "context": self.context,
-                "messages": [msg.dict() for msg in self.memory.chat_memory.messages]
-            }
-            with open(self.persistence_file, 'w') as f:
-                json.dump(data, f)
+            extra = {"context": context}
+            if archived is not None:
+                extra["archived"] = archived
+            self.serializer.dump(self.persistence_file, "messages", (msg.dict() for msg in messages), extra,
+                                 cold=cold, fsync=fsync)
         except Exception as e:
             print(f"Error persisting memory: {e}")
 
-    def load_memory(self):
-        """Load memory from disk."""
+    def _flush_loop(self):
+        """Background writer that coalesces dirty mutations."""
+        while True:
+            with self._wakeup:
+                while not self._closed:
+                    if self._dirty >= self.max_dirty:
+                        break
+                    if self._first_dirty_at is not None:
+                        remaining = self._first_dirty_at + self.flush_interval - time.monotonic()
+                        if remaining <= 0:
+                            break
+                        self._wakeup.wait(remaining)
+                    else:
+                        self._wakeup.wait()
+                if self._closed:
+                    return
+            self.flush()
+
+    def flush(self):
+        """Write any pending mutations to disk now and make them durable."""
+        with self._write_lock:
+            with self._wakeup:
+                dirty = self._dirty
+                self._dirty = 0
+                self._first_dirty_at = None
+                snapshot = self._snapshot() if dirty else None
+            if snapshot is not None:
+                self._write_memory(*snapshot, fsync=True)
+            elif self._unsynced and os.path.exists(self.persistence_file):
+                fd = os.open(self.persistence_file, os.O_RDONLY)
+                try:
+                    os.fsync(fd)
+                finally:
+                    os.close(fd)
+            self._unsynced = False
+
+    def close(self):
+        """Flush pending writes and stop the background writer."""
+        with self._wakeup:
+            if self._closed:
+                return
+            self._closed = True
+            self._wakeup.notify()
+        if self._flusher is not None:
+            self._flusher.join()
+        self.flush()
+        if self.write_behind:
+            atexit.unregister(self.close)
+
+    def load_memory(self, lazy_tail: Optional[int] = None):
+        """Load memory from disk.
+
+        With ``lazy_tail`` only the context and the last ``lazy_tail`` messages
+        are parsed up front; older messages are paged in by get_messages.
+        """
         try:
-            if os.path.exists(self.persistence_file):
-                with open(self.persistence_file, 'r') as f:
-                    data = json.load(f)
-                    self.context = data.get("context", {})
-                    messages = data.get("messages", [])
-                    for msg in messages:
-                        self.memory.chat_memory.add_message(BaseMessage.parse_obj(msg))
+            cold = open_line_json(self.persistence_file, "messages") if lazy_tail is not None else None
+            if cold is not None:
+                self._cold = cold
+                self.context = cold.extra.get("context", {})
+                messages = cold.load_tail(lazy_tail)
+                offset = cold.extra.get("archived", 0)
+                if self.tiered:
+                    offset += len(cold)
+                parsed = [BaseMessage.parse_obj(msg) for msg in messages]
+                if self.recall_index is not None:
+                    self.recall_index.clear()
+                    self.recall_index.add_many((msg.content, msg) for msg in parsed)
+                if self.tiered:
+                    parsed = self.tiered.restore(parsed, offset)
+                for msg in parsed:
+                    self.memory.chat_memory.add_message(msg)
+            elif os.path.exists(self.persistence_file):
+                data, messages = load_snapshot(self.persistence_file, "messages")
+                self.context = data.get("context", {})
+                offset = data.get("archived", 0)
+                if self.tiered:
+                    messages = messages[max(0, self.tiered.archived - offset):]
+                    offset = self.tiered.archived
+                parsed = [BaseMessage.parse_obj(msg) for msg in messages]
+                if self.recall_index is not None:
+                    self.recall_index.clear()
+                    self.recall_index.add_many((msg.content, msg) for msg in parsed)
+                if self.tiered:
+                    parsed = self.tiered.restore(parsed, offset)
+                for msg in parsed:
+                    self.memory.chat_memory.add_message(msg)
         except Exception as e:
-            print(f"Error loading memory: {e}") 
\ No newline at end of file
+            print(f"Error loading memory: {e}")
\ No newline at end of file
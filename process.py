@@ -1,83 +1,774 @@
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, AsyncIterator, Callable, Collection, Iterator, List, Optional, Set, Union
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+from collections.abc import Mapping
 from enum import Enum
 import asyncio
+import concurrent.futures
+import contextvars
+import itertools
+import os
+import socket
+import time
+import uuid
 from datetime import datetime
 from praisonai_tools import ProcessTool
+from batching import MicroBatcher
+from dedupe import TaskDeduplicator, task_key
+from events import EventBus, Subscription
+from executors import ExecutionClass, TaskExecutor
+from scheduler import AdmissionRejected, FairQueue, Priority
+from taskqueue import SQLiteTaskQueue
 
 class ProcessStatus(Enum):
     PENDING = "pending"
     RUNNING = "running"
     COMPLETED = "completed"
     FAILED = "failed"
+    EXPIRED = "expired"
+    CANCELLED = "cancelled"
+
+TERMINAL_STATUSES = frozenset({
+    ProcessStatus.COMPLETED, ProcessStatus.FAILED, ProcessStatus.EXPIRED, ProcessStatus.CANCELLED
+})
+
+# (manager, process_id, loop) of the process running in the current context
+_current_process: contextvars.ContextVar = contextvars.ContextVar("current_process", default=None)
+
+def report_progress(progress: Optional[float] = None, message: Optional[str] = None, data: Any = None):
+    """Report progress of the process running in the current context.
+
+    Callable from the task's coroutine or, for thread-class tasks, from the
+    worker thread. Does nothing outside a ProcessManager task.
+    """
+    current = _current_process.get()
+    if current is None:
+        return
+    manager, process_id, loop = current
+    try:
+        on_loop = asyncio.get_running_loop() is loop
+    except RuntimeError:
+        on_loop = False
+    if on_loop:
+        manager.report_progress(process_id, progress, message, data)
+    else:
+        loop.call_soon_threadsafe(manager.report_progress, process_id, progress, message, data)
+
+class ProcessRegistry(Mapping):
+    """Process records indexed by ID, status and creation time.
+
+    IDs combine the creation second with a per-registry counter, so they are
+    unique and sort in creation order at any submission rate. Status changes
+    must go through ``update`` to keep the status index current. Finished
+    records (completed, failed or expired) are evicted oldest first once
+    they are older than ``ttl`` seconds or the registry holds more than
+    ``max_records``; pending and running records are never evicted.
+    """
+
+    def __init__(self, ttl: Optional[float] = None, max_records: Optional[int] = None, node: Optional[str] = None,
+                 on_finished: Optional[Callable[[Dict[str, Any]], None]] = None,
+                 on_change: Optional[Callable[[Dict[str, Any]], None]] = None):
+        self.ttl = ttl
+        # Called with the record when it is added and on every status change
+        self.on_change = on_change
+        # Called with the record whenever a process reaches a terminal status
+        self.on_finished = on_finished
+        # Distinguishes IDs minted by processes sharing a durable queue
+        self.node = node
+        self.max_records = max_records
+        self._records: Dict[str, Dict[str, Any]] = {}
+        # Insertion-ordered dicts used as ordered sets, one per status
+        self._by_status: Dict[ProcessStatus, Dict[str, None]] = {status: {} for status in ProcessStatus}
+        # Finished records in completion order, with their completion time
+        self._finished: "OrderedDict[str, float]" = OrderedDict()
+        # Append-only creation index; evicted IDs are skipped and compacted lazily
+        self._created_times: List[float] = []
+        self._created_ids: List[str] = []
+        self._counter = itertools.count()
+        self._id_second = None
+        self._id_prefix = ""
+        self.evictions = 0
+
+    def __getitem__(self, process_id: str) -> Dict[str, Any]:
+        return self._records[process_id]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._records)
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def new_id(self) -> str:
+        second = int(time.time())
+        if second != self._id_second:
+            self._id_second = second
+            self._id_prefix = f"process_{datetime.fromtimestamp(second).strftime('%Y%m%d_%H%M%S')}_"
+            if self.node:
+                self._id_prefix += f"{self.node}_"
+        return f"{self._id_prefix}{next(self._counter):06d}"
+
+    def add(self, record: Dict[str, Any]) -> Dict[str, Any]:
+        process_id = record["id"]
+        if process_id in self._records:
+            raise ValueError(f"Duplicate process id: {process_id}")
+        self._records[process_id] = record
+        self._by_status[record["status"]][process_id] = None
+        self._created_times.append(record["created_at"].timestamp())
+        self._created_ids.append(process_id)
+        if record["status"] in TERMINAL_STATUSES:
+            self._finished[process_id] = time.monotonic()
+        if self.on_change:
+            self.on_change(record)
+        self.evict()
+        return record
+
+    def update(self, process_id: str, status: Optional[ProcessStatus] = None, **fields) -> Dict[str, Any]:
+        """Update a record's status and fields, and refresh updated_at."""
+        record = self._records[process_id]
+        changed = status is not None and status != record["status"]
+        if changed:
+            del self._by_status[record["status"]][process_id]
+            self._by_status[status][process_id] = None
+            record["status"] = status
+            if status in TERMINAL_STATUSES:
+                self._finished[process_id] = time.monotonic()
+        record.update(fields)
+        record["updated_at"] = datetime.now()
+        if changed and self.on_change:
+            self.on_change(record)
+        if status in TERMINAL_STATUSES:
+            if self.on_finished:
+                self.on_finished(record)
+            self.evict()
+        return record
+
+    def discard(self, process_id: str):
+        """Drop a record that never ran, e.g. because it could not be queued."""
+        record = self._records.pop(process_id, None)
+        if record is not None:
+            self._by_status[record["status"]].pop(process_id, None)
+            self._finished.pop(process_id, None)
+
+    def _remove(self, process_id: str):
+        record = self._records.pop(process_id)
+        del self._by_status[record["status"]][process_id]
+        self.evictions += 1
+
+    def evict(self) -> int:
+        """Drop finished records past the TTL or over the size bound."""
+        evicted = 0
+        cutoff = None if self.ttl is None else time.monotonic() - self.ttl
+        while self._finished:
+            process_id, finished_at = next(iter(self._finished.items()))
+            over_size = self.max_records is not None and len(self._records) > self.max_records
+            if not over_size and (cutoff is None or finished_at > cutoff):
+                break
+            del self._finished[process_id]
+            self._remove(process_id)
+            evicted += 1
+        if len(self._created_ids) > 2 * len(self._records) + 1024:
+            self._compact_created_index()
+        return evicted
+
+    def _compact_created_index(self):
+        kept = [(t, i) for t, i in zip(self._created_times, self._created_ids) if i in self._records]
+        self._created_times = [t for t, _ in kept]
+        self._created_ids = [i for _, i in kept]
+
+    def count(self, status: Optional[ProcessStatus] = None) -> int:
+        if status is None:
+            return len(self._records)
+        return len(self._by_status[status])
+
+    def list(self, status: Optional[ProcessStatus] = None, since: Optional[datetime] = None,
+             until: Optional[datetime] = None, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """List records in creation order, optionally by status and creation time range."""
+        if since is None and until is None:
+            ids = self._by_status[status] if status is not None else self._records
+            records = (self._records[process_id] for process_id in ids)
+        else:
+            # Creation timestamps are monotonic in practice; IDs keep ties in order
+            lo = 0 if since is None else bisect_left(self._created_times, since.timestamp())
+            hi = len(self._created_times) if until is None else bisect_right(self._created_times, until.timestamp())
+            records = (self._records[process_id] for process_id in self._created_ids[lo:hi]
+                       if process_id in self._records)
+            if status is not None:
+                records = (record for record in records if record["status"] == status)
+        return list(itertools.islice(records, limit))
+
+STORE_STATUSES = {
+    "queued": ProcessStatus.PENDING,
+    "leased": ProcessStatus.RUNNING,
+    "done": ProcessStatus.COMPLETED,
+    "failed": ProcessStatus.FAILED,
+}
 
 class ProcessManager:
-    def __init__(self):
-        self.processes: Dict[str, Dict[str, Any]] = {}
-        self.task_queue = asyncio.Queue()
+    def __init__(self, num_workers: int = 1, max_in_flight: int = 1,
+                 tenant_weights: Optional[Dict[str, float]] = None,
+                 retention: Optional[float] = 3600, max_records: Optional[int] = 100_000,
+                 task_store: Optional[SQLiteTaskQueue] = None, prefetch: Optional[int] = None,
+                 poll_interval: float = 0.2, executor: Optional[TaskExecutor] = None,
+                 result_ttl: float = 300.0, max_cached_results: int = 10_000,
+                 max_queue: int = 0, overflow: str = "block", block_timeout: Optional[float] = None,
+                 default_timeout: Optional[float] = None, wait_slo: Optional[float] = None,
+                 shed_priority: Priority = Priority.LOW):
+        if overflow not in ("block", "reject"):
+            raise ValueError(f"Unknown overflow policy: {overflow}")
+        # With a durable task_store, processes are queued in SQLite and claimed
+        # under a lease, so other worker processes pick them up if this one dies
+        self.task_store = task_store
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.prefetch = prefetch or num_workers * max_in_flight
+        self.poll_interval = poll_interval
+        self._feeder: Optional[asyncio.Task] = None
+        # Identical submissions share one execution; see create_process
+        self.dedupe = TaskDeduplicator(ttl=result_ttl, max_results=max_cached_results)
+        self.processes = ProcessRegistry(ttl=retention, max_records=max_records,
+                                         node=uuid.uuid4().hex[:6] if task_store else None,
+                                         on_finished=self._finished, on_change=self._status_changed)
+        # Push notifications of status changes and progress; see watch and stream
+        self.event_bus = EventBus()
+        # Priority levels first, then deficit round robin between tenants
+        self.task_queue = FairQueue(tenant_weights, on_expired=self._expire, maxsize=max_queue)
+        # Admission control: a full queue blocks or rejects submissions, and
+        # while the oldest queued process has waited longer than wait_slo,
+        # submissions at shed_priority or lower are rejected
+        self.overflow = overflow
+        self.block_timeout = block_timeout
+        self.wait_slo = wait_slo
+        self.shed_priority = shed_priority
+        self.default_timeout = default_timeout
+        self.counters = {"rejected": 0, "shed": 0, "timed_out": 0, "cancelled": 0}
         self.running = False
         self.process_tool = ProcessTool()
+        # Pools for tasks declaring a "thread" or "process" execution class
+        self.executor = executor or TaskExecutor()
+        # Pool of queue consumers; each runs up to max_in_flight tasks at once
+        self.num_workers = num_workers
+        self.max_in_flight = max_in_flight
+        self._workers: List[asyncio.Task] = []
+        self._in_flight: Set[asyncio.Task] = set()
+        self._waiters: Dict[str, List[asyncio.Future]] = {}
+        self._running: Dict[str, asyncio.Task] = {}
+        # Batch-capable tools by name; tasks with a "batch" key go through them
+        self.batchers: Dict[str, MicroBatcher] = {}
+        self._cancel_requested: Set[str] = set()
 
     async def start(self):
         """Start the process manager."""
         if not self.running:
             self.running = True
-            asyncio.create_task(self._process_queue())
+            self._workers = [
+                asyncio.create_task(self._process_queue(worker_id))
+                for worker_id in range(self.num_workers)
+            ]
+            if self.task_store is not None:
+                self._feeder = asyncio.create_task(self._feed())
 
-    async def stop(self):
-        """Stop the process manager."""
+    async def stop(self, drain: bool = True, timeout: Optional[float] = None):
+        """Stop the process manager.
+
+        With ``drain`` queued and running tasks are allowed to finish (up to
+        ``timeout`` seconds); anything still outstanding is then cancelled.
+        With a durable task_store, no new tasks are claimed once stopping
+        and unfinished ones are released back to the shared queue.
+        """
+        if self._feeder is not None:
+            self._feeder.cancel()
+            await asyncio.gather(self._feeder, return_exceptions=True)
+            self._feeder = None
+        if drain:
+            try:
+                await asyncio.wait_for(self.task_queue.join(), timeout)
+            except asyncio.TimeoutError:
+                pass
         self.running = False
-        await self.task_queue.join()
+        for worker in self._workers:
+            worker.cancel()
+        for task in list(self._in_flight):
+            task.cancel()
+        await asyncio.gather(*self._workers, *self._in_flight, return_exceptions=True)
+        self._workers = []
+        await asyncio.to_thread(self.executor.shutdown, drain)
+        if self.task_store is not None:
+            self._drain_local()
+            await asyncio.to_thread(self.task_store.release, self.worker_id)
+        else:
+            self._fail_pending("Process manager stopped")
+
+    def _drain_local(self) -> List[str]:
+        """Empty the local queue and return the process IDs it held."""
+        process_ids = []
+        while not self.task_queue.empty():
+            try:
+                process_ids.append(self.task_queue.get_nowait())
+            except asyncio.QueueEmpty:
+                break
+            self.task_queue.task_done()
+        return process_ids
+
+    def _fail_pending(self, reason: str):
+        """Mark processes left in the queue as failed."""
+        for process_id in self._drain_local():
+            process = self.processes.get(process_id)
+            if process and process["status"] == ProcessStatus.PENDING:
+                self.processes.update(process_id, ProcessStatus.FAILED, error=reason)
+
+    def _expire(self, process_id: str):
+        """Mark a process whose deadline passed while it was queued."""
+        process = self.processes.get(process_id)
+        if process and process["status"] == ProcessStatus.PENDING:
+            self.processes.update(process_id, ProcessStatus.EXPIRED,
+                                  error="Deadline expired before the process started")
+            if self.task_store is not None:
+                self.task_store.fail(process_id, self.worker_id, process["error"])
+
+    def _status_changed(self, process: Dict[str, Any]):
+        self.event_bus.publish({
+            "type": "status",
+            "process_id": process["id"],
+            "status": process["status"].value,
+            "result": process["result"],
+            "error": process["error"],
+            "ts": time.time(),
+        })
+
+    def report_progress(self, process_id: str, progress: Optional[float] = None, message: Optional[str] = None,
+                        data: Any = None):
+        """Publish intermediate progress (0..1) or a partial result for a running process."""
+        process = self.processes.get(process_id)
+        if process is None or process["status"] in TERMINAL_STATUSES:
+            return
+        self.processes.update(process_id, progress=progress, progress_message=message)
+        self.event_bus.publish({
+            "type": "progress",
+            "process_id": process_id,
+            "status": process["status"].value,
+            "progress": progress,
+            "message": message,
+            "data": data,
+            "ts": time.time(),
+        })
+
+    async def watch(self, process_id: str, maxsize: int = 100) -> AsyncIterator[Dict[str, Any]]:
+        """Yield a process's status and progress events until it finishes.
+
+        The first event is the current status. Up to ``maxsize`` events are
+        buffered for a slow consumer; older ones are dropped beyond that.
+        """
+        subscription = self.event_bus.subscribe(process_id, maxsize=maxsize)
+        try:
+            process = await self.get_process(process_id)
+            if process is None:
+                raise KeyError(process_id)
+            yield {"type": "status", "process_id": process_id, "status": process["status"].value,
+                   "result": process["result"], "error": process["error"], "ts": time.time()}
+            if process["status"] in TERMINAL_STATUSES:
+                return
+            while True:
+                if self.task_store is None:
+                    event = await subscription.get()
+                else:
+                    # Another worker process may run it; fall back to the store on silence
+                    try:
+                        event = await asyncio.wait_for(subscription.get(), self.poll_interval)
+                    except asyncio.TimeoutError:
+                        process = await self.get_process(process_id)
+                        if process["status"] not in TERMINAL_STATUSES:
+                            continue
+                        event = {"type": "status", "process_id": process_id, "status": process["status"].value,
+                                 "result": process["result"], "error": process["error"], "ts": time.time()}
+                yield event
+                if event["type"] == "status" and ProcessStatus(event["status"]) in TERMINAL_STATUSES:
+                    return
+        finally:
+            subscription.close()
+
+    def stream(self, statuses: Optional[Collection[Union[ProcessStatus, str]]] = None,
+               maxsize: int = 1000) -> Subscription:
+        """Subscribe to events of all processes, optionally only those with the given statuses.
+
+        Use as ``async for event in manager.stream(...)`` and ``close()``
+        the subscription when done. Progress events carry the status of the
+        process at the time (normally running).
+        """
+        if statuses is not None:
+            statuses = [ProcessStatus(status).value for status in statuses]
+        return self.event_bus.subscribe(statuses=statuses, maxsize=maxsize)
 
-    async def create_process(self, task: Dict[str, Any]) -> str:
-        """Create a new process and add it to the queue."""
-        process_id = f"process_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
-        
-        self.processes[process_id] = {
+    def _finished(self, process: Dict[str, Any]):
+        key = process.get("key")
+        if key is not None:
+            self.dedupe.finish(key, process["id"], process["status"] == ProcessStatus.COMPLETED, process["result"])
+        for waiter in self._waiters.pop(process["id"], ()):
+            if not waiter.done():
+                waiter.set_result(process)
+
+    async def wait_for(self, process_id: str, timeout: Optional[float] = None) -> Dict[str, Any]:
+        """Wait until a process reaches a terminal status and return its record."""
+        async def wait() -> Dict[str, Any]:
+            while True:
+                process = await self.get_process(process_id)
+                if process is None:
+                    raise KeyError(process_id)
+                if process["status"] in TERMINAL_STATUSES:
+                    return process
+                waiter = asyncio.get_running_loop().create_future()
+                self._waiters.setdefault(process_id, []).append(waiter)
+                try:
+                    # With a durable store another worker may finish it; poll the store too
+                    await asyncio.wait_for(asyncio.shield(waiter),
+                                           self.poll_interval if self.task_store is not None else None)
+                except asyncio.TimeoutError:
+                    pass
+                finally:
+                    waiters = self._waiters.get(process_id)
+                    if waiters and waiter in waiters:
+                        waiters.remove(waiter)
+                        if not waiters:
+                            del self._waiters[process_id]
+        return await asyncio.wait_for(wait(), timeout)
+
+    def register_batch_tool(self, name: str, tool: Any, max_batch: int = 32, window: float = 0.005,
+                            max_concurrent: int = 4) -> MicroBatcher:
+        """Route tasks with ``"batch": name`` to ``tool.execute_batch`` in micro-batches."""
+        batcher = self.batchers[name] = MicroBatcher(tool, max_batch, window, max_concurrent)
+        return batcher
+
+    def batch_stats(self) -> Dict[str, Any]:
+        return {name: batcher.stats() for name, batcher in self.batchers.items()}
+
+    async def _admit(self, priority: Priority):
+        """Apply load shedding and the queue bound; raises AdmissionRejected."""
+        if self.wait_slo is not None and priority >= self.shed_priority:
+            waited = self.task_queue.oldest_wait()
+            if waited > self.wait_slo:
+                self.counters["shed"] += 1
+                raise AdmissionRejected(
+                    "shed", f"Shedding {Priority(priority).name.lower()} priority work: "
+                            f"queue wait {waited:.2f}s exceeds {self.wait_slo}s"
+                )
+        if self.task_queue.full() and self.overflow == "block":
+            loop = asyncio.get_running_loop()
+            expires = None if self.block_timeout is None else loop.time() + self.block_timeout
+            # Every blocked submitter wakes when a slot frees, but only the first to run gets
+            # it; the rest must go back to waiting rather than overfill the queue
+            while self.task_queue.full():
+                remaining = None if expires is None else expires - loop.time()
+                if remaining is not None and remaining <= 0:
+                    break
+                try:
+                    await asyncio.wait_for(self.task_queue.wait_not_full(), remaining)
+                except asyncio.TimeoutError:
+                    break
+        if self.task_queue.full():
+            self.counters["rejected"] += 1
+            raise AdmissionRejected("queue_full", f"Process queue is full ({self.task_queue.maxsize})")
+
+    async def create_process(self, task: Dict[str, Any], tenant: str = "default",
+                             priority: Priority = Priority.NORMAL, deadline: Optional[float] = None,
+                             dedupe: bool = True, idempotency_key: Optional[str] = None,
+                             timeout: Optional[float] = None) -> str:
+        """Create a new process and add it to the queue.
+
+        Processes of higher priority run first; within a priority, tenants
+        share the workers according to their weights. A process not started
+        within ``deadline`` seconds is skipped and marked expired.
+
+        By default the task runs on the event loop through the process tool.
+        Blocking or CPU-bound work sets ``"execution"`` to ``"thread"`` or
+        ``"process"`` and names a ``"function"`` as ``"module:function"``,
+        called with the task's ``"args"`` and ``"kwargs"`` in the executor.
+        Small calls to a batch-capable tool set ``"batch"`` to the name it
+        was registered under with ``register_batch_tool``.
+
+        Tasks are keyed by their content (or by ``idempotency_key``) per
+        tenant. A submission identical to a pending or running process
+        returns that process's ID instead of running again, and one
+        identical to a recently completed process reuses its result. Pass
+        ``dedupe=False`` for tasks that must always run.
+
+        A running process is cancelled after ``timeout`` seconds (default
+        ``default_timeout``). When the queue is bounded or load shedding is
+        configured, a submission may wait for room or raise
+        ``AdmissionRejected``.
+        """
+        # Reject unknown execution classes and batch tools at submission rather than at run time
+        ExecutionClass(task.get("execution", ExecutionClass.ASYNC.value))
+        if "batch" in task and task["batch"] not in self.batchers:
+            raise ValueError(f"No batch tool registered as {task['batch']!r}")
+        self.dedupe.submitted += 1
+        key = None
+        if dedupe:
+            key = idempotency_key or task_key(task, tenant)
+            process_id = self.dedupe.lookup_in_flight(key)
+            if process_id is not None and process_id in self.processes:
+                self.dedupe.deduplicated += 1
+                return process_id
+            cached = self.dedupe.lookup_result(key)
+            if cached is not None:
+                self.dedupe.cache_hits += 1
+                process_id, result = cached
+                if process_id in self.processes:
+                    return process_id
+                # The original record was evicted; serve the result under a new one
+                return self._add_process(task, tenant, priority, None, ProcessStatus.COMPLETED, result,
+                                         deduplicated_from=process_id)
+        if self.task_store is None:
+            await self._admit(priority)
+        process_id = self._add_process(task, tenant, priority, key, ProcessStatus.PENDING,
+                                       timeout=self.default_timeout if timeout is None else timeout)
+        if key is not None:
+            self.dedupe.start(key, process_id)
+        try:
+            if self.task_store is not None:
+                committed = self.task_store.enqueue(process_id, task, tenant, priority,
+                                                    None if deadline is None else time.time() + deadline)
+            else:
+                self.task_queue.put_nowait(process_id, tenant, priority, deadline)
+        except BaseException as e:
+            self._abandon(process_id, key)
+            if isinstance(e, asyncio.QueueFull):
+                self.counters["rejected"] += 1
+                raise AdmissionRejected("queue_full", f"Process queue is full ({self.task_queue.maxsize})") from None
+            raise
+        if self.task_store is not None:
+            # Only report the process as accepted once it would survive a crash
+            try:
+                await self._committed(committed)
+            except asyncio.CancelledError:
+                raise  # The write stays buffered and still commits
+            except Exception:
+                self._abandon(process_id, key)
+                raise
+        return process_id
+
+    def _abandon(self, process_id: str, key: Optional[str]):
+        """Drop the pending record and in-flight key of a process that was not queued."""
+        self.processes.discard(process_id)
+        if key is not None:
+            self.dedupe.finish(key, process_id, completed=False)
+
+    @staticmethod
+    async def _committed(write: "concurrent.futures.Future"):
+        """Wait for a buffered task_store write to commit."""
+        # Shielded: a cancelled caller must not cancel a write other callers share a batch with
+        await asyncio.shield(asyncio.wrap_future(write))
+
+    def _add_process(self, task: Dict[str, Any], tenant: str, priority: Priority, key: Optional[str],
+                     status: ProcessStatus, result: Any = None, **extra) -> str:
+        process_id = self.processes.new_id()
+        now = datetime.now()
+        self.processes.add({
             "id": process_id,
+            "key": key,
             "task": task,
-            "status": ProcessStatus.PENDING,
-            "created_at": datetime.now(),
-            "updated_at": datetime.now(),
-            "result": None,
-            "error": None
-        }
-        
-        await self.task_queue.put(process_id)
+            "tenant": tenant,
+            "priority": Priority(priority),
+            "status": status,
+            "created_at": now,
+            "updated_at": now,
+            "result": result,
+            "error": None,
+            **extra
+        })
         return process_id
 
     async def get_process(self, process_id: str) -> Optional[Dict[str, Any]]:
         """Get process information by ID."""
-        return self.processes.get(process_id)
+        process = self.processes.get(process_id)
+        if self.task_store is not None and (process is None or process["status"] == ProcessStatus.PENDING):
+            # Queued here but possibly claimed and run by another worker process
+            stored = await asyncio.to_thread(self.task_store.get, process_id)
+            if stored is not None and stored["status"] != "queued":
+                return {**(process or {"id": process_id}), "status": STORE_STATUSES[stored["status"]],
+                        "result": stored["result"], "error": stored["error"],
+                        "updated_at": datetime.fromtimestamp(stored["updated_at"])}
+        return process
+
+    async def list_processes(self, status: Optional[ProcessStatus] = None, since: Optional[datetime] = None,
+                             until: Optional[datetime] = None, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """List processes in creation order, optionally filtered by status and creation time."""
+        return self.processes.list(status, since, until, limit)
+
+    async def cancel_process(self, process_id: str) -> bool:
+        """Cancel a pending or running process; returns whether it was cancelled.
+
+        A pending process is skipped when dequeued. A running one has its
+        task cancelled, so the task sees CancelledError at its next await
+        and can clean up; work already handed to a thread or process pool
+        runs to completion in the pool but its result is discarded.
+        """
+        process = self.processes.get(process_id)
+        if process is None or process["status"] in TERMINAL_STATUSES:
+            return False
+        if self.task_store is not None:
+            await asyncio.to_thread(self.task_store.cancel, process_id)
+        self.counters["cancelled"] += 1
+        running = self._running.get(process_id)
+        if running is None:
+            self.processes.update(process_id, ProcessStatus.CANCELLED, error="Cancelled")
+            return True
+        self._cancel_requested.add(process_id)
+        running.cancel()
+        await asyncio.gather(running, return_exceptions=True)
+        return True
+
+    def load_stats(self) -> Dict[str, Any]:
+        """Current load, for admission decisions and autoscaling."""
+        capacity = self.num_workers * self.max_in_flight
+        oldest_wait = self.task_queue.oldest_wait()
+        return {
+            "queue_depth": self.task_queue.qsize(),
+            "max_queue": self.task_queue.maxsize,
+            "queue_utilization": self.task_queue.qsize() / self.task_queue.maxsize if self.task_queue.maxsize else None,
+            "running": len(self._running),
+            "capacity": capacity,
+            "worker_utilization": len(self._running) / capacity if capacity else None,
+            "oldest_wait": oldest_wait,
+            "wait_ewma": self.task_queue.wait_ewma,
+            "wait_slo": self.wait_slo,
+            "overloaded": self.wait_slo is not None and oldest_wait > self.wait_slo,
+            **self.counters,
+        }
+
+    def dedupe_stats(self) -> Dict[str, Any]:
+        """Get counters for deduplicated and cached submissions."""
+        return self.dedupe.stats()
 
-    async def list_processes(self, status: Optional[ProcessStatus] = None) -> List[Dict[str, Any]]:
-        """List all processes, optionally filtered by status."""
-        if status:
-            return [p for p in self.processes.values() if p["status"] == status]
-        return list(self.processes.values())
+    def queue_stats(self) -> Dict[str, Any]:
+        """Get queue depth per priority and depth / wait times per tenant."""
+        return self.task_queue.stats()
 
-    async def _process_queue(self):
-        """Process tasks from the queue."""
+    async def _feed(self):
+        """Claim tasks from the durable store into the local queue and keep their leases alive."""
+        last_heartbeat = time.monotonic()
+        while True:
+            try:
+                claimed = []
+                want = self.prefetch - self.task_queue.unfinished
+                if want > 0:
+                    claimed = await asyncio.to_thread(self.task_store.claim, self.worker_id, want)
+                    for row in claimed:
+                        self._enqueue_claimed(row)
+                if time.monotonic() - last_heartbeat >= self.task_store.visibility_timeout / 3:
+                    await asyncio.to_thread(self.task_store.heartbeat, self.worker_id)
+                    last_heartbeat = time.monotonic()
+                if len(claimed) < want or want <= 0:
+                    await asyncio.sleep(self.poll_interval)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"Error claiming tasks: {e}")
+                await asyncio.sleep(1)
+
+    def _enqueue_claimed(self, row: Dict[str, Any]):
+        process_id = row["id"]
+        if process_id not in self.processes:
+            # Submitted by another worker process, or recovered after a crash
+            created_at = datetime.fromtimestamp(row["enqueued_at"])
+            self.processes.add({
+                "id": process_id,
+                "task": row["task"],
+                "tenant": row["tenant"],
+                "priority": Priority(row["priority"]),
+                "status": ProcessStatus.PENDING,
+                "created_at": created_at,
+                "updated_at": created_at,
+                "result": None,
+                "error": None
+            })
+        deadline = None if row["deadline"] is None else row["deadline"] - time.time()
+        self.task_queue.put_nowait(process_id, row["tenant"], row["priority"], deadline)
+
+    async def _process_queue(self, worker_id: int = 0):
+        """Process tasks from the queue, keeping up to max_in_flight running."""
+        slots = asyncio.Semaphore(self.max_in_flight)
         while self.running:
             try:
-                process_id = await self.task_queue.get()
-                process = self.processes[process_id]
-                
+                await slots.acquire()
                 try:
-                    process["status"] = ProcessStatus.RUNNING
-                    process["updated_at"] = datetime.now()
-                    
-                    # Process the task using PraisonAI's process tool
-                    result = await self.process_tool.execute_task(process["task"])
-                    
-                    process["status"] = ProcessStatus.COMPLETED
-                    process["result"] = result
-                except Exception as e:
-                    process["status"] = ProcessStatus.FAILED
-                    process["error"] = str(e)
-                finally:
-                    process["updated_at"] = datetime.now()
-                    self.task_queue.task_done()
-            
+                    process_id = await self.task_queue.get()
+                except BaseException:
+                    slots.release()
+                    raise
+                batcher = self._batcher_for(process_id)
+                if batcher is not None:
+                    # Batched tasks wait on the batcher's capacity, not a worker slot,
+                    # so up to max_batch * max_concurrent can be collected at once
+                    slots.release()
+                    await batcher.capacity.acquire()
+                    release = batcher.capacity.release
+                else:
+                    release = slots.release
+                task = asyncio.create_task(self._run_process(process_id))
+                self._in_flight.add(task)
+                task.add_done_callback(self._in_flight.discard)
+                task.add_done_callback(lambda _, release=release: release())
+            except asyncio.CancelledError:
+                raise
             except Exception as e:
                 print(f"Error processing queue: {e}")
-                await asyncio.sleep(1) 
\ No newline at end of file
+                await asyncio.sleep(1)
+
+    def _batcher_for(self, process_id: str) -> Optional[MicroBatcher]:
+        process = self.processes.get(process_id)
+        if process is None or "batch" not in process["task"]:
+            return None
+        return self.batchers.get(process["task"]["batch"])
+
+    async def _execute(self, task: Dict[str, Any]) -> Any:
+        if "batch" in task:
+            return await self.batchers[task["batch"]].submit(task)
+        execution = ExecutionClass(task.get("execution", ExecutionClass.ASYNC.value))
+        if execution == ExecutionClass.ASYNC:
+            # Process the task using PraisonAI's process tool
+            return await self.process_tool.execute_task(task)
+        kwargs = task.get("kwargs")
+        if "inputs" in task:
+            # Upstream workflow outputs, see core.workflow
+            kwargs = {**(kwargs or {}), "inputs": task["inputs"]}
+        return await self.executor.run(execution, task["function"], task.get("args", ()), kwargs)
+
+    async def _run_process(self, process_id: str):
+        """Run a single queued process and record its outcome."""
+        process = self.processes.get(process_id)
+        if process is None or process["status"] != ProcessStatus.PENDING:
+            # Cancelled while queued
+            self.task_queue.task_done()
+            return
+        self.processes.update(process_id, ProcessStatus.RUNNING, started_at=datetime.now())
+        self._running[process_id] = asyncio.current_task()
+        _current_process.set((self, process_id, asyncio.get_running_loop()))
+        timeout = process.get("timeout", self.default_timeout)
+        deadline = asyncio.timeout(timeout)
+        try:
+            async with deadline:
+                result = await self._execute(process["task"])
+        except asyncio.CancelledError:
+            if process_id in self._cancel_requested:
+                self.processes.update(process_id, ProcessStatus.CANCELLED, error="Cancelled")
+                return
+            # Not acked to a durable store: the lease is released on stop
+            self.processes.update(process_id, ProcessStatus.FAILED, error="Cancelled")
+            raise
+        except Exception as e:
+            if isinstance(e, TimeoutError) and deadline.expired():
+                self.counters["timed_out"] += 1
+                error = f"Timed out after {timeout}s"
+            else:
+                # Including a TimeoutError the task raised itself
+                error = str(e) or type(e).__name__
+            self.processes.update(process_id, ProcessStatus.FAILED, error=error)
+            if self.task_store is not None:
+                await self._committed(self.task_store.fail(process_id, self.worker_id, error))
+        else:
+            self.processes.update(process_id, ProcessStatus.COMPLETED, result=result)
+            if self.task_store is not None:
+                # Outside the handlers above: a stop while the ack commits must not turn it into a failure
+                await self._committed(self.task_store.complete(process_id, self.worker_id, result))
+        finally:
+            self._running.pop(process_id, None)
+            self._cancel_requested.discard(process_id)
+            self.task_queue.task_done()
\ No newline at end of file
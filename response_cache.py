@@ -0,0 +1,388 @@
+from typing import Dict, Any, Awaitable, Callable, Iterable, Optional
+from collections import OrderedDict
+from email.utils import parsedate_to_datetime
+import asyncio
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from http_client import HTTPClient, HTTPResponse
+
+def cache_key(method: str, url: str, body: Any = None) -> str:
+    """Key of a request: SHA-256 over the method, URL and a hash of the body."""
+    if body is None:
+        payload = b""
+    elif isinstance(body, (bytes, bytearray)):
+        payload = bytes(body)
+    elif isinstance(body, str):
+        payload = body.encode('utf-8')
+    else:
+        payload = json.dumps(body, sort_keys=True, separators=(",", ":"), default=str).encode('utf-8')
+    digest = hashlib.sha256(payload).hexdigest()
+    return hashlib.sha256(f"{method.upper()}\n{url}\n{digest}".encode('utf-8')).hexdigest()
+
+def parse_cache_control(value: str) -> Dict[str, Optional[str]]:
+    directives = {}
+    for part in value.split(","):
+        name, _, argument = part.strip().partition("=")
+        if name:
+            directives[name.lower()] = argument.strip('"') or None
+    return directives
+
+def _sent_headers(client: HTTPClient, headers: Optional[Dict[str, str]], kwargs: Dict[str, Any]) -> Dict[str, str]:
+    """Headers a request goes out with, counting those ``auth`` and ``cookies`` add."""
+    sent = {**client.headers, **(headers or {})}
+    if kwargs.get("auth") is not None:
+        sent["authorization"] = "(auth)"
+    if kwargs.get("cookies"):
+        sent["cookie"] = "(cookies)"
+    return sent
+
+def _http_date(value: Optional[str]) -> Optional[float]:
+    if not value:
+        return None
+    try:
+        return parsedate_to_datetime(value).timestamp()
+    except (TypeError, ValueError):
+        return None
+
+class CacheEntry:
+    __slots__ = ("status", "headers", "body", "url", "stored_at", "expires_at")
+
+    def __init__(self, status: int, headers: Dict[str, str], body: bytes, url: str,
+                 stored_at: float, expires_at: float):
+        self.status = status
+        self.headers = headers
+        self.body = body
+        self.url = url
+        self.stored_at = stored_at
+        self.expires_at = expires_at
+
+    @property
+    def size(self) -> int:
+        return len(self.body) + sum(len(k) + len(v) for k, v in self.headers.items())
+
+    def fresh(self, now: Optional[float] = None) -> bool:
+        return (now or time.time()) < self.expires_at
+
+    def validators(self) -> Dict[str, str]:
+        """Conditional request headers to revalidate this entry."""
+        headers = {}
+        if "etag" in self.headers:
+            headers["If-None-Match"] = self.headers["etag"]
+        if "last-modified" in self.headers:
+            headers["If-Modified-Since"] = self.headers["last-modified"]
+        return headers
+
+    def response(self) -> HTTPResponse:
+        return HTTPResponse(self.status, self.headers, self.body, self.url)
+
+class ResponseCache:
+    """Shared HTTP response cache: an in-memory LRU over a SQLite disk tier.
+
+    Freshness follows the response's ``Cache-Control`` (``no-store``,
+    ``no-cache``, ``max-age``, ``Age``) or ``Expires``, falling back to a
+    fraction of the time since ``Last-Modified``. Because entries are
+    shared across sessions, ``private`` responses, responses that vary on
+    request headers other than ``Accept-Encoding``, responses to requests
+    with ``Authorization`` or ``auth`` (unless ``public`` or ``s-maxage``),
+    and responses that set cookies or answer requests sending them (unless
+    ``public``) are never stored. Stale entries that carry
+    an ``ETag`` or ``Last-Modified`` are revalidated with a conditional
+    request, and a ``304`` refreshes them without transferring the body.
+    Only ``methods`` are cached, keyed on method, URL and body hash.
+
+    The memory tier holds up to ``max_entries`` entries and
+    ``max_memory_bytes``; the disk tier is bounded by ``max_disk_bytes``
+    and evicts least recently used entries. The disk tier runs in WAL mode
+    and evicts within the same transaction as the insert, so threads and
+    worker processes can share one file.
+    """
+
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS responses (
+        key TEXT PRIMARY KEY,
+        status INTEGER NOT NULL,
+        headers TEXT NOT NULL,
+        body BLOB NOT NULL,
+        url TEXT NOT NULL,
+        size INTEGER NOT NULL,
+        stored_at REAL NOT NULL,
+        expires_at REAL NOT NULL,
+        accessed_at REAL NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed_at);
+    CREATE TABLE IF NOT EXISTS usage (id INTEGER PRIMARY KEY CHECK (id = 0), bytes INTEGER NOT NULL);
+    INSERT OR IGNORE INTO usage (id, bytes) VALUES (0, 0);
+    CREATE TRIGGER IF NOT EXISTS responses_insert AFTER INSERT ON responses
+        BEGIN UPDATE usage SET bytes = bytes + NEW.size; END;
+    CREATE TRIGGER IF NOT EXISTS responses_update AFTER UPDATE OF size ON responses
+        BEGIN UPDATE usage SET bytes = bytes - OLD.size + NEW.size; END;
+    CREATE TRIGGER IF NOT EXISTS responses_delete AFTER DELETE ON responses
+        BEGIN UPDATE usage SET bytes = bytes - OLD.size; END;
+    """
+
+    def __init__(self, db_path: Optional[str] = "http_cache.db", max_entries: int = 1024,
+                 max_memory_bytes: int = 64 << 20, max_disk_bytes: int = 512 << 20,
+                 max_entry_bytes: int = 8 << 20, heuristic_fraction: float = 0.1,
+                 max_heuristic_ttl: float = 86400.0, methods: Iterable[str] = ("GET", "HEAD"),
+                 busy_timeout: float = 30.0):
+        self.db_path = db_path
+        self.max_entries = max_entries
+        self.max_memory_bytes = max_memory_bytes
+        self.max_disk_bytes = max_disk_bytes
+        self.max_entry_bytes = max_entry_bytes
+        self.heuristic_fraction = heuristic_fraction
+        self.max_heuristic_ttl = max_heuristic_ttl
+        self.methods = {method.upper() for method in methods}
+        self._memory: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self._memory_bytes = 0
+        self._lock = threading.Lock()
+        self._conn = None
+        if db_path is not None:
+            self._conn = sqlite3.connect(db_path, timeout=busy_timeout, isolation_level=None, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript(self.SCHEMA)
+        self.counters = {"hits": 0, "disk_hits": 0, "revalidated": 0, "misses": 0, "stores": 0,
+                         "bytes_saved": 0, "memory_evictions": 0, "disk_evictions": 0}
+
+    def lifetime(self, headers: Dict[str, str], now: float,
+                 request_headers: Optional[Dict[str, str]] = None) -> Optional[float]:
+        """Seconds a response stays fresh, or None if it must not be stored."""
+        directives = parse_cache_control(headers.get("cache-control", ""))
+        if "no-store" in directives or "private" in directives:
+            return None
+        # The disk tier is shared across sessions: don't keep one caller's credentialed
+        # or session-bound response unless the origin marks it shareable
+        sent = {name.lower() for name in (request_headers or {})}
+        if "authorization" in sent and "public" not in directives and "s-maxage" not in directives:
+            return None
+        if ("cookie" in sent or "set-cookie" in headers) and "public" not in directives:
+            return None
+        # Bodies are stored decoded, so only Accept-Encoding variants are interchangeable
+        varies = {name.strip().lower() for name in headers.get("vary", "").split(",") if name.strip()}
+        if varies - {"accept-encoding"}:
+            return None
+        age = float(headers.get("age", 0) or 0)
+        if "no-cache" in directives:
+            return 0.0
+        # s-maxage is meant for shared caches like this one and wins over max-age
+        max_age = directives.get("s-maxage", directives.get("max-age"))
+        if "s-maxage" in directives or "max-age" in directives:
+            try:
+                return max(0.0, int(max_age) - age)
+            except (TypeError, ValueError):
+                return 0.0
+        date = _http_date(headers.get("date")) or now
+        expires = _http_date(headers.get("expires"))
+        if "expires" in headers:
+            return max(0.0, (expires or 0.0) - date - age)
+        modified = _http_date(headers.get("last-modified"))
+        if modified is not None:
+            return min(self.max_heuristic_ttl, max(0.0, (date - modified) * self.heuristic_fraction))
+        return 0.0
+
+    def _remember(self, key: str, entry: CacheEntry):
+        """Put an entry in the memory tier, evicting least recently used ones."""
+        with self._lock:
+            previous = self._memory.pop(key, None)
+            if previous is not None:
+                self._memory_bytes -= previous.size
+            self._memory[key] = entry
+            self._memory_bytes += entry.size
+            while self._memory and (len(self._memory) > self.max_entries or self._memory_bytes > self.max_memory_bytes):
+                _, evicted = self._memory.popitem(last=False)
+                self._memory_bytes -= evicted.size
+                self.counters["memory_evictions"] += 1
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        """Return the entry for a key, fresh or stale, from memory or disk."""
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                self._memory.move_to_end(key)
+                return entry
+            if self._conn is None:
+                return None
+            row = self._conn.execute(
+                "SELECT status, headers, body, url, stored_at, expires_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (time.time(), key))
+            self.counters["disk_hits"] += 1
+        status, headers, body, url, stored_at, expires_at = row
+        entry = CacheEntry(status, json.loads(headers), bytes(body), url, stored_at, expires_at)
+        self._remember(key, entry)
+        return entry
+
+    def put(self, key: str, status: int, headers: Dict[str, str], body: bytes, url: str = "",
+            ttl: Optional[float] = None, request_headers: Optional[Dict[str, str]] = None) -> Optional[CacheEntry]:
+        """Store a response; ``ttl`` overrides its HTTP freshness. Returns None if not cacheable."""
+        now = time.time()
+        lifetime = self.lifetime(headers, now, request_headers) if ttl is None else ttl
+        if lifetime is None or len(body) > self.max_entry_bytes:
+            return None
+        if lifetime <= 0 and "etag" not in headers and "last-modified" not in headers:
+            return None  # Neither fresh nor revalidatable
+        entry = CacheEntry(status, headers, body, url, now, now + lifetime)
+        self._remember(key, entry)
+        self.counters["stores"] += 1
+        if self._conn is not None:
+            self._write(key, entry, now)
+        return entry
+
+    def _write(self, key: str, entry: CacheEntry, now: float):
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.execute(
+                    "INSERT INTO responses (key, status, headers, body, url, size, stored_at, expires_at, accessed_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?) ON CONFLICT (key) DO UPDATE SET status = excluded.status, "
+                    "headers = excluded.headers, body = excluded.body, url = excluded.url, size = excluded.size, "
+                    "stored_at = excluded.stored_at, expires_at = excluded.expires_at, accessed_at = excluded.accessed_at",
+                    (key, entry.status, json.dumps(entry.headers), entry.body, entry.url, entry.size,
+                     entry.stored_at, entry.expires_at, now)
+                )
+                while self._conn.execute("SELECT bytes FROM usage WHERE id = 0").fetchone()[0] > self.max_disk_bytes:
+                    evicted = self._conn.execute(
+                        "DELETE FROM responses WHERE key IN "
+                        "(SELECT key FROM responses WHERE key != ? ORDER BY accessed_at LIMIT 16)", (key,)
+                    ).rowcount
+                    if not evicted:
+                        break
+                    self.counters["disk_evictions"] += evicted
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def _freshen(self, key: str, entry: CacheEntry, headers: Dict[str, str],
+                 request_headers: Dict[str, str]) -> CacheEntry:
+        """Apply a 304's headers to a stale entry and restart its freshness."""
+        merged = {**entry.headers, **{k: v for k, v in headers.items() if k != "content-length"}}
+        stored = self.put(key, entry.status, merged, entry.body, entry.url, request_headers=request_headers)
+        if stored is None:
+            # The revalidated response may no longer be stored (e.g. it became private)
+            self.invalidate(key)
+        return stored or entry
+
+    def invalidate(self, key: str):
+        with self._lock:
+            entry = self._memory.pop(key, None)
+            if entry is not None:
+                self._memory_bytes -= entry.size
+            if self._conn is not None:
+                self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+
+    def _hit(self, entry: CacheEntry, revalidated: bool = False) -> HTTPResponse:
+        self.counters["revalidated" if revalidated else "hits"] += 1
+        self.counters["bytes_saved"] += len(entry.body)
+        return entry.response()
+
+    def _after_fetch(self, key: str, entry: Optional[CacheEntry], response: HTTPResponse,
+                     request_headers: Dict[str, str]) -> HTTPResponse:
+        if response.status == 304 and entry is not None:
+            return self._hit(self._freshen(key, entry, response.headers, request_headers), revalidated=True)
+        self.counters["misses"] += 1
+        if response.status == 200:
+            self.put(key, response.status, response.headers, response.body, response.url,
+                     request_headers=request_headers)
+        return response
+
+    def _prepare(self, method: str, url: str, body: Any, headers: Optional[Dict[str, str]]):
+        key = cache_key(method, url, body)
+        entry = self.get(key)
+        if entry is not None and entry.fresh():
+            return key, entry, None
+        return key, entry, {**(headers or {}), **(entry.validators() if entry is not None else {})}
+
+    async def fetch(self, client: HTTPClient, method: str, url: str, json: Any = None,
+                    headers: Optional[Dict[str, str]] = None, **kwargs) -> HTTPResponse:
+        """``client.request`` through the cache, revalidating stale entries."""
+        if method.upper() not in self.methods:
+            return await client.request(method, url, json=json, headers=headers, **kwargs)
+        # A memory hit costs no I/O; disk lookups and writes go to a thread
+        key = cache_key(method, url, json)
+        entry = self._memory.get(key)
+        if entry is not None and entry.fresh():
+            with self._lock:
+                self._memory.move_to_end(key)
+            return self._hit(entry)
+        key, entry, conditional = await asyncio.to_thread(self._prepare, method, url, json, headers)
+        if conditional is None:
+            return self._hit(entry)
+        response = await client.request(method, url, json=json, headers=conditional, **kwargs)
+        sent = _sent_headers(client, headers, kwargs)
+        return await asyncio.to_thread(self._after_fetch, key, entry, response, sent)
+
+    def fetch_sync(self, client: HTTPClient, method: str, url: str, json: Any = None,
+                   headers: Optional[Dict[str, str]] = None, **kwargs) -> HTTPResponse:
+        """``client.request_sync`` through the cache, revalidating stale entries."""
+        if method.upper() not in self.methods:
+            return client.request_sync(method, url, json=json, headers=headers, **kwargs)
+        key, entry, conditional = self._prepare(method, url, json, headers)
+        if conditional is None:
+            return self._hit(entry)
+        response = client.request_sync(method, url, json=json, headers=conditional, **kwargs)
+        return self._after_fetch(key, entry, response, _sent_headers(client, headers, kwargs))
+
+    def _memo_lookup(self, namespace: str, parts: Any):
+        key = cache_key("MEMO", namespace, parts)
+        entry = self.get(key)
+        if entry is not None and entry.fresh():
+            self._hit(entry)
+            return key, json.loads(entry.body)
+        self.counters["misses"] += 1
+        return key, None
+
+    def _memo_store(self, key: str, namespace: str, value: Any, ttl: float):
+        self.put(key, 200, {"content-type": "application/json"}, json.dumps(value).encode('utf-8'), namespace, ttl)
+
+    def memoize_sync(self, namespace: str, parts: Any, produce: Callable[[], Any], ttl: float) -> Any:
+        """Cache a JSON-serializable non-HTTP result (e.g. a search) for ``ttl`` seconds."""
+        key, value = self._memo_lookup(namespace, parts)
+        if value is None:
+            value = produce()
+            self._memo_store(key, namespace, value, ttl)
+        return value
+
+    async def memoize(self, namespace: str, parts: Any, produce: Callable[[], Awaitable[Any]], ttl: float) -> Any:
+        key, value = await asyncio.to_thread(self._memo_lookup, namespace, parts)
+        if value is None:
+            value = await produce()
+            await asyncio.to_thread(self._memo_store, key, namespace, value, ttl)
+        return value
+
+    def stats(self) -> Dict[str, Any]:
+        counters = dict(self.counters)
+        served = counters["hits"] + counters["revalidated"]
+        lookups = served + counters["misses"]
+        disk_bytes = None
+        if self._conn is not None:
+            with self._lock:
+                disk_bytes = self._conn.execute("SELECT bytes FROM usage WHERE id = 0").fetchone()[0]
+        return {
+            **counters,
+            "hit_ratio": served / lookups if lookups else 0.0,
+            "memory_entries": len(self._memory),
+            "memory_bytes": self._memory_bytes,
+            "disk_bytes": disk_bytes,
+        }
+
+    def close(self):
+        if self._conn is not None:
+            with self._lock:
+                self._conn.close()
+                self._conn = None
+
+_default_cache: Optional[ResponseCache] = None
+
+def get_response_cache() -> ResponseCache:
+    """Shared ResponseCache for callers without one of their own (e.g. tools)."""
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = ResponseCache()
+    return _default_cache
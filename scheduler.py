@@ -0,0 +1,256 @@
+from typing import Dict, Any, Callable, Deque, Optional
+from collections import deque
+from enum import IntEnum
+import asyncio
+import time
+
+class Priority(IntEnum):
+    HIGH = 0
+    NORMAL = 1
+    LOW = 2
+
+class AdmissionRejected(RuntimeError):
+    """A submission was refused because the queue is full or shedding load."""
+
+    def __init__(self, reason: str, message: str):
+        super().__init__(message)
+        self.reason = reason
+
+class _Entry:
+    __slots__ = ("item", "tenant", "priority", "enqueued_at", "deadline")
+
+    def __init__(self, item: Any, tenant: str, priority: int, enqueued_at: float, deadline: Optional[float]):
+        self.item = item
+        self.tenant = tenant
+        self.priority = priority
+        self.enqueued_at = enqueued_at
+        self.deadline = deadline
+
+class _Level:
+    """Per-tenant FIFOs of one priority level, served by deficit round robin."""
+
+    def __init__(self):
+        self.queues: Dict[str, Deque[_Entry]] = {}
+        self.active: Deque[str] = deque()
+        self.deficit: Dict[str, float] = {}
+        # Whether the tenant at the front already got its quantum this turn
+        self.granted = False
+
+    def __len__(self) -> int:
+        return sum(len(queue) for queue in self.queues.values())
+
+    def push(self, entry: _Entry):
+        queue = self.queues.get(entry.tenant)
+        if queue is None:
+            queue = self.queues[entry.tenant] = deque()
+            self.active.append(entry.tenant)
+            self.deficit[entry.tenant] = 0.0
+        queue.append(entry)
+
+    def _retire(self, tenant: str):
+        del self.queues[tenant]
+        del self.deficit[tenant]
+        self.active.popleft()
+        self.granted = False
+
+    def pop(self, weight: Callable[[str], float]) -> Optional[_Entry]:
+        while self.active:
+            tenant = self.active[0]
+            if not self.granted:
+                self.deficit[tenant] += weight(tenant)
+                self.granted = True
+            if self.deficit[tenant] >= 1:
+                self.deficit[tenant] -= 1
+                queue = self.queues[tenant]
+                entry = queue.popleft()
+                if not queue:
+                    self._retire(tenant)
+                return entry
+            self.active.rotate(-1)
+            self.granted = False
+        return None
+
+class _TenantStats:
+    __slots__ = ("depth", "enqueued", "dequeued", "expired", "wait_total", "wait_max", "recent_waits")
+
+    def __init__(self, window: int):
+        self.depth = 0
+        self.enqueued = 0
+        self.dequeued = 0
+        self.expired = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.recent_waits: Deque[float] = deque(maxlen=window)
+
+    def to_dict(self) -> Dict[str, Any]:
+        waits = sorted(self.recent_waits)
+        return {
+            "depth": self.depth,
+            "enqueued": self.enqueued,
+            "dequeued": self.dequeued,
+            "expired": self.expired,
+            "wait_avg": self.wait_total / self.dequeued if self.dequeued else 0.0,
+            "wait_max": self.wait_max,
+            "wait_p95": waits[int(0.95 * (len(waits) - 1))] if waits else 0.0,
+        }
+
+class FairQueue:
+    """Priority queue with weighted fair sharing between tenants.
+
+    Levels of ``Priority`` are served strictly in order. Within a level each
+    tenant has its own FIFO and tenants are served by deficit round robin,
+    so a tenant with weight 2 gets twice the turns of a tenant with weight 1
+    and a single tenant's backlog cannot starve the others. Entries whose
+    deadline passes while queued are dropped on dequeue and handed to
+    ``on_expired`` instead of being returned.
+
+    Mirrors the ``asyncio.Queue`` interface used by ProcessManager:
+    ``put``, ``get``, ``get_nowait``, ``task_done``, ``join``, ``qsize``,
+    ``empty`` and ``full``. With ``maxsize`` the queue is bounded: ``put``
+    waits for room and ``put_nowait`` raises ``asyncio.QueueFull``.
+    """
+
+    def __init__(self, weights: Optional[Dict[str, float]] = None, default_weight: float = 1.0,
+                 on_expired: Optional[Callable[[Any], None]] = None, wait_window: int = 1024,
+                 maxsize: int = 0):
+        self.maxsize = maxsize
+        self.weights = dict(weights or {})
+        self.default_weight = default_weight
+        self.on_expired = on_expired
+        self.wait_window = wait_window
+        self._levels: Dict[int, _Level] = {int(priority): _Level() for priority in Priority}
+        self._size = 0
+        self._unfinished = 0
+        self._not_empty = asyncio.Event()
+        self._not_full = asyncio.Event()
+        self._not_full.set()
+        # Exponentially weighted average of queue wait, for admission control
+        self.wait_ewma = 0.0
+        self._finished = asyncio.Event()
+        self._finished.set()
+        self._tenants: Dict[str, _TenantStats] = {}
+
+    def weight(self, tenant: str) -> float:
+        return self.weights.get(tenant, self.default_weight)
+
+    def set_weight(self, tenant: str, weight: float):
+        if weight <= 0:
+            raise ValueError("Tenant weight must be positive")
+        self.weights[tenant] = weight
+
+    def qsize(self) -> int:
+        return self._size
+
+    def empty(self) -> bool:
+        return self._size == 0
+
+    def full(self) -> bool:
+        return 0 < self.maxsize <= self._size
+
+    async def wait_not_full(self):
+        while self.full():
+            self._not_full.clear()
+            await self._not_full.wait()
+
+    def oldest_wait(self) -> float:
+        """Seconds the longest-waiting queued entry has been queued."""
+        heads = [queue[0].enqueued_at for level in self._levels.values() for queue in level.queues.values()]
+        return time.monotonic() - min(heads) if heads else 0.0
+
+    @property
+    def unfinished(self) -> int:
+        """Items queued or dequeued but not yet marked done."""
+        return self._unfinished
+
+    def _stats(self, tenant: str) -> _TenantStats:
+        stats = self._tenants.get(tenant)
+        if stats is None:
+            stats = self._tenants[tenant] = _TenantStats(self.wait_window)
+        return stats
+
+    def put_nowait(self, item: Any, tenant: str = "default", priority: int = Priority.NORMAL,
+                   deadline: Optional[float] = None):
+        """Queue an item; ``deadline`` is seconds from now by which it must be dequeued."""
+        if self.full():
+            raise asyncio.QueueFull
+        now = time.monotonic()
+        level = self._levels.get(int(priority))
+        if level is None:
+            raise ValueError(f"Unknown priority: {priority}")
+        level.push(_Entry(item, tenant, int(priority), now, None if deadline is None else now + deadline))
+        stats = self._stats(tenant)
+        stats.depth += 1
+        stats.enqueued += 1
+        self._size += 1
+        self._unfinished += 1
+        self._finished.clear()
+        self._not_empty.set()
+
+    async def put(self, item: Any, tenant: str = "default", priority: int = Priority.NORMAL,
+                  deadline: Optional[float] = None):
+        await self.wait_not_full()
+        self.put_nowait(item, tenant, priority, deadline)
+
+    def _pop(self) -> Optional[_Entry]:
+        for priority in sorted(self._levels):
+            entry = self._levels[priority].pop(self.weight)
+            if entry is not None:
+                return entry
+        return None
+
+    def get_nowait(self) -> Any:
+        """Dequeue the next item, skipping expired ones; raises asyncio.QueueEmpty."""
+        while True:
+            entry = self._pop()
+            if entry is None:
+                self._not_empty.clear()
+                raise asyncio.QueueEmpty
+            self._size -= 1
+            self._not_full.set()
+            now = time.monotonic()
+            stats = self._tenants[entry.tenant]
+            stats.depth -= 1
+            if entry.deadline is not None and now > entry.deadline:
+                stats.expired += 1
+                self.task_done()
+                if self.on_expired:
+                    self.on_expired(entry.item)
+                continue
+            wait = now - entry.enqueued_at
+            stats.dequeued += 1
+            stats.wait_total += wait
+            stats.wait_max = max(stats.wait_max, wait)
+            stats.recent_waits.append(wait)
+            self.wait_ewma += 0.1 * (wait - self.wait_ewma)
+            if not self._size:
+                self._not_empty.clear()
+            return entry.item
+
+    async def get(self) -> Any:
+        while True:
+            try:
+                return self.get_nowait()
+            except asyncio.QueueEmpty:
+                await self._not_empty.wait()
+
+    def task_done(self):
+        if self._unfinished <= 0:
+            raise ValueError("task_done() called too many times")
+        self._unfinished -= 1
+        if not self._unfinished:
+            self._finished.set()
+
+    async def join(self):
+        await self._finished.wait()
+
+    def stats(self) -> Dict[str, Any]:
+        """Get queue depth per priority and depth / wait-time counters per tenant."""
+        return {
+            "depth": self._size,
+            "maxsize": self.maxsize,
+            "unfinished": self._unfinished,
+            "wait_ewma": self.wait_ewma,
+            "oldest_wait": self.oldest_wait(),
+            "priorities": {Priority(p).name.lower(): len(level) for p, level in self._levels.items()},
+            "tenants": {tenant: stats.to_dict() for tenant, stats in self._tenants.items()},
+        }
@@ -0,0 +1,294 @@
+from typing import Dict, List, Any, Optional, Tuple
+from concurrent.futures import Future
+import atexit
+import json
+import sqlite3
+import threading
+import time
+
+QUEUED = "queued"
+LEASED = "leased"
+DONE = "done"
+FAILED = "failed"
+
+class SQLiteTaskQueue:
+    """Durable task queue in a SQLite (WAL) file, shareable by worker processes.
+
+    Workers ``claim`` tasks under a lease identified by their owner id and
+    keep it alive with ``heartbeat``. A task whose lease runs past the
+    visibility timeout, because its worker died or hung, goes back to the
+    queue on the next claim and is retried up to ``max_attempts`` times.
+
+    Writes (``enqueue``, ``complete``, ``fail``) are buffered and committed
+    by a background thread in one transaction per batch, every
+    ``flush_interval`` seconds or ``batch_size`` writes, so durability costs
+    one commit per batch rather than per task. Each returns a future that
+    resolves once its batch has committed, so a caller can wait until a
+    write is durable without committing it alone. ``flush`` commits now.
+    Claims, heartbeats and releases commit immediately.
+    """
+
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS tasks (
+        id TEXT PRIMARY KEY,
+        tenant TEXT NOT NULL,
+        priority INTEGER NOT NULL,
+        payload TEXT NOT NULL,
+        status TEXT NOT NULL,
+        enqueued_at REAL NOT NULL,
+        deadline REAL,
+        lease_owner TEXT,
+        lease_expires REAL,
+        attempts INTEGER NOT NULL DEFAULT 0,
+        result TEXT,
+        error TEXT,
+        updated_at REAL NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS tasks_queued ON tasks (status, priority, enqueued_at);
+    CREATE INDEX IF NOT EXISTS tasks_leases ON tasks (status, lease_expires);
+    CREATE INDEX IF NOT EXISTS tasks_owner ON tasks (lease_owner);
+    """
+
+    ENQUEUE = ("INSERT OR IGNORE INTO tasks (id, tenant, priority, payload, status, enqueued_at, deadline, updated_at) "
+               "VALUES (?, ?, ?, ?, 'queued', ?, ?, ?)")
+    # Acks only apply while the caller still holds the lease
+    FINISH = ("UPDATE tasks SET status = ?, result = ?, error = ?, lease_owner = NULL, lease_expires = NULL, "
+              "updated_at = ? WHERE id = ? AND lease_owner = ? AND status = 'leased'")
+
+    def __init__(self, db_path: str = "tasks.db", visibility_timeout: float = 30.0, max_attempts: int = 3,
+                 batch_size: int = 256, flush_interval: float = 0.005, busy_timeout: float = 30.0,
+                 synchronous: str = "NORMAL"):
+        self.db_path = db_path
+        self.visibility_timeout = visibility_timeout
+        self.max_attempts = max_attempts
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, timeout=busy_timeout, isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        # NORMAL survives process crashes; FULL also survives power loss at one fsync per commit
+        self._conn.execute(f"PRAGMA synchronous={synchronous}")
+        self._conn.executescript(self.SCHEMA)
+        self._pending: List[Tuple[str, Tuple, Future]] = []
+        self._first_pending_at: Optional[float] = None
+        self._write_lock = threading.Lock()
+        self._wakeup = threading.Condition()
+        self._closed = False
+        self._flusher = threading.Thread(target=self._flush_loop, daemon=True)
+        self._flusher.start()
+        atexit.register(self.close)
+
+    def _buffer(self, sql: str, params: Tuple) -> Future:
+        committed = Future()
+        with self._wakeup:
+            if self._closed:
+                raise RuntimeError("Task queue is closed")
+            self._pending.append((sql, params, committed))
+            if self._first_pending_at is None:
+                self._first_pending_at = time.monotonic()
+                self._wakeup.notify()
+            elif len(self._pending) >= self.batch_size:
+                self._wakeup.notify()
+        return committed
+
+    def enqueue(self, task_id: str, payload: Any, tenant: str = "default", priority: int = 1,
+                deadline: Optional[float] = None) -> Future:
+        """Queue a task; ``deadline`` is an absolute ``time.time()`` by which it must start."""
+        now = time.time()
+        return self._buffer(self.ENQUEUE, (task_id, tenant, int(priority), json.dumps(payload), now, deadline, now))
+
+    def complete(self, task_id: str, owner: str, result: Any = None) -> Future:
+        return self._buffer(self.FINISH, (DONE, json.dumps(result, default=str), None, time.time(), task_id, owner))
+
+    def fail(self, task_id: str, owner: str, error: str) -> Future:
+        return self._buffer(self.FINISH, (FAILED, None, error, time.time(), task_id, owner))
+
+    def _flush_loop(self):
+        """Background writer that groups buffered writes into one commit."""
+        while True:
+            with self._wakeup:
+                while not self._closed:
+                    if len(self._pending) >= self.batch_size:
+                        break
+                    if self._first_pending_at is not None:
+                        remaining = self._first_pending_at + self.flush_interval - time.monotonic()
+                        if remaining <= 0:
+                            break
+                        self._wakeup.wait(remaining)
+                    else:
+                        self._wakeup.wait()
+                if self._closed:
+                    return
+            try:
+                self.flush()
+            except sqlite3.Error as e:
+                print(f"Error committing task queue writes: {e}")
+                time.sleep(self.flush_interval)
+
+    def flush(self):
+        """Commit buffered writes now."""
+        with self._write_lock:
+            with self._wakeup:
+                pending, self._pending = self._pending, []
+                self._first_pending_at = None
+            if not pending:
+                return
+            try:
+                self._transaction(lambda conn: self._apply(conn, pending))
+            except Exception:
+                # Put the batch back so a later flush retries it
+                with self._wakeup:
+                    self._pending[:0] = pending
+                    if self._first_pending_at is None:
+                        self._first_pending_at = time.monotonic()
+                raise
+        for _, _, committed in pending:
+            if not committed.done():
+                committed.set_result(None)
+
+    @staticmethod
+    def _apply(conn: sqlite3.Connection, pending: List[Tuple[str, Tuple, Future]]):
+        # executemany over runs of the same statement
+        start = 0
+        while start < len(pending):
+            sql = pending[start][0]
+            end = start
+            while end < len(pending) and pending[end][0] == sql:
+                end += 1
+            conn.executemany(sql, [params for _, params, _ in pending[start:end]])
+            start = end
+
+    def _transaction(self, body):
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                result = body(self._conn)
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return result
+
+    def _requeue_expired(self, conn: sqlite3.Connection, now: float) -> int:
+        # Leases past their visibility timeout belong to dead or stuck workers
+        conn.execute(
+            "UPDATE tasks SET status = 'failed', error = 'Lease expired too many times', lease_owner = NULL, "
+            "lease_expires = NULL, updated_at = ? WHERE status = 'leased' AND lease_expires < ? AND attempts >= ?",
+            (now, now, self.max_attempts)
+        )
+        return conn.execute(
+            "UPDATE tasks SET status = 'queued', lease_owner = NULL, lease_expires = NULL, updated_at = ? "
+            "WHERE status = 'leased' AND lease_expires < ?",
+            (now, now)
+        ).rowcount
+
+    def claim(self, owner: str, limit: int = 1) -> List[Dict[str, Any]]:
+        """Lease up to ``limit`` queued tasks, highest priority then oldest first."""
+        self.flush()
+
+        def body(conn: sqlite3.Connection) -> List[Dict[str, Any]]:
+            now = time.time()
+            self._requeue_expired(conn, now)
+            rows = conn.execute(
+                "SELECT id, tenant, priority, payload, enqueued_at, deadline, attempts FROM tasks "
+                "WHERE status = 'queued' ORDER BY priority, enqueued_at LIMIT ?",
+                (limit,)
+            ).fetchall()
+            conn.executemany(
+                "UPDATE tasks SET status = 'leased', lease_owner = ?, lease_expires = ?, attempts = attempts + 1, "
+                "updated_at = ? WHERE id = ?",
+                [(owner, now + self.visibility_timeout, now, row[0]) for row in rows]
+            )
+            return [{
+                "id": task_id,
+                "tenant": tenant,
+                "priority": priority,
+                "task": json.loads(payload),
+                "enqueued_at": enqueued_at,
+                "deadline": deadline,
+                "attempts": attempts + 1,
+            } for task_id, tenant, priority, payload, enqueued_at, deadline, attempts in rows]
+
+        return self._transaction(body)
+
+    def heartbeat(self, owner: str) -> int:
+        """Extend every lease held by owner; returns the number renewed."""
+        now = time.time()
+        return self._transaction(lambda conn: conn.execute(
+            "UPDATE tasks SET lease_expires = ? WHERE lease_owner = ? AND status = 'leased'",
+            (now + self.visibility_timeout, owner)
+        ).rowcount)
+
+    def release(self, owner: str) -> int:
+        """Return owner's unfinished leases to the queue, e.g. on shutdown."""
+        self.flush()
+        now = time.time()
+        return self._transaction(lambda conn: conn.execute(
+            "UPDATE tasks SET status = 'queued', lease_owner = NULL, lease_expires = NULL, "
+            "attempts = MAX(attempts - 1, 0), updated_at = ? WHERE lease_owner = ? AND status = 'leased'",
+            (now, owner)
+        ).rowcount)
+
+    def cancel(self, task_id: str) -> bool:
+        """Mark a queued or leased task as cancelled so no worker runs or acks it."""
+        self.flush()
+        now = time.time()
+        return bool(self._transaction(lambda conn: conn.execute(
+            "UPDATE tasks SET status = 'failed', error = 'Cancelled', lease_owner = NULL, lease_expires = NULL, "
+            "updated_at = ? WHERE id = ? AND status IN ('queued', 'leased')",
+            (now, task_id)
+        ).rowcount))
+
+    def requeue_expired(self) -> int:
+        """Return expired leases to the queue; returns the number requeued."""
+        return self._transaction(lambda conn: self._requeue_expired(conn, time.time()))
+
+    def get(self, task_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT status, result, error, attempts, lease_owner, updated_at FROM tasks WHERE id = ?", (task_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        status, result, error, attempts, lease_owner, updated_at = row
+        return {
+            "id": task_id,
+            "status": status,
+            "result": None if result is None else json.loads(result),
+            "error": error,
+            "attempts": attempts,
+            "lease_owner": lease_owner,
+            "updated_at": updated_at,
+        }
+
+    def stats(self) -> Dict[str, int]:
+        """Count tasks by status."""
+        with self._lock:
+            rows = self._conn.execute("SELECT status, COUNT(*) FROM tasks GROUP BY status").fetchall()
+        counts = {QUEUED: 0, LEASED: 0, DONE: 0, FAILED: 0}
+        counts.update(rows)
+        counts["buffered"] = len(self._pending)
+        return counts
+
+    def close(self):
+        """Commit buffered writes and stop the background writer."""
+        with self._wakeup:
+            if self._closed:
+                return
+            self._closed = True
+            self._wakeup.notify()
+        self._flusher.join()
+        try:
+            self.flush()
+        except Exception as e:
+            # Nothing will retry these now; don't leave their writers waiting
+            with self._wakeup:
+                pending, self._pending = self._pending, []
+            for _, _, committed in pending:
+                if not committed.done():
+                    committed.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._conn.close()
+            atexit.unregister(self.close)
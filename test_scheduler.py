@@ -0,0 +1,95 @@
+import asyncio
+
+import pytest
+
+from scheduler import FairQueue, Priority
+
+
+def drain(queue):
+    items = []
+    while True:
+        try:
+            items.append(queue.get_nowait())
+        except asyncio.QueueEmpty:
+            return items
+        queue.task_done()
+
+
+def test_equal_weights_alternate_tenants():
+    queue = FairQueue()
+    for n in range(3):
+        queue.put_nowait(("a", n), tenant="a")
+    for n in range(3):
+        queue.put_nowait(("b", n), tenant="b")
+    assert drain(queue) == [("a", 0), ("b", 0), ("a", 1), ("b", 1), ("a", 2), ("b", 2)]
+
+
+def test_backlogged_tenant_does_not_starve_others():
+    queue = FairQueue()
+    for n in range(100):
+        queue.put_nowait(("bulk", n), tenant="bulk")
+    queue.put_nowait(("small", 0), tenant="small")
+    assert drain(queue)[:2] == [("bulk", 0), ("small", 0)]
+
+
+def test_weights_share_turns_proportionally():
+    queue = FairQueue(weights={"a": 2, "c": 0.5})
+    for tenant in "abc":
+        for n in range(60):
+            queue.put_nowait(tenant, tenant=tenant)
+    served = drain(queue)[:70]
+    assert {tenant: served.count(tenant) for tenant in "abc"} == {"a": 40, "b": 20, "c": 10}
+
+
+def test_set_weight_rejects_non_positive():
+    queue = FairQueue()
+    with pytest.raises(ValueError):
+        queue.set_weight("a", 0)
+
+
+def test_priorities_are_served_strictly():
+    queue = FairQueue(weights={"a": 10})
+    queue.put_nowait("low", tenant="a", priority=Priority.LOW)
+    queue.put_nowait("normal", tenant="a")
+    queue.put_nowait("high", tenant="b", priority=Priority.HIGH)
+    assert drain(queue) == ["high", "normal", "low"]
+    with pytest.raises(ValueError):
+        queue.put_nowait("x", priority=7)
+
+
+def test_expired_entries_are_dropped():
+    expired = []
+    queue = FairQueue(on_expired=expired.append)
+    queue.put_nowait("stale", tenant="a", deadline=-1)
+    queue.put_nowait("fresh", tenant="a", deadline=60)
+    assert drain(queue) == ["fresh"]
+    assert expired == ["stale"]
+    assert queue.unfinished == 0
+    stats = queue.stats()["tenants"]["a"]
+    assert (stats["enqueued"], stats["dequeued"], stats["expired"], stats["depth"]) == (2, 1, 1, 0)
+
+
+def test_maxsize_bounds_the_queue():
+    queue = FairQueue(maxsize=2)
+    queue.put_nowait(1)
+    queue.put_nowait(2)
+    assert queue.full()
+    with pytest.raises(asyncio.QueueFull):
+        queue.put_nowait(3)
+    assert queue.get_nowait() == 1
+    queue.put_nowait(3)
+    assert queue.stats()["depth"] == 2
+
+
+def test_put_waits_for_room():
+    async def main():
+        queue = FairQueue(maxsize=1)
+        await queue.put(1)
+        waiting = asyncio.create_task(queue.put(2))
+        await asyncio.sleep(0)
+        assert not waiting.done()
+        assert await queue.get() == 1
+        await asyncio.wait_for(waiting, 1)
+        assert await queue.get() == 2
+
+    asyncio.run(main())
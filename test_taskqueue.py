@@ -0,0 +1,131 @@
+import pytest
+
+from taskqueue import SQLiteTaskQueue
+
+
+@pytest.fixture
+def make_queue(tmp_path):
+    queues = []
+
+    def make(**kwargs):
+        queue = SQLiteTaskQueue(str(tmp_path / "tasks.db"), **kwargs)
+        queues.append(queue)
+        return queue
+
+    yield make
+    for queue in queues:
+        queue.close()
+
+
+def test_enqueue_future_resolves_once_committed(make_queue):
+    queue = make_queue(flush_interval=60)
+    committed = queue.enqueue("t1", {"n": 1})
+    assert not committed.done()
+    assert queue.stats()["buffered"] == 1
+    queue.flush()
+    assert committed.result(timeout=1) is None
+    assert queue.get("t1")["status"] == "queued"
+
+
+def test_claim_orders_by_priority_then_age(make_queue):
+    queue = make_queue()
+    queue.enqueue("low", {}, priority=2)
+    queue.enqueue("first", {})
+    queue.enqueue("second", {})
+    queue.enqueue("high", {}, priority=0)
+    assert [task["id"] for task in queue.claim("w1", limit=3)] == ["high", "first", "second"]
+    assert [task["id"] for task in queue.claim("w1", limit=3)] == ["low"]
+    assert queue.claim("w1") == []
+
+
+def test_live_lease_is_not_claimed_again(make_queue):
+    queue = make_queue(visibility_timeout=60)
+    queue.enqueue("t1", {"n": 1})
+    [task] = queue.claim("w1")
+    assert task["task"] == {"n": 1}
+    assert task["attempts"] == 1
+    assert queue.claim("w2") == []
+    assert queue.requeue_expired() == 0
+
+
+def test_expired_lease_is_requeued_on_next_claim(make_queue):
+    # A negative timeout makes every lease expire as soon as it is taken
+    queue = make_queue(visibility_timeout=-1)
+    queue.enqueue("t1", {"n": 1})
+    queue.claim("w1")
+    [task] = queue.claim("w2")
+    assert task["id"] == "t1"
+    assert task["attempts"] == 2
+    assert queue.get("t1")["lease_owner"] == "w2"
+
+
+def test_stale_owner_cannot_ack(make_queue):
+    queue = make_queue(visibility_timeout=-1)
+    queue.enqueue("t1", {})
+    queue.claim("w1")
+    queue.claim("w2")
+    queue.complete("t1", "w1", "late")
+    queue.flush()
+    assert queue.get("t1")["status"] == "leased"
+    queue.complete("t1", "w2", {"ok": True})
+    queue.flush()
+    record = queue.get("t1")
+    assert (record["status"], record["result"], record["lease_owner"]) == ("done", {"ok": True}, None)
+
+
+def test_lease_expiring_too_often_fails_the_task(make_queue):
+    queue = make_queue(visibility_timeout=-1, max_attempts=2)
+    queue.enqueue("t1", {})
+    assert len(queue.claim("w1")) == 1
+    assert len(queue.claim("w2")) == 1
+    assert queue.claim("w3") == []
+    record = queue.get("t1")
+    assert (record["status"], record["error"], record["attempts"]) == ("failed", "Lease expired too many times", 2)
+
+
+def test_requeue_expired(make_queue):
+    queue = make_queue(visibility_timeout=-1)
+    queue.enqueue("t1", {})
+    queue.claim("w1")
+    assert queue.requeue_expired() == 1
+    assert queue.get("t1")["status"] == "queued"
+
+
+def test_heartbeat_extends_lease(make_queue):
+    queue = make_queue(visibility_timeout=-1)
+    queue.enqueue("t1", {})
+    queue.claim("w1")
+    queue.visibility_timeout = 60
+    assert queue.heartbeat("w1") == 1
+    assert queue.claim("w2") == []
+    assert queue.heartbeat("w2") == 0
+
+
+def test_release_returns_leases_without_spending_an_attempt(make_queue):
+    queue = make_queue(visibility_timeout=60)
+    queue.enqueue("t1", {})
+    queue.claim("w1")
+    assert queue.release("w1") == 1
+    record = queue.get("t1")
+    assert (record["status"], record["attempts"], record["lease_owner"]) == ("queued", 0, None)
+    assert queue.claim("w2")[0]["attempts"] == 1
+
+
+def test_fail_and_cancel(make_queue):
+    queue = make_queue()
+    queue.enqueue("t1", {})
+    queue.enqueue("t2", {})
+    queue.claim("w1")
+    queue.fail("t1", "w1", "boom").result(timeout=1)
+    assert queue.cancel("t2")
+    assert not queue.cancel("t2")
+    assert queue.get("t1")["error"] == "boom"
+    assert queue.get("t2")["error"] == "Cancelled"
+    assert queue.stats() == {"queued": 0, "leased": 0, "done": 0, "failed": 2, "buffered": 0}
+
+
+def test_closed_queue_rejects_writes(make_queue):
+    queue = make_queue()
+    queue.close()
+    with pytest.raises(RuntimeError):
+        queue.enqueue("t1", {})
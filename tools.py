@@ -1,35 +1,199 @@
-from praisonai.tools import BrowserTool, SearchTool, CalculatorTool, FileReaderTool, TerminalTool, JSONExplorerTool, CodeInterpreterTool
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, Callable, ClassVar, Iterable, List, Optional
 from langchain.tools import BaseTool
-from langchain_community.tools import DuckDuckGoSearchRun
-from playwright.async_api import async_playwright
 import asyncio
-from embassai import EmbassaiClient
-import requests
+import importlib
 import json
 import os
+import threading
+import time
+from core.workflow import get_workflow_manager
 
-def get_tools():
-    return [
-        BrowserTool(),
-        SearchTool(),
-        CalculatorTool(),
-        FileReaderTool(),
-        TerminalTool(),
-        JSONExplorerTool(),
-        CodeInterpreterTool(),
-    ]
+# Heavy dependencies (PraisonAI tools, Playwright, aiohttp, Embassai) are
+# imported when a tool first needs them, not when this module loads
+
+class ToolRegistry:
+    """Tools indexed by name, built from factories on first use.
+
+    A factory is any zero-argument callable returning a tool (usually the
+    tool class). ``get`` builds the tool once and reuses it; concurrent
+    first calls for one tool build it only once. ``proxy`` hands out a
+    stand-in that builds the tool when it is first run. Tools registered
+    with ``warm=True`` are hints for ``warmup``, which builds them ahead of
+    the first request (optionally on a background thread).
+    """
+
+    def __init__(self):
+        self._factories: Dict[str, Callable[[], BaseTool]] = {}
+        self._descriptions: Dict[str, str] = {}
+        self._instances: Dict[str, BaseTool] = {}
+        self._build_locks: Dict[str, threading.Lock] = {}
+        self._warm: List[str] = []
+        self._lock = threading.Lock()
+        self.build_seconds: Dict[str, float] = {}
+
+    def register_factory(self, name: str, factory: Callable[[], BaseTool], warm: bool = False,
+                         description: Optional[str] = None):
+        """Register a factory; ``description`` lets a proxy describe the tool before it is built."""
+        with self._lock:
+            if name in self._factories:
+                raise ValueError(f"Tool with name {name} already exists")
+            self._factories[name] = factory
+            if description is not None:
+                self._descriptions[name] = description
+            self._build_locks[name] = threading.Lock()
+            if warm:
+                self._warm.append(name)
+
+    def register(self, tool: BaseTool):
+        """Register an already built tool under its name."""
+        self.register_factory(tool.name, lambda: tool)
+        self._instances[tool.name] = tool
+
+    def unregister(self, name: str):
+        with self._lock:
+            self._factories.pop(name, None)
+            self._descriptions.pop(name, None)
+            self._instances.pop(name, None)
+            self._build_locks.pop(name, None)
+            self.build_seconds.pop(name, None)
+            if name in self._warm:
+                self._warm.remove(name)
+
+    def get(self, name: str) -> Optional[BaseTool]:
+        tool = self._instances.get(name)
+        if tool is not None:
+            return tool
+        build_lock = self._build_locks.get(name)
+        if build_lock is None:
+            return None
+        with build_lock:
+            tool = self._instances.get(name)
+            if tool is None:
+                start = time.perf_counter()
+                tool = self._factories[name]()
+                self.build_seconds[name] = time.perf_counter() - start
+                self._instances[name] = tool
+        return tool
+
+    def proxy(self, name: str) -> Optional[Any]:
+        """The tool if already built, else a LazyTool that builds it on first use."""
+        tool = self._instances.get(name)
+        if tool is not None or name not in self._factories:
+            return tool
+        return LazyTool(self, name, self._descriptions.get(name))
+
+    def warmup(self, names: Optional[Iterable[str]] = None, background: bool = False) -> Optional[threading.Thread]:
+        """Build the named tools (default: those registered with ``warm=True``) now."""
+        names = list(self._warm if names is None else names)
+        if background:
+            thread = threading.Thread(target=self.warmup, args=(names,), name="tool-warmup", daemon=True)
+            thread.start()
+            return thread
+        for name in names:
+            self.get(name)
+        return None
+
+    def names(self) -> List[str]:
+        return list(self._factories)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._factories
+
+    def __len__(self) -> int:
+        return len(self._factories)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "registered": len(self._factories),
+            "built": sorted(self._instances),
+            "warm_hints": list(self._warm),
+            "build_seconds": dict(self.build_seconds),
+        }
+
+class LazyTool:
+    """Stand-in for a registered tool until it is needed.
+
+    ``name`` and, if one was registered, ``description`` are answered
+    without building the tool; running it (``run``, ``_run``, ``arun``,
+    ``_arun``) or reading any other attribute builds it through the
+    registry and delegates to it.
+    """
+
+    def __init__(self, registry: ToolRegistry, name: str, description: Optional[str] = None):
+        self._registry = registry
+        self.name = name
+        if description is not None:
+            self.description = description
+
+    @property
+    def tool(self) -> BaseTool:
+        tool = self._registry.get(self.name)
+        if tool is None:
+            raise LookupError(f"Tool {self.name} is no longer registered")
+        return tool
+
+    def __getattr__(self, attr: str) -> Any:
+        # Only called for attributes not set above; never build for dunders (copy, pickle)
+        if attr.startswith("__") or attr == "_registry":
+            raise AttributeError(attr)
+        return getattr(self.tool, attr)
+
+    def __repr__(self) -> str:
+        return f"LazyTool({self.name!r})"
+
+def _praisonai_tool(class_name: str) -> Callable[[], BaseTool]:
+    def factory() -> BaseTool:
+        return getattr(importlib.import_module("praisonai.tools"), class_name)()
+    return factory
+
+# PraisonAI tools by the names agents.yaml uses
+PRAISONAI_TOOLS = {
+    "browser": "BrowserTool",
+    "search": "SearchTool",
+    "calculator": "CalculatorTool",
+    "file_reader": "FileReaderTool",
+    "terminal": "TerminalTool",
+    "json_explorer": "JSONExplorerTool",
+    "code_interpreter": "CodeInterpreterTool",
+}
+
+# What an agent is told about each PraisonAI tool before it is built
+PRAISONAI_TOOL_DESCRIPTIONS = {
+    "browser": "Open web pages and read their content",
+    "search": "Search the web for information",
+    "calculator": "Evaluate mathematical expressions",
+    "file_reader": "Read the contents of a file",
+    "terminal": "Run shell commands",
+    "json_explorer": "Query and explore JSON data",
+    "code_interpreter": "Run Python code and return its output",
+}
+
+def get_tools(names: Optional[Iterable[str]] = None) -> List[Any]:
+    """PraisonAI tools for the agent (all of them by default), each built when first run."""
+    return [TOOL_REGISTRY.proxy(name) for name in (PRAISONAI_TOOLS if names is None else names)]
 
 class WebInteractionTool(BaseTool):
     name = "WebInteractionTool"
     description = "Tool for web browsing, data extraction, and form interaction"
     
+    extract_ttl: ClassVar[float] = 300.0
+
     async def _run(self, url: str, action: str, data: Dict[str, Any] = None) -> Dict[str, Any]:
-        async with async_playwright() as p:
-            browser = await p.chromium.launch()
-            page = await browser.new_page()
+        from response_cache import get_response_cache
+        if action == "extract":
+            # Read-only, so recent extractions are served from the shared cache
+            return await get_response_cache().memoize(
+                "web_extract", url, lambda: self._interact(url, action, data), self.extract_ttl
+            )
+        return await self._interact(url, action, data)
+
+    async def _interact(self, url: str, action: str, data: Dict[str, Any] = None) -> Dict[str, Any]:
+        from browser_pool import get_browser_pool
+        # Pages come from a shared long-lived browser; the lease is returned
+        # (and the context reset or recycled) however the action ends
+        async with get_browser_pool().page() as page:
             await page.goto(url)
-            
+
             if action == "extract":
                 content = await page.content()
                 return {"content": content}
@@ -40,16 +204,24 @@ class WebInteractionTool(BaseTool):
             elif action == "click":
                 await page.click(data["selector"])
                 return {"status": "clicked"}
-            
-            await browser.close()
+            return {"error": "Invalid action"}
 
 class WorkflowTool(BaseTool):
     name = "WorkflowTool"
     description = "Tool for creating and managing automation workflows"
     
     def _run(self, workflow_data: Dict[str, Any]) -> Dict[str, Any]:
-        # Implement workflow creation and management
-        return {"workflow": workflow_data}
+        return asyncio.run(self._arun(workflow_data))
+
+    async def _arun(self, workflow_data: Dict[str, Any]) -> Dict[str, Any]:
+        # workflow_data is a DAG of steps (see core.workflow), or
+        # {"rerun": run_id, "from_steps": [...]} to resume a previous run
+        manager = get_workflow_manager()
+        if "rerun" in workflow_data:
+            run = await manager.rerun(workflow_data["rerun"], workflow_data.get("from_steps"))
+        else:
+            run = await manager.run(workflow_data)
+        return {"workflow": manager.summarize(run)}
 
 class WritingTool(BaseTool):
     name = "WritingTool"
@@ -64,6 +236,7 @@ class SecurityTool(BaseTool):
     description = "Tool for secure communications and data handling"
     
     def __init__(self):
+        from embassai import EmbassaiClient
         self.embassai = EmbassaiClient()
     
     def _run(self, data: Dict[str, Any], action: str) -> Dict[str, Any]:
@@ -84,27 +257,58 @@ class ReviewTool(BaseTool):
 class WebSearchTool(BaseTool):
     name = "web_search"
     description = "Search the web for information"
+    cache_ttl: ClassVar[float] = 600.0
 
     def _run(self, query: str) -> str:
+        from response_cache import get_response_cache
+        return get_response_cache().memoize_sync("web_search", query, lambda: self._search(query), self.cache_ttl)
+
+    def _search(self, query: str) -> str:
         # This is a placeholder for actual web search implementation
         return f"Search results for: {query}"
 
     async def _arun(self, query: str) -> str:
-        return self._run(query)
+        from response_cache import get_response_cache
+        return await get_response_cache().memoize(
+            "web_search", query, lambda: asyncio.to_thread(self._search, query), self.cache_ttl
+        )
 
 class FileSystemTool(BaseTool):
     name = "file_system"
-    description = "Interact with the file system"
+    description = (
+        "Interact with the file system. Operations: read (optionally offset/length in bytes, "
+        "negative offset counts from the end), head/tail (lines), read_lines (start_line..end_line), "
+        "search (pattern, regex, ignore_case, max_matches), write, append, delete"
+    )
+    # A single read may return at most this many bytes
+    max_read_bytes: ClassVar[int] = 16 << 20
 
-    def _run(self, operation: str, path: str, content: str = None) -> str:
+    def _run(self, operation: str, path: str, content: str = None, offset: int = 0, length: int = None,
+             lines: int = 10, start_line: int = 1, end_line: int = None, pattern: str = None,
+             regex: bool = False, ignore_case: bool = False, max_matches: int = 100,
+             chunks: Iterable[Any] = None) -> str:
+        import fileops
         try:
             if operation == "read":
-                with open(path, 'r') as f:
-                    return f.read()
-            elif operation == "write":
-                with open(path, 'w') as f:
-                    f.write(content)
-                return "File written successfully"
+                size = os.path.getsize(path)
+                available = min(size, -offset) if offset < 0 else max(0, size - offset)
+                if (available if length is None else min(length, available)) > self.max_read_bytes:
+                    return (f"Error: {path} is {size} bytes; read at most {self.max_read_bytes} "
+                            "at a time with offset/length, head, tail, read_lines or search")
+                return fileops.read_range(path, offset, length)
+            elif operation == "head":
+                return fileops.head(path, lines)
+            elif operation == "tail":
+                return fileops.tail(path, lines)
+            elif operation == "read_lines":
+                return fileops.read_lines(path, start_line, end_line)
+            elif operation == "search":
+                return json.dumps(fileops.search(path, pattern, regex, ignore_case, max_matches))
+            elif operation in ("write", "append"):
+                # chunks streams content of any size; content is a single chunk
+                written = fileops.write_chunks(path, chunks if chunks is not None else [content or ""],
+                                               append=operation == "append")
+                return f"File written successfully ({written} bytes)"
             elif operation == "delete":
                 os.remove(path)
                 return "File deleted successfully"
@@ -113,18 +317,30 @@ class FileSystemTool(BaseTool):
         except Exception as e:
             return f"Error: {str(e)}"
 
-    async def _arun(self, operation: str, path: str, content: str = None) -> str:
-        return self._run(operation, path, content)
+    async def _arun(self, operation: str, path: str, content: str = None, chunks: Any = None, **options) -> str:
+        # Blocking file I/O runs on a bounded pool instead of the event loop
+        import fileops
+        if chunks is not None and hasattr(chunks, "__aiter__"):
+            try:
+                written = await fileops.awrite_chunks(path, chunks, append=operation == "append")
+                return f"File written successfully ({written} bytes)"
+            except Exception as e:
+                return f"Error: {str(e)}"
+        return await fileops.run_io(self._run, operation, path, content, chunks=chunks, **options)
 
 class APITool(BaseTool):
     name = "api"
     description = "Make API requests"
 
     def _run(self, method: str, url: str, data: Dict[str, Any] = None) -> str:
+        from http_client import get_http_client
+        from response_cache import get_response_cache
         try:
-            response = requests.request(
-                method=method,
-                url=url,
+            # GET/HEAD responses are cached and revalidated per their HTTP headers
+            response = get_response_cache().fetch_sync(
+                get_http_client(),
+                method,
+                url,
                 json=data,
                 headers={"Content-Type": "application/json"}
             )
@@ -132,31 +348,47 @@ class APITool(BaseTool):
         except Exception as e:
             return f"Error: {str(e)}"
 
-    async def _arun(self, method: str, url: str, data: Dict[str, Any] = None) -> str:
-        return self._run(method, url, data)
+    async def _arun(self, method: str, url: str, data: Dict[str, Any] = None, stream_to: str = None) -> str:
+        # Native async on the shared pooled session; stream_to writes the body
+        # to that file in chunks instead of returning it
+        from http_client import get_http_client
+        from response_cache import get_response_cache
+        try:
+            client = get_http_client()
+            headers = {"Content-Type": "application/json"}
+            if stream_to:
+                size = await client.download(method, url, stream_to, json=data, headers=headers)
+                return f"Saved {size} bytes to {stream_to}"
+            response = await get_response_cache().fetch(client, method, url, json=data, headers=headers)
+            return response.text
+        except Exception as e:
+            return f"Error: {str(e)}"
 
-# Register all tools
-TOOLS = [
-    WebSearchTool(),
-    FileSystemTool(),
-    APITool()
-]
+TOOL_REGISTRY = ToolRegistry()
+for _name, _class_name in PRAISONAI_TOOLS.items():
+    TOOL_REGISTRY.register_factory(_name, _praisonai_tool(_class_name),
+                                   description=PRAISONAI_TOOL_DESCRIPTIONS.get(_name))
+TOOL_REGISTRY.register_factory("web_search", WebSearchTool)
+TOOL_REGISTRY.register_factory("file_system", FileSystemTool)
+TOOL_REGISTRY.register_factory("api", APITool)
 
 def get_tool_by_name(name: str) -> Optional[BaseTool]:
-    """Get a tool by its name."""
-    for tool in TOOLS:
-        if tool.name == name:
-            return tool
-    return None
+    """Get a tool by its name, building it on first use."""
+    return TOOL_REGISTRY.get(name)
 
 def register_tool(tool: BaseTool):
     """Register a new tool."""
-    if not any(t.name == tool.name for t in TOOLS):
-        TOOLS.append(tool)
-    else:
-        raise ValueError(f"Tool with name {tool.name} already exists")
+    TOOL_REGISTRY.register(tool)
+
+def register_tool_factory(name: str, factory: Callable[[], BaseTool], warm: bool = False,
+                          description: Optional[str] = None):
+    """Register a tool to be built on first use (or by ``warmup_tools`` if ``warm``)."""
+    TOOL_REGISTRY.register_factory(name, factory, warm, description)
 
 def unregister_tool(name: str):
     """Unregister a tool by name."""
-    global TOOLS
-    TOOLS = [t for t in TOOLS if t.name != name]
\ No newline at end of file
+    TOOL_REGISTRY.unregister(name)
+
+def warmup_tools(names: Optional[Iterable[str]] = None, background: bool = True) -> Optional[threading.Thread]:
+    """Build tools we expect to need before the first request arrives."""
+    return TOOL_REGISTRY.warmup(names, background)